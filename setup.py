@@ -20,8 +20,10 @@ setup(
         "langchain-community>=0.0.20",
         "openai>=1.0.0",
         "chromadb>=0.4.0",
+        "numpy>=1.22",
         "pydantic-settings>=2.0.0",
         "python-dotenv>=1.0.0",
+        "aiohttp>=3.8.3",
     ],
 )
 
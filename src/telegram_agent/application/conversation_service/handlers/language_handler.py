@@ -0,0 +1,91 @@
+import collections
+import contextvars
+import re
+from typing import Optional
+
+from telegram_agent.config.settings import settings
+from telegram_agent.infrastructure.utils.logger import logger
+
+# Language resolved for the message currently being processed.
+# Set by SupportAgent; read by the tools (LangChain copies the context into tool threads).
+current_language: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_language", default=None
+)
+
+_HEBREW_LETTERS = re.compile(r"[\u0590-\u05FF\uFB1D-\uFB4F]")  # Hebrew block + presentation forms
+_LATIN_LETTERS = re.compile(r"[A-Za-z]")
+
+
+class LanguageHandler:
+    """Resolve Hebrew/English by Unicode script, with per-user caching"""
+
+    HEBREW = "he"
+    ENGLISH = "en"
+
+    def __init__(self):
+        self.max_users = settings.LANGUAGE_CACHE_SIZE
+        self.user_languages = collections.OrderedDict()
+        self.script_resolved = 0
+        self.cache_resolved = 0
+        self.statistical_resolved = 0
+        logger.info("✅ Language handler initialized")
+
+    @staticmethod
+    def classify_script(text: str) -> Optional[str]:
+        """Classify by Hebrew vs Latin letter ratio; None if mixed or no letters"""
+        hebrew = len(_HEBREW_LETTERS.findall(text))
+        latin = len(_LATIN_LETTERS.findall(text))
+        letters = hebrew + latin
+        if not letters:
+            return None
+        ratio = hebrew / letters
+        if ratio >= settings.LANGUAGE_SCRIPT_RATIO:
+            return LanguageHandler.HEBREW
+        if ratio <= 1 - settings.LANGUAGE_SCRIPT_RATIO:
+            return LanguageHandler.ENGLISH
+        return None
+
+    def _detect_statistical(self, text: str) -> str:
+        """Fallback for mixed text; defaults to Hebrew if detection fails"""
+        self.statistical_resolved += 1
+        try:
+            from langdetect import DetectorFactory, detect
+            DetectorFactory.seed = 0  # deterministic results on short inputs
+            return self.HEBREW if detect(text) == self.HEBREW else self.ENGLISH
+        except Exception:
+            return self.HEBREW
+
+    def resolve(self, text: str, user_id: str = None) -> str:
+        """Resolve the language of `text`, remembering it for `user_id`"""
+        language = self.classify_script(text or "")
+        if language:
+            self.script_resolved += 1
+        elif user_id and user_id in self.user_languages:
+            # Numbers, emoji or mixed text: keep the user's language
+            self.cache_resolved += 1
+            language = self.user_languages[user_id]
+        else:
+            language = self._detect_statistical(text) if text else self.HEBREW
+
+        if user_id:
+            self.user_languages[user_id] = language
+            self.user_languages.move_to_end(user_id)
+            if len(self.user_languages) > self.max_users:
+                self.user_languages.popitem(last=False)
+        return language
+
+    def get(self, user_id: str) -> Optional[str]:
+        """Last resolved language for the user, if any"""
+        return self.user_languages.get(user_id)
+
+    def get_stats(self) -> dict:
+        return {
+            "script": self.script_resolved,
+            "cache": self.cache_resolved,
+            "statistical": self.statistical_resolved,
+            "users": len(self.user_languages)
+        }
+
+
+# Shared instance used by SupportAgent and the info tools
+language_handler = LanguageHandler()
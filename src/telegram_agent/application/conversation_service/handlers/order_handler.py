@@ -1,73 +1,71 @@
-import re
 from typing import Optional, Dict
+from telegram_agent.application.conversation_service.intent_matcher import IntentMatch, intent_matcher
+from telegram_agent.application.conversation_service.handlers.session_store import (
+    BoundedSessionStore, session_store
+)
+from telegram_agent.config import intents
 from telegram_agent.infrastructure.utils.logger import logger
 
 
 class OrderHandler:
     """Enhanced order handling with context awareness"""
     
-    ORDER_KEYWORDS = [
-        "הזמנה", "מספר הזמנה", "הזמנה שלי",
-        "מעקב", "tracking", "order", "משלוח שלי",
-        "סטטוס", "סטאטוס", "איפה", "הגיע"
-    ]
+    # Loaded from config/intents.py and compiled into the shared intent matcher
+    ORDER_KEYWORDS = intents.ORDER_KEYWORDS
+    ORDER_PATTERNS = intents.ORDER_PATTERNS
     
-    ORDER_PATTERNS = [
-        r'ORD-\d{5,}',      # ORD-12345
-        r'#\d{5,}',         # #12345
-        r'\b\d{5,}\b'       # 12345 (5+ digits)
-    ]
-    
-    def __init__(self):
-        self.pending_order_requests = {}  # user_id -> waiting for order number
+    def __init__(self, store: BoundedSessionStore = None):
+        self.store = store if store is not None else session_store  # holds the "waiting for order number" flag
         logger.info("✅ Order handler initialized")
     
-    def is_order_query(self, text: str, user_id: str = None) -> bool:
+    def is_order_query(self, text: str, user_id: str = None, match: IntentMatch = None) -> bool:
         """
         Check if query is about an order
         Now considers:
         1. Keywords in text
         2. Number-only messages (if waiting for order number)
         3. Pattern match
+        
+        Pass a precomputed `match` to avoid scanning the text again.
         """
-        text_lower = text.lower()
+        match = match or intent_matcher.match(text)
         
         # Check keywords
-        has_keyword = any(kw in text_lower for kw in self.ORDER_KEYWORDS)
+        has_keyword = match.has_order_keyword
         
         # Check if this is a follow-up number
-        is_waiting = user_id and self.pending_order_requests.get(user_id, False)
+        is_waiting = user_id and self.is_waiting(user_id)
         
         # Check if it's a number that matches our pattern
-        has_number = any(re.search(pattern, text) for pattern in self.ORDER_PATTERNS)
+        has_number = match.has_order_number
         
         result = has_keyword or (is_waiting and has_number) or has_number
         
         if result:
-            logger.debug(f"Detected order query: {text[:50]} (keyword={has_keyword}, waiting={is_waiting}, number={has_number})")
+            logger.debug(
+                "Detected order query: %s (keyword=%s, waiting=%s, number=%s)",
+                text[:50], has_keyword, is_waiting, has_number, category="routing"
+            )
         
         return result
     
-    def extract_order_number(self, text: str) -> Optional[str]:
+    def extract_order_number(self, text: str, match: IntentMatch = None) -> Optional[str]:
         """Extract order number from text"""
-        for pattern in self.ORDER_PATTERNS:
-            match = re.search(pattern, text)
-            if match:
-                order_num = match.group()
-                logger.info(f"📦 Extracted order number: {order_num}")
-                return order_num
-        return None
+        order_num = (match or intent_matcher.match(text)).first_order_number
+        if order_num:
+            logger.info(f"📦 Extracted order number: {order_num}")
+        return order_num
     
-    def handle_order_query(self, text: str, user_id: str) -> Dict[str, any]:
+    def handle_order_query(self, text: str, user_id: str, match: IntentMatch = None) -> Dict[str, any]:
         """
         Generate order response
         Returns dict with 'message' and 'waiting_for_number' flag
         """
-        order_num = self.extract_order_number(text)
+        order_num = self.extract_order_number(text, match)
         
         if order_num:
             # Clear waiting state
-            self.pending_order_requests[user_id] = False
+            self.clear_waiting_state(user_id)
             
             return {
                 "message": (
@@ -85,7 +83,7 @@ class OrderHandler:
             }
         else:
             # Set waiting state
-            self.pending_order_requests[user_id] = True
+            self.store.get_or_create(user_id).waiting_for_order = True
             
             return {
                 "message": (
@@ -100,7 +98,13 @@ class OrderHandler:
                 "waiting_for_number": True
             }
     
+    def is_waiting(self, user_id: str) -> bool:
+        """Whether we asked this user for an order number"""
+        session = self.store.get(user_id)
+        return bool(session and session.waiting_for_order)
+    
     def clear_waiting_state(self, user_id: str):
         """Clear waiting state for user"""
-        if user_id in self.pending_order_requests:
-            self.pending_order_requests[user_id] = False
+        session = self.store.get(user_id)
+        if session:
+            session.waiting_for_order = False
@@ -0,0 +1,355 @@
+"""
+Bounded per-user session state.
+
+All per-user state (conversation history, operational memory, the
+"waiting for order number" flag) lives in one SessionState per user.
+Sessions are kept in LRU order and evicted when idle longer than the TTL
+or when the session cap is reached, so memory stays flat no matter how
+many distinct users the bot has seen.
+
+Expired sessions are also dropped by a periodic sweep (run_sweeper) that
+the bot starts with its other background tasks, so users who never come
+back do not hold memory until the cap is reached.
+
+Two backends share one interface (get / get_or_create / discard / load /
+flush / sweep / get_stats):
+- BoundedSessionStore keeps sessions in process memory only.
+- SQLiteSessionStore additionally persists them in a shared SQLite
+  database (WAL mode), so any worker process can serve a user's next
+  message. Each message costs one read (load) and one write (flush).
+  Rows carry a version: flush() only replaces the version load() saw,
+  so a concurrent write from another worker is kept, not overwritten.
+
+Code on the event loop uses the async variants (aload / aflush / asweep /
+aget_stats), which run the SQLite backend in a worker thread.
+"""
+
+import asyncio
+import collections
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from telegram_agent.config.settings import settings
+from telegram_agent.infrastructure.utils.logger import logger
+
+
+class HistoryEntry:
+    """One query/response exchange"""
+
+    __slots__ = ("query", "response", "confidence", "timestamp")
+
+    def __init__(self, query: str, response: str, confidence: float, timestamp: float = None):
+        self.query = query
+        self.response = response
+        self.confidence = confidence
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+
+class SessionState:
+    """Everything the bot keeps about one user"""
+
+    __slots__ = ("history", "memory", "waiting_for_order", "last_seen")
+
+    def __init__(self, max_history: int):
+        self.history = collections.deque(maxlen=max_history)
+        self.memory: Optional[Dict[str, Any]] = None  # created on first save
+        self.waiting_for_order = False
+        self.last_seen = time.monotonic()
+
+    def to_dict(self) -> dict:
+        return {
+            "history": [
+                [entry.query, entry.response, entry.confidence, entry.timestamp]
+                for entry in self.history
+            ],
+            "memory": self.memory,
+            "waiting_for_order": self.waiting_for_order
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, max_history: int) -> "SessionState":
+        session = cls(max_history)
+        session.history.extend(HistoryEntry(*entry) for entry in data.get("history", ()))
+        session.memory = data.get("memory")
+        session.waiting_for_order = bool(data.get("waiting_for_order"))
+        return session
+
+
+class BoundedSessionStore:
+    """LRU session map with idle-TTL expiry and a session cap"""
+
+    # True when load/flush/sweep/get_stats do I/O and must leave the event loop
+    blocking = False
+
+    def __init__(self, max_sessions: int = None, idle_ttl: float = None, max_history: int = None):
+        self.max_sessions = max_sessions or settings.SESSION_MAX_USERS
+        self.idle_ttl = idle_ttl if idle_ttl is not None else settings.SESSION_IDLE_TTL_SECONDS
+        self.max_history = max_history or settings.MAX_CONVERSATION_HISTORY
+        self._sessions: "collections.OrderedDict[str, SessionState]" = collections.OrderedDict()
+        # Tools run in executor threads, so guard the map
+        self._lock = threading.Lock()
+        self.evicted_idle = 0
+        self.evicted_capacity = 0
+
+    def _expired(self, session: SessionState, now: float) -> bool:
+        return bool(self.idle_ttl) and now - session.last_seen > self.idle_ttl
+
+    def _expire_idle(self, now: float):
+        # Sessions are kept in last-access order, so expired ones sit at the front
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if not self._expired(oldest, now):
+                break
+            self._sessions.popitem(last=False)
+            self.evicted_idle += 1
+
+    def get(self, user_id: str) -> Optional[SessionState]:
+        """Return the user's live session (refreshing it), or None"""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None:
+                return None
+            if self._expired(session, now):
+                del self._sessions[user_id]
+                self.evicted_idle += 1
+                return None
+            session.last_seen = now
+            self._sessions.move_to_end(user_id)
+            return session
+
+    def get_or_create(self, user_id: str) -> SessionState:
+        """Return the user's session, creating it (and evicting others) if needed"""
+        session = self.get(user_id)
+        if session is not None:
+            return session
+
+        now = time.monotonic()
+        with self._lock:
+            self._expire_idle(now)
+            session = SessionState(self.max_history)
+            self._sessions[user_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted_capacity += 1
+            return session
+
+    def discard(self, user_id: str):
+        with self._lock:
+            self._sessions.pop(user_id, None)
+
+    def load(self, user_id: str):
+        """Refresh the user's session from the backend (no-op in memory)"""
+
+    def flush(self, user_id: str) -> bool:
+        """Write the user's session to the backend (no-op in memory)"""
+        return True
+
+    def sweep(self) -> int:
+        """Evict idle sessions now; returns how many were removed"""
+        with self._lock:
+            before = self.evicted_idle
+            self._expire_idle(time.monotonic())
+            removed = self.evicted_idle - before
+        if removed:
+            logger.debug("Evicted %d idle sessions", removed, category="session")
+        return removed
+
+    async def _offload(self, fn, *args):
+        if self.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def aload(self, user_id: str):
+        await self._offload(self.load, user_id)
+
+    async def aflush(self, user_id: str) -> bool:
+        return await self._offload(self.flush, user_id)
+
+    async def asweep(self) -> int:
+        return await self._offload(self.sweep)
+
+    async def aget_stats(self) -> dict:
+        return await self._offload(self.get_stats)
+
+    async def run_sweeper(self, interval: float = None):
+        """Call sweep() every `interval` seconds until cancelled"""
+        interval = interval if interval is not None else settings.SESSION_SWEEP_INTERVAL_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.asweep()
+            except Exception as e:
+                logger.warning(f"⚠️ Session sweep failed: {e}")
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_stats(self) -> dict:
+        return {
+            "resident": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "evicted_idle": self.evicted_idle,
+            "evicted_capacity": self.evicted_capacity
+        }
+
+
+class SQLiteSessionStore(BoundedSessionStore):
+    """Sessions shared between worker processes through SQLite (WAL)
+
+    The in-process map is a working copy: load() replaces it with the
+    stored row at the start of a message and flush() writes it back once
+    the message is handled. flush() is a compare-and-set on the row
+    version load() saw; without a successful load() it writes nothing.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, max_sessions: int = None, idle_ttl: float = None,
+                 max_history: int = None):
+        super().__init__(max_sessions, idle_ttl, max_history)
+        self.path = path
+        self._local = threading.local()
+        # user_id -> row version seen by the last load() (None: no row yet)
+        self._loaded: Dict[str, Optional[int]] = {}
+        self.loads = 0
+        self.flushes = 0
+        self.conflicts = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " user_id TEXT PRIMARY KEY,"
+            " state TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 0"
+            ") WITHOUT ROWID"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+        if "version" not in columns:
+            conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at)"
+        )
+        logger.info(f"✅ SQLite session store ready: {path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not thread-safe
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def load(self, user_id: str):
+        """Replace the local copy with the stored session (one SELECT)"""
+        with self._lock:
+            # A failed load must not leave an earlier version for flush() to write over
+            self._loaded.pop(user_id, None)
+        row = self._conn().execute(
+            "SELECT state, updated_at, version FROM sessions WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        self.loads += 1
+
+        with self._lock:
+            self._sessions.pop(user_id, None)
+            if row is None:
+                self._loaded[user_id] = None
+                return
+            state, updated_at, version = row
+            self._loaded[user_id] = version
+            if self.idle_ttl and time.time() - updated_at > self.idle_ttl:
+                return
+            self._sessions[user_id] = SessionState.from_dict(json.loads(state), self.max_history)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted_capacity += 1
+
+    def flush(self, user_id: str) -> bool:
+        """Persist the local copy if the row is still the version load() saw.
+
+        One UPDATE (INSERT for a new session, DELETE if the session is
+        gone). Returns False, keeping the stored row, when there was no
+        successful load() or another worker wrote the row since; the
+        local copy is then dropped so the next load() picks up theirs.
+        """
+        with self._lock:
+            if user_id not in self._loaded:
+                logger.warning(f"⚠️ Session {user_id} was not loaded; not writing it back")
+                return False
+            expected = self._loaded.pop(user_id)
+            session = self._sessions.get(user_id)
+            state = json.dumps(session.to_dict(), ensure_ascii=False) if session else None
+
+        conn = self._conn()
+        if state is None:
+            if expected is not None:
+                conn.execute(
+                    "DELETE FROM sessions WHERE user_id = ? AND version = ?", (user_id, expected)
+                )
+            written = True
+        else:
+            now = time.time()
+            written = expected is not None and conn.execute(
+                "UPDATE sessions SET state = ?, updated_at = ?, version = version + 1 "
+                "WHERE user_id = ? AND version = ?",
+                (state, now, user_id, expected)
+            ).rowcount == 1
+            if not written:
+                # New session, or the row we loaded was swept meanwhile
+                written = conn.execute(
+                    "INSERT INTO sessions (user_id, state, updated_at, version) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(user_id) DO NOTHING",
+                    (user_id, state, now, (expected or 0) + 1)
+                ).rowcount == 1
+
+        if not written:
+            with self._lock:
+                self._sessions.pop(user_id, None)
+                self.conflicts += 1
+            logger.warning(f"⚠️ Session {user_id} was changed by another worker; kept their version")
+            return False
+        self.flushes += 1
+        return True
+
+    def discard(self, user_id: str):
+        super().discard(user_id)
+        self._conn().execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+
+    def sweep(self) -> int:
+        removed = super().sweep()
+        if self.idle_ttl:
+            self._conn().execute(
+                "DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.idle_ttl,)
+            )
+        return removed
+
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        stats["stored"] = self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        stats["loads"] = self.loads
+        stats["flushes"] = self.flushes
+        stats["conflicts"] = self.conflicts
+        return stats
+
+
+def create_session_store() -> BoundedSessionStore:
+    """Build the session store selected by SESSION_BACKEND"""
+    if settings.SESSION_BACKEND == "sqlite":
+        try:
+            return SQLiteSessionStore(settings.SESSION_DB_PATH)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ SQLite session store unavailable, using in-memory sessions: {e}")
+    return BoundedSessionStore()
+
+
+# Shared store used by the context and order handlers
+session_store = create_session_store()
@@ -0,0 +1,178 @@
+"""
+Single-pass intent matcher used for routing.
+
+Keywords are compiled into an Aho-Corasick automaton and order-number
+patterns into one combined regex, so a message is scanned once no matter
+how many synonyms are configured.
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from telegram_agent.config import intents
+
+
+@dataclass
+class KeywordHit:
+    """A keyword occurrence; start/end index the lowercased text (IntentMatch.lowered)"""
+    intent: str
+    keyword: str
+    start: int
+    end: int
+
+
+@dataclass
+class OrderNumberHit:
+    value: str
+    start: int
+    end: int
+    priority: int
+
+
+@dataclass
+class IntentMatch:
+    """Everything the router needs to know about one message"""
+    keyword_hits: List[KeywordHit] = field(default_factory=list)
+    order_numbers: List[OrderNumberHit] = field(default_factory=list)
+    text: str = ""
+    # text.lower(), which keyword offsets refer to; it can be longer than text ('İ')
+    lowered: str = ""
+
+    @property
+    def intents(self) -> Set[str]:
+        found = {hit.intent for hit in self.keyword_hits}
+        if self.order_numbers:
+            found.add(intents.ORDER_INTENT)
+        return found
+
+    @property
+    def info_intents(self) -> Set[str]:
+        return {hit.intent for hit in self.keyword_hits if hit.intent != intents.ORDER_INTENT}
+
+    @property
+    def word_hits(self) -> List[KeywordHit]:
+        """Keyword hits that are whole words ('open' in "opened" or "closet" is not)"""
+        return [hit for hit in self.keyword_hits if is_whole_word(self.lowered, hit)]
+
+    @property
+    def has_order_keyword(self) -> bool:
+        return any(hit.intent == intents.ORDER_INTENT for hit in self.keyword_hits)
+
+    @property
+    def has_order_number(self) -> bool:
+        return bool(self.order_numbers)
+
+    @property
+    def first_order_number(self) -> Optional[str]:
+        """Order number by pattern priority (ORD- before # before bare digits)"""
+        if not self.order_numbers:
+            return None
+        return min(self.order_numbers, key=lambda hit: (hit.priority, hit.start)).value
+
+
+_HEBREW_LETTER = re.compile(r"[\u0590-\u05FF]")
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def is_whole_word(text: str, hit: KeywordHit) -> bool:
+    """True if `hit` spans whole words of `text`.
+
+    Latin keywords need a word boundary on both sides (like regex \\b).
+    Hebrew keywords may also follow up to three prefix letters at the
+    start of a word ("הפעילות", "ובמשלוח").
+    """
+    if hit.end < len(text) and _is_word_char(text[hit.end]):
+        return False
+    start = hit.start
+    if _HEBREW_LETTER.match(hit.keyword[0]):
+        while start > 0 and hit.start - start < 3 and text[start - 1] in intents.HEBREW_PREFIXES:
+            start -= 1
+    return start == 0 or not _is_word_char(text[start - 1])
+
+
+class AhoCorasick:
+    """Multi-keyword substring search in one pass over the text"""
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        # keywords: keyword -> intents it signals
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, Tuple[str, ...]]]] = [[]]
+
+        for keyword, keyword_intents in keywords.items():
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((keyword, tuple(keyword_intents)))
+
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str, Tuple[str, ...]]]:
+        """Yield (start, end, keyword, intents) for every occurrence, overlaps included"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword, keyword_intents in output[state]:
+                yield position - len(keyword) + 1, position + 1, keyword, keyword_intents
+
+
+class IntentMatcher:
+    """Precompiled keyword automaton plus combined order-number regex"""
+
+    def __init__(self, info_keywords: Dict[str, List[str]],
+                 order_keywords: List[str], order_patterns: List[str]):
+        keyword_intents: Dict[str, List[str]] = {}
+        for intent, keywords in info_keywords.items():
+            for keyword in keywords:
+                keyword_intents.setdefault(keyword.lower(), []).append(intent)
+        for keyword in order_keywords:
+            keyword_intents.setdefault(keyword.lower(), []).append(intents.ORDER_INTENT)
+        self._automaton = AhoCorasick(keyword_intents)
+
+        self._order_regex = re.compile(
+            "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(order_patterns))
+        )
+
+    @classmethod
+    def from_config(cls) -> "IntentMatcher":
+        return cls(intents.INFO_KEYWORDS, intents.ORDER_KEYWORDS, intents.ORDER_PATTERNS)
+
+    def match(self, text: str) -> IntentMatch:
+        lowered = text.lower()
+        result = IntentMatch(text=text, lowered=lowered)
+        for start, end, keyword, keyword_intents in self._automaton.iter_matches(lowered):
+            for intent in keyword_intents:
+                result.keyword_hits.append(KeywordHit(intent, keyword, start, end))
+        for found in self._order_regex.finditer(text):
+            priority = int(found.lastgroup[1:])
+            result.order_numbers.append(OrderNumberHit(found.group(), found.start(), found.end(), priority))
+        return result
+
+
+# Shared matcher compiled from config/intents.py
+intent_matcher = IntentMatcher.from_config()
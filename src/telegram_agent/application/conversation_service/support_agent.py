@@ -3,55 +3,150 @@
 # Main support agent logic
 # ========================================
 
+import asyncio
+import threading
 import time
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional
 
 from telegram_agent.config.settings import settings
-from telegram_agent.application.rag_indexing_service.rag import RAGEngine
+from telegram_agent.application.conversation_service.intent_matcher import IntentMatch, intent_matcher
 from telegram_agent.application.conversation_service.handlers.order_handler import OrderHandler
 from telegram_agent.application.conversation_service.handlers.context_handler import ContextHandler
 from telegram_agent.application.conversation_service.handlers.fallback_handler import FallbackHandler
+from telegram_agent.application.conversation_service.handlers.language_handler import (
+    current_language, language_handler
+)
 from telegram_agent.infrastructure.utils.logger import logger
-from telegram_agent.application.conversation_service.workflow.agent import agent as langchain_agent, run_agent_query
+from telegram_agent.infrastructure.utils.metrics import RequestTimer, stage
+from telegram_agent.infrastructure.utils.rate_limiter import rate_limit_errors
+from telegram_agent.application.conversation_service.workflow.tools import dispatch_direct
+from telegram_agent.application.conversation_service.workflow.agent import (
+    agent_runner, arun_agent_query, get_agent
+)
+
+if TYPE_CHECKING:
+    from telegram_agent.application.rag_indexing_service.rag import RAGEngine
 
 class SupportAgent:
-    """Customer support agent"""
+    """Customer support agent.
+
+    The RAG engine (knowledge base, vector store, embedding client) and the
+    LangChain agent are built by warm_up() or on first use, so constructing
+    a SupportAgent is cheap. Until then `rag` is None.
+    """
     
     def __init__(self):
-        self.rag = RAGEngine()
+        self.rag: Optional["RAGEngine"] = None
+        self._rag_lock = threading.Lock()
         self.order_handler = OrderHandler()
         self.context_handler = ContextHandler()
+        self.session_store = self.context_handler.store
         self.fallback_handler = FallbackHandler()
-        self.langchain_agent = langchain_agent
-        
-        # Load knowledge base
-        self.rag.load_knowledge_base()
+        self.agent_runner = agent_runner
         
         logger.info("✅ Support agent initialized")
+
+    @property
+    def langchain_agent(self):
+        return get_agent()
+
+    def _build_rag(self) -> "RAGEngine":
+        with self._rag_lock:
+            if self.rag is None:
+                from telegram_agent.application.rag_indexing_service.rag import RAGEngine
+                self.rag = RAGEngine()
+        return self.rag
+
+    async def get_rag(self) -> "RAGEngine":
+        """The RAG engine, built off the event loop if it doesn't exist yet"""
+        if self.rag is None:
+            await asyncio.to_thread(self._build_rag)
+        return self.rag
+
+    async def _warm_up_once(self):
+        rag = await self.get_rag()
+        # RAGEngine logs a failed knowledge-base load and carries on without it
+        if rag.kb_version is None and not await asyncio.to_thread(rag.load_knowledge_base):
+            raise RuntimeError("knowledge base could not be loaded")
+        await asyncio.to_thread(get_agent)
+
+    async def warm_up(self, retry_delay: float = None, max_retry_delay: float = None):
+        """Build the RAG engine and the LangChain agent ahead of the first message.
+
+        Retries with exponential backoff until both are built, so a worker
+        started while OpenAI or the vector store is unavailable still
+        becomes ready once they are back.
+        """
+        delay = settings.WARM_UP_RETRY_SECONDS if retry_delay is None else retry_delay
+        max_delay = settings.WARM_UP_RETRY_MAX_SECONDS if max_retry_delay is None else max_retry_delay
+        started = time.perf_counter()
+        attempt = 1
+        while True:
+            try:
+                await self._warm_up_once()
+                break
+            except Exception as e:
+                logger.error(
+                    f"❌ Warm-up attempt {attempt} failed, retrying in {delay:.0f}s: {e}",
+                    exc_info=attempt == 1
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
+            attempt += 1
+        logger.info(f"🔥 Warm-up finished in {int((time.perf_counter() - started) * 1000)}ms")
     
-    async def process_message(self, query: str, user_id: str, platform: str = "telegram") -> Dict[str, Any]:
+    async def process_message(self, query: str, user_id: str, platform: str = "telegram",
+                              on_partial: Optional[Callable[[str], Awaitable[None]]] = None) -> Dict[str, Any]:
         """Process user message with intelligent routing.
         
         Routes queries to:
         1. LangChain Agent (for orders, working hours, shipping, refunds, FAQ, contact)
         2. RAG Engine (for general knowledge base queries)
+        
+        RAG answers are streamed to `on_partial` (text so far) when given.
         """
         start_time = time.time()
+        timer = RequestTimer()
+        route = "error"
+        loaded = False
         logger.log_query(user_id, query, platform)
 
         try:
+            # One read of the user's shared session state per message
+            with stage("session"):
+                await self.session_store.aload(user_id)
+            loaded = True
+
+            with stage("routing"):
+                # Single pass over the text for all routing decisions
+                match = intent_matcher.match(query)
+
+                # Resolve the language once; tools and RAG prompts reuse it
+                language = language_handler.resolve(query, user_id)
+                current_language.set(language)
+
+                use_agent = self._should_use_agent(query, user_id, match)
+
             # Check if this is an agent-handled query (orders or info)
-            if self._should_use_agent(query, user_id):
+            if use_agent:
                 logger.info(f"🤖 Routing to LangChain agent: {query[:50]}...")
-                result = await self._handle_agent_query(query, user_id, start_time)
+                result = await self._handle_agent_query(query, user_id, start_time, match)
             else:
                 # RAG query flow for general knowledge
                 logger.info(f"📚 Routing to RAG engine: {query[:50]}...")
                 self.order_handler.clear_waiting_state(user_id)
-                result = await self._handle_rag_query(query, user_id, platform, start_time)
+                result = await self._handle_rag_query(
+                    query, user_id, platform, start_time, language, on_partial
+                )
 
+            route = result["status"]
             return result
 
+        except rate_limit_errors() as e:
+            logger.warning(f"🚦 Shedding query for {user_id}: {e}")
+            route = "rate_limited"
+            return self._rate_limited_result(user_id, start_time)
+
         except Exception as e:
             logger.log_error(user_id, e, "process_message")
             return {
@@ -60,8 +155,18 @@ class SupportAgent:
                 "status": "error",
                 "sources_used": 0
             }
+        finally:
+            try:
+                # ...and one write, so the next message can land on any worker.
+                # Never after a failed load: the local copy may be stale
+                if loaded:
+                    with stage("session"):
+                        await self.session_store.aflush(user_id)
+            except Exception as e:
+                logger.log_error(user_id, e, "session_flush")
+            timer.finish(route)
 
-    def _should_use_agent(self, query: str, user_id: str) -> bool:
+    def _should_use_agent(self, query: str, user_id: str, match: IntentMatch = None) -> bool:
         """Determine if query should be handled by LangChain agent.
         
         Agent handles:
@@ -71,39 +176,30 @@ class SupportAgent:
         - Refund policy
         - FAQ
         - Support contact
+        
+        Keywords live in config/intents.py.
         """
-        query_lower = query.lower()
+        match = match or intent_matcher.match(query)
         
         # Check for order queries
-        if self.order_handler.is_order_query(query, user_id):
+        if self.order_handler.is_order_query(query, user_id, match):
             return True
         
         # Check for info tool keywords
-        info_keywords = [
-            # Working hours
-            "שעות", "פעילות", "פתוח", "סגור", "hours", "open", "close",
-            # Shipping
-            "משלוח", "delivery", "shipping", "הגעה", "זמן אספקה",
-            # Refund
-            "החזר", "זיכוי", "ביטול", "refund", "return", "cancel",
-            # FAQ
-            "שאלות", "נפוצות", "faq", "שאלה",
-            # Contact
-            "קשר", "תמיכה", "שירות", "contact", "support", "help"
-        ]
-        
-        return any(keyword in query_lower for keyword in info_keywords)
+        return bool(match.info_intents)
     
-    async def _handle_agent_query(self, query: str, user_id: str, start_time: float) -> Dict[str, Any]:
+    async def _handle_agent_query(self, query: str, user_id: str, start_time: float,
+                                  match: IntentMatch = None) -> Dict[str, Any]:
         """Handle queries using LangChain agent (orders + info tools)."""
+        match = match or intent_matcher.match(query)
         try:
             # Check if waiting for order number
-            if self.order_handler.is_order_query(query, user_id):
-                order_num = self.order_handler.extract_order_number(query)
+            if self.order_handler.is_order_query(query, user_id, match):
+                order_num = self.order_handler.extract_order_number(query, match)
                 
                 if not order_num:
                     # Ask for order number
-                    order_result = self.order_handler.handle_order_query(query, user_id)
+                    order_result = self.order_handler.handle_order_query(query, user_id, match)
                     result = {
                         "answer": order_result["message"],
                         "confidence": 1.0,
@@ -118,9 +214,30 @@ class SupportAgent:
                     )
                     return result
             
-            # Use LangChain agent
+            # Unambiguous intent: call the tool directly, skip the ReAct loop
+            with stage("tool"):
+                direct = dispatch_direct(match, query, user_id) if settings.DIRECT_TOOL_DISPATCH else None
+            if direct:
+                intent, answer = direct
+                self.order_handler.clear_waiting_state(user_id)
+                result = {
+                    "answer": answer,
+                    "confidence": 1.0,
+                    "status": "direct_tool",
+                    "sources_used": 1
+                }
+                
+                latency_ms = int((time.time() - start_time) * 1000)
+                logger.log_response(
+                    user_id, result["confidence"], result["status"],
+                    latency_ms, result["sources_used"]
+                )
+                return result
+            
+            # Use LangChain agent (ambiguous or multi-intent queries)
             logger.info(f"🤖 Calling LangChain agent with: {query[:50]}...")
-            agent_response = run_agent_query(query)
+            with stage("agent"):
+                agent_response = await arun_agent_query(query)
             
             if agent_response:
                 # Clear order waiting state if successful
@@ -150,6 +267,26 @@ class SupportAgent:
             )
             
             return result
+
+        except asyncio.TimeoutError:
+            result = {
+                "answer": self.fallback_handler.get("api_timeout"),
+                "confidence": 0.0,
+                "status": "agent_timeout",
+                "sources_used": 0
+            }
+
+            latency_ms = int((time.time() - start_time) * 1000)
+            logger.log_response(
+                user_id, result["confidence"], result["status"],
+                latency_ms, result["sources_used"]
+            )
+
+            return result
+
+        except rate_limit_errors() as e:
+            logger.warning(f"🚦 Shedding agent query for {user_id}: {e}")
+            return self._rate_limited_result(user_id, start_time)
             
         except Exception as e:
             logger.error(f"Error in agent query handling: {e}", exc_info=True)
@@ -170,14 +307,34 @@ class SupportAgent:
             
             return result
 
-    async def _handle_rag_query(self, query: str, user_id: str, platform: str, start_time: float) -> Dict[str, Any]:
+    def _rate_limited_result(self, user_id: str, start_time: float) -> Dict[str, Any]:
+        """Fast answer when the OpenAI rate limit can't admit the call in time"""
+        result = {
+            "answer": self.fallback_handler.get("rate_limit"),
+            "confidence": 0.0,
+            "status": "rate_limited",
+            "sources_used": 0
+        }
+
+        latency_ms = int((time.time() - start_time) * 1000)
+        logger.log_response(
+            user_id, result["confidence"], result["status"],
+            latency_ms, result["sources_used"]
+        )
+
+        return result
+
+    async def _handle_rag_query(self, query: str, user_id: str, platform: str, start_time: float,
+                                language: str = None,
+                                on_partial: Optional[Callable[[str], Awaitable[None]]] = None) -> Dict[str, Any]:
         """Handle RAG-based queries"""
         # Add conversation context
         context = self.context_handler.get_context(user_id)
         enhanced_query = f"{context}\n\n{query}" if context else query
 
         # RAG flow
-        search_results = await self.rag.search(enhanced_query)
+        rag = await self.get_rag()
+        search_results, query_embedding = await rag.search_with_embedding(enhanced_query)
 
         if not search_results:
             result = {
@@ -187,7 +344,9 @@ class SupportAgent:
                 "sources_used": 0
             }
         else:
-            result = await self.rag.generate_answer(query, search_results)
+            result = await rag.generate_answer(
+                query, search_results, language, on_partial, query_embedding=query_embedding
+            )
 
         # Save to context
         self.context_handler.add_message(
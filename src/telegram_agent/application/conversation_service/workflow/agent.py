@@ -1,9 +1,16 @@
-"""LangChain Agent with integrated tools for order status and info queries."""
+"""LangChain Agent with integrated tools for order status and info queries.
 
-from langchain.tools import Tool
-from langchain_openai import ChatOpenAI
-from langchain.agents import initialize_agent, AgentType
-from typing import Optional
+The agent is built on first use (get_agent()) or by SupportAgent.warm_up(),
+not at import: importing langchain and building the executor takes seconds,
+and paths like /start or direct tool dispatch never need it. `tools`, `llm`
+and `agent` are still available as module attributes and are built when
+first accessed.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable, List, Optional
 
 from telegram_agent.application.conversation_service.workflow.order_tools import order_status_tool
 from telegram_agent.application.conversation_service.workflow.info_tools import (
@@ -11,55 +18,83 @@ from telegram_agent.application.conversation_service.workflow.info_tools import
 )
 from telegram_agent.config.strings import info_strings
 from telegram_agent.config.settings import settings
+from telegram_agent.infrastructure.clients.llm_backend import create_chat_model
 from telegram_agent.infrastructure.utils.logger import logger
+from telegram_agent.infrastructure.utils.rate_limiter import rate_limit_errors
 
-tools = [
-    Tool(
-        name="Order Status Checker",
-        func=order_status_tool,
-        description=info_strings.ORDER_STATUS_DESC
-    ),
-    Tool(
-        name="Working Hours Info",
-        func=get_working_hours,
-        description=info_strings.WORKING_HOURS_DESC
-    ),
-    Tool(
-        name="Shipping Info",
-        func=get_shipping_info,
-        description=info_strings.SHIPPING_DESC
-    ),
-    Tool(
-        name="Refund Policy",
-        func=get_refund_policy,
-        description=info_strings.REFUND_DESC
-    ),
-    Tool(
-        name="FAQ Helper",
-        func=get_faq,
-        description=info_strings.FAQ_DESC
-    ),
-    Tool(
-        name="Support Contact",
-        func=get_support_contact,
-        description=info_strings.SUPPORT_DESC
-    )
-]
-
-llm = ChatOpenAI(
-    model=settings.LLM_MODEL,
-    temperature=0,
-    openai_api_key=settings.OPENAI_API_KEY
-)
 
-agent = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True,
-    handle_parsing_errors=True,
-    max_iterations=3
-)
+def build_tools() -> List[Any]:
+    from langchain.tools import Tool
+
+    return [
+        Tool(
+            name="Order Status Checker",
+            func=order_status_tool,
+            description=info_strings.ORDER_STATUS_DESC
+        ),
+        Tool(
+            name="Working Hours Info",
+            func=get_working_hours,
+            description=info_strings.WORKING_HOURS_DESC
+        ),
+        Tool(
+            name="Shipping Info",
+            func=get_shipping_info,
+            description=info_strings.SHIPPING_DESC
+        ),
+        Tool(
+            name="Refund Policy",
+            func=get_refund_policy,
+            description=info_strings.REFUND_DESC
+        ),
+        Tool(
+            name="FAQ Helper",
+            func=get_faq,
+            description=info_strings.FAQ_DESC
+        ),
+        Tool(
+            name="Support Contact",
+            func=get_support_contact,
+            description=info_strings.SUPPORT_DESC
+        )
+    ]
+
+
+# Built once, on first use, by whichever thread gets there first
+_components: dict = {}
+_build_lock = threading.Lock()
+
+
+def get_agent():
+    """The shared LangChain agent executor, built on first call (thread-safe)"""
+    if "agent" not in _components:
+        with _build_lock:
+            if "agent" not in _components:
+                from langchain.agents import initialize_agent, AgentType
+
+                started = time.perf_counter()
+                tools = build_tools()
+                # Shares the LLM_MODEL rate limiter with LLMManager
+                llm = create_chat_model(settings.LLM_MODEL, temperature=0)
+                _components.update(tools=tools, llm=llm, agent=initialize_agent(
+                    tools=tools,
+                    llm=llm,
+                    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+                    verbose=True,
+                    handle_parsing_errors=True,
+                    max_iterations=3
+                ))
+                logger.info(f"✅ LangChain agent built in {int((time.perf_counter() - started) * 1000)}ms")
+    return _components["agent"]
+
+
+def __getattr__(name: str):
+    # `from ...workflow.agent import agent` keeps working, it just builds the agent
+    if name in ("tools", "llm", "agent"):
+        get_agent()
+        return _components[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def run_agent_query(query: str) -> Optional[str]:
     """Run a query through the LangChain agent with error handling.
@@ -72,7 +107,7 @@ def run_agent_query(query: str) -> Optional[str]:
     """
     try:
         logger.info(f"🤖 Running agent query: {query[:50]}...")
-        response = agent.run(query)
+        response = get_agent().run(query)
         logger.info(f"✅ Agent response received (length: {len(response)})")
         return response
     except Exception as e:
@@ -80,6 +115,130 @@ def run_agent_query(query: str) -> Optional[str]:
         return None
 
 
+class AsyncAgentRunner:
+    """Run the LangChain agent from async code without blocking the event loop.
+
+    Calls are limited to `max_concurrency` at a time and bounded by
+    `timeout` seconds, which covers both queueing and execution. Without
+    an `executor`, `factory` builds one (off the event loop) on first run.
+    """
+
+    def __init__(self, executor, max_concurrency: int, timeout: float,
+                 factory: Optional[Callable[[], Any]] = None):
+        self.executor = executor
+        self.factory = factory
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._build: Optional[asyncio.Future] = None
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def run(self, query: str) -> Optional[str]:
+        """Run a query; returns None on agent error.
+
+        Raises asyncio.TimeoutError on timeout, and RateLimitExceeded or
+        openai.RateLimitError when the model's rate limit can't admit the
+        call in time or the server still answers 429 after retries.
+        """
+        try:
+            return await asyncio.wait_for(self._run_limited(query), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"⏱️ Agent query timed out after {self.timeout}s: {query[:50]}...")
+            raise
+
+    async def _run_limited(self, query: str) -> Optional[str]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        enqueued_at = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        wait = time.monotonic() - enqueued_at
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.in_flight += 1
+        try:
+            executor = self.executor or await self._build_executor()
+            logger.info(f"🤖 Running agent query (waited {int(wait * 1000)}ms): {query[:50]}...")
+            response = await executor.arun(query)
+            self.completed += 1
+            logger.info(f"✅ Agent response received (length: {len(response)})")
+            return response
+        except rate_limit_errors() as e:
+            self.rate_limited += 1
+            logger.warning(f"🚦 Agent query rejected: {e}")
+            raise
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ Agent error: {e}", exc_info=True)
+            return None
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def _build_executor(self):
+        # One build shared by every query waiting for it; a failed build is retried
+        if self._build is None:
+            self._build = asyncio.ensure_future(asyncio.to_thread(self.factory))
+        build = self._build
+        try:
+            self.executor = await asyncio.shield(build)
+        finally:
+            if build.done() and self._build is build:
+                self._build = None
+        return self.executor
+
+    def get_stats(self) -> dict:
+        """Get queue and execution statistics"""
+        started = self.completed + self.errors + self.in_flight
+        return {
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "completed": self.completed,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "rate_limited": self.rate_limited,
+            "avg_wait_ms": (self.total_wait / started * 1000) if started else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+agent_runner = AsyncAgentRunner(
+    None,
+    max_concurrency=settings.AGENT_MAX_CONCURRENCY,
+    timeout=settings.AGENT_TIMEOUT_SECONDS,
+    factory=get_agent
+)
+
+
+async def arun_agent_query(query: str) -> Optional[str]:
+    """Async variant of run_agent_query for use from the Telegram handlers.
+
+    Returns:
+        Agent response string or None if error
+
+    Raises:
+        asyncio.TimeoutError: if the query exceeded AGENT_TIMEOUT_SECONDS
+        RateLimitExceeded: if the model's rate limit couldn't admit the call in time
+        openai.RateLimitError: if OpenAI kept answering 429 after the SDK's retries
+    """
+    return await agent_runner.run(query)
+
+
 if __name__ == "__main__":
     # Test queries
     print("\n" + "="*60)
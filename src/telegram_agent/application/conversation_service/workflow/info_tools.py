@@ -1,17 +1,21 @@
 from telegram_agent.config.strings import info_strings
-from langdetect import detect
+from telegram_agent.application.conversation_service.handlers.language_handler import (
+    LanguageHandler, current_language, language_handler
+)
 
 
 def get_localized_answer(answer_he: str, answer_en: str, user_input: str) -> str:
-    """Return Hebrew or English answer based on detected language."""
-    try:
-        if user_input and detect(user_input) == "he":
-            return answer_he
-        else:
+    """Return Hebrew or English answer based on detected language.
+
+    Uses the language already resolved for the current message when
+    available, so repeated tool calls don't re-detect.
+    """
+    language = current_language.get()
+    if language is None:
+        if not user_input:
             return answer_en
-    except Exception:
-        # Default to Hebrew if detection fails
-        return answer_he
+        language = language_handler.resolve(user_input)
+    return answer_he if language == LanguageHandler.HEBREW else answer_en
 
 
 def get_working_hours(input: str = None) -> str:
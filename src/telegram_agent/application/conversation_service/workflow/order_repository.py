@@ -0,0 +1,92 @@
+"""
+In-memory order index over the knowledge base file.
+
+The file is parsed once into a dict keyed by order_id and re-parsed only
+when its mtime or size changes; the new index replaces the old one in a
+single reference swap, so concurrent readers never see a partial index.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from telegram_agent.config.settings import settings
+from telegram_agent.infrastructure.utils.logger import logger
+
+
+class OrderRepository:
+    """O(1) order lookups backed by the knowledge base JSON"""
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.KNOWLEDGE_BASE_PATH
+        self._index: Dict[str, dict] = {}
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    @staticmethod
+    def normalize_order_id(order_id) -> str:
+        """Strip the ORD- / # prefixes users type around order numbers"""
+        return str(order_id).replace("ORD-", "").replace("#", "").strip()
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._stamp is None:
+                return
+            # Same lock as a reload, so a reload in progress can't republish the old index
+            with self._lock:
+                if self._stamp is not None:
+                    logger.warning(f"⚠️ Order source {self.path} disappeared, clearing index")
+                    self._index, self._stamp = {}, None
+            return
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return
+
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                # Keep serving the previous index; retry on the next lookup
+                logger.warning(f"⚠️ Failed to reload orders from {self.path}: {e}")
+                return
+
+            index = {
+                self.normalize_order_id(item["order_id"]): item
+                for item in data
+                if isinstance(item, dict) and item.get("order_id")
+            }
+            self._index = index
+            self._stamp = stamp
+            self.reloads += 1
+            logger.info(f"📦 Order index loaded: {len(index)} orders")
+
+    def get(self, order_id) -> Optional[dict]:
+        """Look up a single order record"""
+        self._refresh()
+        return self._index.get(self.normalize_order_id(order_id))
+
+    def get_many(self, order_ids: Iterable) -> Dict[str, Optional[dict]]:
+        """Look up several orders at once; missing orders map to None"""
+        self._refresh()
+        index = self._index
+        result = {}
+        for order_id in order_ids:
+            clean_id = self.normalize_order_id(order_id)
+            result[clean_id] = index.get(clean_id)
+        return result
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._index)
+
+
+# Shared instance used by the order tools
+order_repository = OrderRepository()
@@ -1,10 +1,9 @@
 # tools/order_tools.py
 
-import json
-from pathlib import Path
-from telegram_agent.config.settings import settings
 from telegram_agent.infrastructure.utils.logger import logger
+from telegram_agent.application.conversation_service.intent_matcher import intent_matcher
 from telegram_agent.application.conversation_service.handlers.context_handler import ContextHandler
+from telegram_agent.application.conversation_service.workflow.order_repository import order_repository
 
 # כאן תניח שיש instance אחד, מאורגן בגלובלי/Singleton ב-agent הראשי
 context = ContextHandler()
@@ -25,28 +24,22 @@ def order_status_tool(order_id=None, user_id=None) -> str:
         # שמירת מספר הזמנה בזיכרון לשיחה
         context.save(user_id, "last_order_id", order_id)
 
+        # כמה מספרי הזמנה בהודעה אחת – שליפה מרוכזת
+        order_ids = [hit.value for hit in intent_matcher.match(str(order_id)).order_numbers]
+        if len(order_ids) > 1:
+            return _bulk_order_status(order_ids)
+
         # ניקוי (לכל מקרה – כדי למנוע כפילויות)
-        clean_order_id = order_id.replace("ORD-", "").replace("#", "").strip()
+        clean_order_id = order_repository.normalize_order_id(order_id)
         
-        # טעינת בסיס הידע
-        kb_path = settings.KNOWLEDGE_BASE_PATH
-        if Path(kb_path).exists():
-            with open(kb_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # חיפוש במידע
-            for item in data:
-                if item.get("order_id") == clean_order_id:
-                    logger.info(f"✅ Found order {clean_order_id} in knowledge base")
-                    return item.get("content", f"מצאתי הזמנה {clean_order_id} אך אין פרטים זמינים.")
+        # חיפוש באינדקס ההזמנות (נטען מחדש רק כשהקובץ משתנה)
+        item = order_repository.get(clean_order_id)
+        if item is not None:
+            logger.info(f"✅ Found order {clean_order_id} in knowledge base")
+            return item.get("content", f"מצאתי הזמנה {clean_order_id} אך אין פרטים זמינים.")
 
         logger.warning(f"⚠️ Order {clean_order_id} not found in knowledge base")
-        return (
-            f"❌ הזמנה מספר {clean_order_id} לא נמצאה במערכת.\n"
-            "אנא ודא שהמספר נכון או פנה לשירות הלקוחות:\n"
-            "📧 support@company.com\n"
-            "📞 03-1234567"
-        )
+        return _order_not_found(clean_order_id)
         
     except Exception as e:
         logger.error(f"Error in order_status_tool: {e}", exc_info=True)
@@ -54,3 +47,41 @@ def order_status_tool(order_id=None, user_id=None) -> str:
             f"😔 מצטער, נתקלתי בבעיה בבדיקת ההזמנה {order_id}.\n"
             "אנא נסה שוב או פנה לשירות הלקוחות."
         )
+
+
+def orders_status_tool(order_ids, user_id=None) -> str:
+    """
+    Status for several order numbers from one message, in one bulk lookup.
+    """
+    try:
+        if user_id:
+            context.save(user_id, "last_order_id", order_ids[0])
+        return _bulk_order_status(order_ids)
+    except Exception as e:
+        logger.error(f"Error in orders_status_tool: {e}", exc_info=True)
+        return (
+            f"😔 מצטער, נתקלתי בבעיה בבדיקת ההזמנות {', '.join(order_ids)}.\n"
+            "אנא נסה שוב או פנה לשירות הלקוחות."
+        )
+
+
+def _order_not_found(order_id: str) -> str:
+    return (
+        f"❌ הזמנה מספר {order_id} לא נמצאה במערכת.\n"
+        "אנא ודא שהמספר נכון או פנה לשירות הלקוחות:\n"
+        "📧 support@company.com\n"
+        "📞 03-1234567"
+    )
+
+
+def _bulk_order_status(order_ids) -> str:
+    """Status for several orders mentioned in one message"""
+    records = order_repository.get_many(order_ids)
+    logger.info(f"📦 Bulk order lookup: {len(records)} orders, {sum(r is not None for r in records.values())} found")
+    parts = []
+    for clean_id, item in records.items():
+        if item is None:
+            parts.append(_order_not_found(clean_id))
+        else:
+            parts.append(item.get("content", f"מצאתי הזמנה {clean_id} אך אין פרטים זמינים."))
+    return "\n\n".join(parts)
@@ -0,0 +1,109 @@
+"""
+Direct tool dispatch that bypasses the ReAct agent.
+
+When the intent matcher is confident about exactly one intent (or the
+message carries an order number and nothing else), the matching tool is
+called directly. The agent is reserved for ambiguous or multi-intent
+messages.
+
+Only whole-word keyword hits count, and a single info intent is only
+dispatched when the match is strong: two or more of its keywords agree,
+or its keywords cover at least DIRECT_DISPATCH_MIN_COVERAGE of the
+message's content words. "Is support for PayPal available?" mentions
+'support' but isn't asking for the contact details, so it goes to the
+agent.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from telegram_agent.application.conversation_service.intent_matcher import IntentMatch, KeywordHit
+from telegram_agent.application.conversation_service.workflow.info_tools import (
+    get_working_hours, get_shipping_info, get_refund_policy, get_faq, get_support_contact
+)
+from telegram_agent.application.conversation_service.workflow.order_tools import (
+    order_status_tool, orders_status_tool
+)
+from telegram_agent.config import intents
+from telegram_agent.config.settings import settings
+from telegram_agent.infrastructure.utils.logger import logger
+
+_WORD_RE = re.compile(r"\w+")
+
+INTENT_TOOLS: Dict[str, Callable[[str], str]] = {
+    "hours": get_working_hours,
+    "shipping": get_shipping_info,
+    "refund": get_refund_policy,
+    "faq": get_faq,
+    "contact": get_support_contact,
+}
+
+
+def _dominant_hits(hits: List[KeywordHit]) -> List[KeywordHit]:
+    """Drop hits nested inside a longer keyword (e.g. 'משלוח' inside 'משלוח שלי')"""
+    return [
+        hit for hit in hits
+        if not any(
+            other is not hit
+            and other.start <= hit.start and hit.end <= other.end
+            and (other.end - other.start) > (hit.end - hit.start)
+            for other in hits
+        )
+    ]
+
+
+def is_strong_match(match: IntentMatch, hits: List[KeywordHit]) -> bool:
+    """Do `hits` (one intent's) carry the message, rather than appear in passing?"""
+    if len({hit.keyword for hit in hits}) >= 2:
+        return True
+    words = [
+        word for word in _WORD_RE.finditer(match.lowered)
+        if word.group() not in intents.STOP_WORDS and not word.group().isdigit()
+    ]
+    if not words:
+        return True
+    covered = [
+        word for word in words
+        if any(hit.start < word.end() and word.start() < hit.end for hit in hits)
+    ]
+    return len(covered) / len(words) >= settings.DIRECT_DISPATCH_MIN_COVERAGE
+
+
+def select_direct_tool(match: IntentMatch) -> Optional[str]:
+    """Return the single intent to dispatch directly, or None if ambiguous or weak"""
+    hits = _dominant_hits(match.word_hits)
+    found = {hit.intent for hit in hits}
+    info = found - {intents.ORDER_INTENT}
+
+    if match.has_order_number:
+        return intents.ORDER_INTENT if not info else None
+    if intents.ORDER_INTENT in found:
+        # Order keyword without a number is handled by the order flow
+        return None
+    if len(info) == 1:
+        intent = next(iter(info))
+        if is_strong_match(match, [hit for hit in hits if hit.intent == intent]):
+            return intent
+    return None
+
+
+def dispatch_direct(match: IntentMatch, query: str, user_id: str = None) -> Optional[Tuple[str, str]]:
+    """Call the tool for an unambiguous intent.
+
+    Returns:
+        (intent, tool output) or None if the agent should handle the query
+    """
+    intent = select_direct_tool(match)
+    if intent is None:
+        return None
+
+    if intent == intents.ORDER_INTENT:
+        order_ids = [hit.value for hit in match.order_numbers]
+        if len(order_ids) > 1:
+            logger.info(f"⚡ Direct dispatch: order status for {len(order_ids)} orders")
+            return intent, orders_status_tool(order_ids, user_id)
+        logger.info(f"⚡ Direct dispatch: order status for {match.first_order_number}")
+        return intent, order_status_tool(match.first_order_number, user_id)
+
+    logger.info(f"⚡ Direct dispatch: {intent}")
+    return intent, INTENT_TOOLS[intent](query)
@@ -0,0 +1,221 @@
+"""
+Persistent embedding store shared across restarts and worker processes.
+
+Vectors are kept in SQLite (WAL mode) as packed float32 blobs, keyed by
+(embedding model, hash of the normalized text). WAL lets many processes
+read while one writes; least-recently-used rows are evicted once the
+store grows beyond its size budget.
+
+Reads never write: access times of hits are collected in memory and
+written in one UPDATE together with the next put, before eviction, or
+once TOUCH_FLUSH_SIZE hashes or TOUCH_FLUSH_SECONDS have accumulated.
+Calls block on SQLite, so async callers run them in a worker thread.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from telegram_agent.infrastructure.utils.logger import logger
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+
+
+class PersistentEmbeddingStore:
+    """SQLite-backed embedding store with size-based LRU eviction"""
+
+    # Check the size budget after this many written rows
+    EVICTION_CHECK_INTERVAL = 256
+    # Write collected access times after this many hashes or seconds
+    TOUCH_FLUSH_SIZE = 512
+    TOUCH_FLUSH_SECONDS = 60.0
+
+    def __init__(self, path: str, model: str, max_bytes: int):
+        self.path = path
+        self.model = model
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes_since_check = 0
+        self._write_lock = threading.Lock()
+        self.evicted = 0
+        # text_hash -> last access time, not yet written
+        self._pending_touch: Dict[str, float] = {}
+        self._touch_lock = threading.Lock()
+        self._touch_flushed_at = time.monotonic()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " text_hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL,"
+                " PRIMARY KEY (model, text_hash)"
+                ") WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access "
+                "ON embeddings (last_access)"
+            )
+        logger.info(f"✅ Persistent embedding store ready: {path}")
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Canonical form used for hashing (NFC, collapsed whitespace)"""
+        return unicodedata.normalize("NFC", " ".join(text.split()))
+
+    @classmethod
+    def key(cls, text: str) -> str:
+        return hashlib.sha256(cls.normalize(text).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def pack(vector: List[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def unpack(blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not thread-safe
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        """Fetch stored vectors for the given text hashes"""
+        hashes = list(hashes)
+        found: Dict[str, List[float]] = {}
+        conn = self._conn()
+        for start in range(0, len(hashes), _SQL_BATCH):
+            chunk = hashes[start:start + _SQL_BATCH]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT text_hash, vector FROM embeddings "
+                f"WHERE model = ? AND text_hash IN ({placeholders})",
+                [self.model, *chunk]
+            ).fetchall()
+            for text_hash, blob in rows:
+                found[text_hash] = self.unpack(blob)
+        if found:
+            self._touch(list(found))
+        return found
+
+    def _touch(self, hashes: List[str]):
+        now = time.time()
+        with self._touch_lock:
+            for text_hash in hashes:
+                self._pending_touch[text_hash] = now
+            due = (
+                len(self._pending_touch) >= self.TOUCH_FLUSH_SIZE
+                or time.monotonic() - self._touch_flushed_at >= self.TOUCH_FLUSH_SECONDS
+            )
+        if due:
+            self.flush_access_times()
+
+    def _take_pending_touch(self) -> Dict[str, float]:
+        with self._touch_lock:
+            pending, self._pending_touch = self._pending_touch, {}
+            self._touch_flushed_at = time.monotonic()
+        return pending
+
+    def flush_access_times(self):
+        """Write collected access times; best effort, skipped if the database is busy"""
+        pending = self._take_pending_touch()
+        if not pending:
+            return
+        conn = self._conn()
+        try:
+            with self._write_lock:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._write_access_times(conn, pending)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.OperationalError as e:
+            # Access times only order eviction; never fail a read because of them
+            logger.debug(f"Skipped embedding access-time update: {e}")
+
+    def _write_access_times(self, conn: sqlite3.Connection, pending: Dict[str, float]):
+        conn.executemany(
+            "UPDATE embeddings SET last_access = MAX(last_access, ?) WHERE model = ? AND text_hash = ?",
+            [(accessed, self.model, text_hash) for text_hash, accessed in pending.items()]
+        )
+
+    def put_many(self, vectors: Dict[str, List[float]]):
+        """Store vectors keyed by text hash"""
+        if not vectors:
+            return
+        now = time.time()
+        rows = []
+        for text_hash, vector in vectors.items():
+            blob = self.pack(vector)
+            rows.append((self.model, text_hash, blob, len(blob), now))
+        pending = self._take_pending_touch()
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings "
+                    "(model, text_hash, vector, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                # Piggyback the collected access times on this transaction
+                self._write_access_times(conn, pending)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._writes_since_check += len(rows)
+            if self._writes_since_check >= self.EVICTION_CHECK_INTERVAL:
+                self._writes_since_check = 0
+                self._evict()
+
+    def _evict(self):
+        """Drop least-recently-used rows until the store is under 90% of its budget"""
+        conn = self._conn()
+        total, count = conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM embeddings"
+        ).fetchone()
+        if total <= self.max_bytes or not count:
+            return
+        excess = total - int(self.max_bytes * 0.9)
+        to_delete = min(count, -(-excess * count // total))
+        conn.execute(
+            "DELETE FROM embeddings WHERE (model, text_hash) IN ("
+            " SELECT model, text_hash FROM embeddings ORDER BY last_access LIMIT ?)",
+            (to_delete,)
+        )
+        self.evicted += to_delete
+        logger.info(f"🧹 Evicted {to_delete} embeddings from persistent store ({total} bytes > {self.max_bytes})")
+
+    def clear(self):
+        """Remove all vectors for this model"""
+        with self._write_lock:
+            self._conn().execute("DELETE FROM embeddings WHERE model = ?", (self.model,))
+
+    def get_stats(self) -> dict:
+        count, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings WHERE model = ?",
+            (self.model,)
+        ).fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes, "evicted": self.evicted}
@@ -1,64 +1,271 @@
-from functools import lru_cache
-from typing import List
-import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import collections
+import threading
 
+from telegram_agent.application.rag_indexing_service.embedding_store import PersistentEmbeddingStore
 from telegram_agent.application.rag_indexing_service.llm import LLMManager
+from telegram_agent.config.settings import settings
 from telegram_agent.infrastructure.utils.logger import logger
+from telegram_agent.infrastructure.clients.llm_backend import get_embedding_backend
+from telegram_agent.infrastructure.utils.rate_limiter import NO_DEADLINE, estimate_tokens
+from telegram_agent.infrastructure.utils.single_flight import SingleFlight, ThreadSingleFlight
 
 class EmbeddingCache:
-    """Simple caching for embeddings"""
-    
+    """Two-tier embedding cache: in-memory LRU in front of a persistent store.
+
+    The async methods only touch the in-memory tier on the event loop;
+    persistent store reads and writes (SQLite, possibly waiting on another
+    process's lock) run in a worker thread.
+    """
+
     def __init__(self, llm_manager: LLMManager):
         self.llm_manager = llm_manager
         self.embeddings = llm_manager.get_embeddings()
         self.cache_hits = 0
         self.cache_misses = 0
+        self.disk_hits = 0
+        self.max_cache_size = settings.EMBEDDING_CACHE_SIZE
+        self._cache = collections.OrderedDict()
+        # Chroma may call embed_query from worker threads
+        self._lock = threading.Lock()
+        # Identical concurrent misses share one API call
+        self._inflight = SingleFlight()
+        self._thread_inflight = ThreadSingleFlight()
+        self.store = self._open_store()
+        self.rate_limiter = get_embedding_backend().rate_limiter(settings.EMBEDDING_MODEL)
         logger.info("✅ Embedding cache initialized")
-    
-    @lru_cache(maxsize=1000)
-    def _get_cached_embedding(self, text_hash: str, text: str) -> List[float]:
-        """Cached embedding retrieval"""
-        self.cache_misses += 1
-        return self.embeddings.embed_query(text)
-    
+
+    @staticmethod
+    def _open_store() -> Optional[PersistentEmbeddingStore]:
+        if not settings.EMBEDDING_STORE_PATH:
+            return None
+        try:
+            return PersistentEmbeddingStore(
+                settings.EMBEDDING_STORE_PATH,
+                model=settings.EMBEDDING_MODEL,
+                max_bytes=settings.EMBEDDING_STORE_MAX_MB * 1024 * 1024
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Persistent embedding store disabled: {e}")
+            return None
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return PersistentEmbeddingStore.key(text)
+
+    def _lookup(self, text_hash: str) -> Optional[List[float]]:
+        result = self._lookup_memory(text_hash)
+        if result is None and self.store:
+            result = self._lookup_store([text_hash]).get(text_hash)
+        return result
+
+    def _lookup_memory(self, text_hash: str) -> Optional[List[float]]:
+        with self._lock:
+            if text_hash not in self._cache:
+                return None
+            self._cache.move_to_end(text_hash)
+            self.cache_hits += 1
+            result = self._cache[text_hash]
+        logger.debug("💾 Cache hit for query (total hits: %d)", self.cache_hits, category="embedding_cache")
+        return result
+
+    def _lookup_store(self, hashes: List[str]) -> Dict[str, List[float]]:
+        try:
+            found = self.store.get_many(hashes)
+        except Exception as e:
+            logger.warning(f"⚠️ Persistent embedding lookup failed: {e}")
+            return {}
+        for text_hash, vector in found.items():
+            self._remember(text_hash, vector)
+        with self._lock:
+            self.cache_hits += len(found)
+            self.disk_hits += len(found)
+        return found
+
+    def _remember(self, text_hash: str, embedding: List[float]):
+        with self._lock:
+            self._cache[text_hash] = embedding
+            self._cache.move_to_end(text_hash)
+            if len(self._cache) > self.max_cache_size:
+                self._cache.popitem(last=False)
+
+    def _store(self, vectors: Dict[str, List[float]]):
+        for text_hash, embedding in vectors.items():
+            self._remember(text_hash, embedding)
+        if self.store:
+            try:
+                self.store.put_many(vectors)
+            except Exception as e:
+                logger.warning(f"⚠️ Persistent embedding write failed: {e}")
+
+    async def _astore(self, vectors: Dict[str, List[float]]):
+        if self.store:
+            await asyncio.to_thread(self._store, vectors)
+        else:
+            self._store(vectors)
+
     def embed_query(self, text: str) -> List[float]:
         """Get embedding with caching"""
-        # Create hash of text for cache key
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        
-        # Try cache
-        result = self._get_cached_embedding(text_hash, text)
-        
-        # Check if it was cache hit
-        info = self._get_cached_embedding.cache_info()
-        if info.hits > self.cache_hits:
-            self.cache_hits = info.hits
-            logger.debug(f"💾 Cache hit for query (total hits: {self.cache_hits})")
-        
+        text_hash = self._key(text)
+        result = self._lookup(text_hash)
+        if result is None:
+            result = self._thread_inflight.do(text_hash, lambda: self._embed_miss(text, text_hash))
+        return result
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Get embedding with caching (async)"""
+        text_hash = self._key(text)
+        result = self._lookup_memory(text_hash)
+        if result is None and self.store:
+            result = (await asyncio.to_thread(self._lookup_store, [text_hash])).get(text_hash)
+        if result is None:
+            result = await self._inflight.do(text_hash, lambda: self._aembed_miss(text, text_hash))
+        return result
+
+    def _embed_miss(self, text: str, text_hash: str) -> List[float]:
+        with self._lock:
+            self.cache_misses += 1
+        if self.rate_limiter:
+            self.rate_limiter.acquire_sync(estimate_tokens(text))
+        result = self.embeddings.embed_query(text)
+        self._store({text_hash: result})
+        return result
+
+    async def _aembed_miss(self, text: str, text_hash: str) -> List[float]:
+        with self._lock:
+            self.cache_misses += 1
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(estimate_tokens(text))
+        result = await self.embeddings.aembed_query(text)
+        await self._astore({text_hash: result})
         return result
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """Get embeddings for a list of documents with caching (synchronous)"""
-        return [self.embed_query(text) for text in texts]
+        """Get embeddings for a list of documents with caching (synchronous).
+
+        Cache misses are embedded in batches, several batches in parallel.
+        """
+        results, misses = self._split_hits(texts)
+        batches = self._make_batches(misses)
+        if batches:
+            workers = min(settings.EMBEDDING_MAX_PARALLEL_BATCHES, len(batches))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed-batch") as pool:
+                vectors = pool.map(self._embed_batch, batches)
+                for batch, batch_vectors in zip(batches, vectors):
+                    self._merge_batch(batch, batch_vectors, results)
+        return results
 
-    async def aembed_documents(self, texts: list) -> list:
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
         """Get embeddings for a list of documents with caching (async)"""
-        return [self.embed_query(text) for text in texts]
+        if self.store:
+            results, misses = await asyncio.to_thread(self._split_hits, texts)
+        else:
+            results, misses = self._split_hits(texts)
+        batches = self._make_batches(misses)
+        semaphore = asyncio.Semaphore(settings.EMBEDDING_MAX_PARALLEL_BATCHES)
+
+        async def embed_batch(batch):
+            async with semaphore:
+                texts = [text for _, text, _ in batch]
+                if self.rate_limiter:
+                    # Indexing waits for capacity rather than failing
+                    await self.rate_limiter.acquire(self._batch_tokens(texts), max_wait=NO_DEADLINE)
+                return await self.embeddings.aembed_documents(texts)
+
+        vectors = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        stored = {}
+        for batch, batch_vectors in zip(batches, vectors):
+            stored.update(self._merge_batch(batch, batch_vectors, results, store=False))
+        await self._astore(stored)
+        return results
+
+    def _split_hits(self, texts: List[str]):
+        """Fill results from cache; return unique misses as (hash, text, positions)"""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        misses: Dict[str, Tuple[str, List[int]]] = {}
+        for i, text in enumerate(texts):
+            text_hash = self._key(text)
+            if text_hash in misses:
+                misses[text_hash][1].append(i)
+                continue
+            cached = self._lookup_memory(text_hash)
+            if cached is not None:
+                results[i] = cached
+            else:
+                misses[text_hash] = (text, [i])
+        if misses and self.store:
+            for text_hash, vector in self._lookup_store(list(misses)).items():
+                for i in misses.pop(text_hash)[1]:
+                    results[i] = vector
+        with self._lock:
+            self.cache_misses += len(misses)
+        if misses:
+            logger.debug("💾 Embedding %d uncached of %d documents", len(misses), len(texts))
+        return results, [(h, text, positions) for h, (text, positions) in misses.items()]
+
+    def _embed_batch(self, batch: list) -> List[List[float]]:
+        texts = [text for _, text, _ in batch]
+        if self.rate_limiter:
+            # Indexing waits for capacity rather than failing
+            self.rate_limiter.acquire_sync(self._batch_tokens(texts), max_wait=NO_DEADLINE)
+        return self.embeddings.embed_documents(texts)
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        return estimate_tokens(text)
+
+    @classmethod
+    def _batch_tokens(cls, texts: List[str]) -> int:
+        return sum(cls._estimate_tokens(text) for text in texts)
+
+    def _make_batches(self, misses: list) -> list:
+        """Group misses into batches limited by size and estimated tokens"""
+        batches, current, current_tokens = [], [], 0
+        for item in misses:
+            tokens = self._estimate_tokens(item[1])
+            if current and (len(current) >= settings.EMBEDDING_BATCH_SIZE
+                            or current_tokens + tokens > settings.EMBEDDING_BATCH_MAX_TOKENS):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(item)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _merge_batch(self, batch: list, vectors: List[List[float]], results: list,
+                     store: bool = True) -> Dict[str, List[float]]:
+        for (_, _, positions), vector in zip(batch, vectors):
+            for i in positions:
+                results[i] = vector
+        merged = {text_hash: vector for (text_hash, _, _), vector in zip(batch, vectors)}
+        if store:
+            self._store(merged)
+        return merged
 
     def get_stats(self) -> dict:
         """Get cache statistics"""
-        info = self._get_cached_embedding.cache_info()
-        return {
-            "hits": info.hits,
-            "misses": info.misses,
-            "size": info.currsize,
-            "max_size": info.maxsize
+        stats = {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._cache),
+            "max_size": self.max_cache_size,
+            "disk_hits": self.disk_hits,
+            "coalesced": self._inflight.shared + self._thread_inflight.shared
         }
-    
+        if self.store:
+            stats["disk"] = self.store.get_stats()
+        return stats
+
     def clear_cache(self):
         """Clear the cache"""
-        self._get_cached_embedding.cache_clear()
-        self.cache_hits = 0
-        self.cache_misses = 0
+        with self._lock:
+            self._cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.disk_hits = 0
+        if self.store:
+            self.store.clear()
         logger.info("🗑️ Embedding cache cleared")
-
@@ -0,0 +1,125 @@
+"""
+Content-addressed incremental indexing for Chroma collections.
+
+Every chunk gets a stable ID derived from its content, metadata and the
+embedding model, so re-running the indexer only embeds chunks that are new
+or changed and removes chunks that disappeared from the source.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Set
+
+from langchain.schema import Document
+from langchain.vectorstores import Chroma
+
+from telegram_agent.infrastructure.utils.logger import logger
+
+
+@dataclass
+class IndexSyncResult:
+    """Outcome of a single index synchronization"""
+    version: str
+    total: int
+    added: int
+    removed: int
+    unchanged: int
+
+
+def chunk_id(chunk: Document, embedding_model: str) -> str:
+    """Stable ID for a chunk: hash of content + metadata + embedding model"""
+    payload = json.dumps(
+        {
+            "content": chunk.page_content,
+            "metadata": chunk.metadata,
+            "model": embedding_model,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IncrementalIndexer:
+    """Keep a persisted Chroma collection in sync with a set of chunks"""
+
+    MANIFEST_SUFFIX = "_manifest.json"
+
+    def __init__(self, vector_store: Chroma, persist_directory: str,
+                 collection_name: str, embedding_model: str):
+        self.vector_store = vector_store
+        self.embedding_model = embedding_model
+        self.manifest_path = Path(persist_directory) / f"{collection_name}{self.MANIFEST_SUFFIX}"
+
+    def sync(self, chunks: List[Document]) -> IndexSyncResult:
+        """Embed and upsert new chunks, delete stale ones"""
+        current: Dict[str, Document] = {}
+        for chunk in chunks:
+            current.setdefault(chunk_id(chunk, self.embedding_model), chunk)
+
+        version = hashlib.sha256("".join(sorted(current)).encode()).hexdigest()
+        manifest = self._load_manifest()
+
+        # Fast path: nothing changed since the last run and the store agrees
+        if (manifest.get("version") == version
+                and manifest.get("count") == self._collection_count()):
+            logger.info(f"♻️ Index up to date ({len(current)} chunks, version {version[:12]})")
+            return IndexSyncResult(version, len(current), 0, 0, len(current))
+
+        stored = self._stored_ids()
+        to_add = [cid for cid in current if cid not in stored]
+        to_remove = [cid for cid in stored if cid not in current]
+
+        if to_remove:
+            self.vector_store.delete(ids=to_remove)
+        if to_add:
+            self.vector_store.add_documents([current[cid] for cid in to_add], ids=to_add)
+
+        self._save_manifest(version, sorted(current))
+
+        result = IndexSyncResult(
+            version=version,
+            total=len(current),
+            added=len(to_add),
+            removed=len(to_remove),
+            unchanged=len(current) - len(to_add),
+        )
+        logger.info(
+            f"📇 Index synced | Added: {result.added} | Removed: {result.removed} | "
+            f"Unchanged: {result.unchanged} | Version: {version[:12]}"
+        )
+        return result
+
+    def _collection_count(self) -> int:
+        return self.vector_store._collection.count()
+
+    def _stored_ids(self) -> Set[str]:
+        return set(self.vector_store.get(include=[])["ids"])
+
+    def _load_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable index manifest {self.manifest_path}: {e}")
+            return {}
+
+    def _save_manifest(self, version: str, ids: List[str]):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": version,
+                    "embedding_model": self.embedding_model,
+                    "count": len(ids),
+                    "chunks": ids,
+                },
+                f,
+            )
+        tmp_path.replace(self.manifest_path)
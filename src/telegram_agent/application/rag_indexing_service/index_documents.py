@@ -10,6 +10,7 @@ from langchain.vectorstores import Chroma
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 
+from telegram_agent.application.rag_indexing_service.incremental_index import IncrementalIndexer
 from telegram_agent.config.settings import settings
 from telegram_agent.infrastructure.utils.logger import logger
 
@@ -82,16 +83,22 @@ def index_documents():
         api_key=settings.OPENAI_API_KEY
     )
 
-    # Index into ChromaDB
+    # Index into ChromaDB (only new/changed chunks are embedded)
     logger.info("📤 Indexing into ChromaDB...")
     logger.info("   Persist directory: ./chroma_db")
     
-    vectorstore = Chroma.from_documents(
-        documents=all_splits,
-        embedding=embeddings,
+    vectorstore = Chroma(
+        collection_name="return_policy",
+        embedding_function=embeddings,
+        persist_directory="./chroma_db"
+    )
+    indexer = IncrementalIndexer(
+        vectorstore,
         persist_directory="./chroma_db",
-        collection_name="return_policy"
+        collection_name="return_policy",
+        embedding_model=settings.EMBEDDING_MODEL
     )
+    indexer.sync(all_splits)
 
     logger.info("✅ Documents indexed successfully!")
     
@@ -1,7 +1,11 @@
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from telegram_agent.application.rag_indexing_service.semantic_cache import SemanticAnswerCache
 from telegram_agent.config.settings import settings
+from telegram_agent.infrastructure.clients.llm_backend import create_chat_model, create_embeddings
 from telegram_agent.infrastructure.utils.logger import logger
+from telegram_agent.infrastructure.utils.single_flight import ChunkBroadcast, SingleFlight
 from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
 import collections
 import hashlib
 
@@ -9,42 +13,108 @@ class LLMManager:
     """Manage LLM interactions"""
     
     def __init__(self):
-        self.chat_model = ChatOpenAI(
-            model=settings.LLM_MODEL,
-            temperature=settings.LLM_TEMPERATURE,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        # From the configured backend; on OpenAI both share the per-model rate limiters
+        self.chat_model = create_chat_model(settings.LLM_MODEL, settings.LLM_TEMPERATURE)
+        self.embeddings = create_embeddings(settings.EMBEDDING_MODEL)
         
-        self.embeddings = OpenAIEmbeddings(
-            model=settings.EMBEDDING_MODEL,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
-        
-        logger.info(f"✅ LLM initialized: {settings.LLM_MODEL}")
+        logger.info(f"✅ LLM initialized: {settings.LLM_MODEL} ({settings.LLM_BACKEND})")
 
 
         self.answer_cache = collections.OrderedDict()
         self.max_cache_size = settings.LLM_CACHE_SIZE if hasattr(settings, "LLM_CACHE_SIZE") else 500
 
-    async def generate(self, prompt: str) -> str:
+        self.semantic_cache = SemanticAnswerCache(
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            near_miss_threshold=settings.SEMANTIC_CACHE_NEAR_MISS_THRESHOLD,
+            max_size=settings.SEMANTIC_CACHE_SIZE
+        ) if settings.SEMANTIC_CACHE_ENABLED else None
+
+        # Identical prompts in flight at the same time share one completion;
+        # a streamed one publishes its chunks for every waiter to replay
+        self._inflight = SingleFlight()
+        self._streams: Dict[str, ChunkBroadcast] = {}
+
+    async def generate(self, prompt: str, query: str = None,
+                       query_embedding: Optional[List[float]] = None,
+                       kb_version: Optional[str] = None,
+                       on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+                       language: Optional[str] = None) -> str:
+        """Generate an answer for the prompt.
+
+        When `query_embedding` is given, the semantic cache is consulted
+        first and the new answer is stored under it afterwards, tagged
+        with the answer `language` so it's only reused in that language.
+        When `on_token` is given, a cache miss is streamed and each chunk
+        is passed to it as it arrives; the complete text is still cached.
+        Concurrent calls with the same prompt share one completion. If the
+        first of them streams, every caller's `on_token` gets all chunks;
+        it's awaited in that caller's task, never in the shared one.
+        """
+        use_semantic = self.semantic_cache is not None and query_embedding is not None
+        if use_semantic:
+            cached = self.semantic_cache.lookup(query_embedding, kb_version, language)
+            if cached is not None:
+                return cached
+
         prompt_hash = hashlib.md5(prompt.encode()).hexdigest()
         if prompt_hash in self.answer_cache:
             self.answer_cache.move_to_end(prompt_hash)
-            logger.debug(f"LLM answer cache hit for prompt: {prompt[:30]}")
+            logger.debug("LLM answer cache hit for prompt: %s", prompt[:30], category="answer_cache")
             return self.answer_cache[prompt_hash]
 
+        def start():
+            stream = None
+            if on_token is not None:
+                stream = self._streams[prompt_hash] = ChunkBroadcast()
+            return self._complete(
+                prompt, prompt_hash, query,
+                query_embedding if use_semantic else None, kb_version, stream, language
+            )
+
         try:
-            response = await self.chat_model.ainvoke(prompt)
-            answer = response.content
-            self.answer_cache[prompt_hash] = answer
-            self.answer_cache.move_to_end(prompt_hash)
-            if len(self.answer_cache) > self.max_cache_size:
-                self.answer_cache.popitem(last=False)
-            return answer
+            flight = self._inflight.join(prompt_hash, start)
+            stream = self._streams.get(prompt_hash) if on_token is not None else None
+            if stream is not None:
+                await stream.follow(on_token)
+            return await asyncio.shield(flight)
         except Exception as e:
             logger.error(f"LLM generation error: {e}", exc_info=True)
             raise
 
+    async def _complete(self, prompt: str, prompt_hash: str, query: Optional[str],
+                        query_embedding: Optional[List[float]], kb_version: Optional[str],
+                        stream: Optional[ChunkBroadcast],
+                        language: Optional[str] = None) -> str:
+        """Call the chat model and fill the answer caches"""
+        if stream is None:
+            answer = (await self.chat_model.ainvoke(prompt)).content
+        else:
+            try:
+                async for chunk in self.chat_model.astream(prompt):
+                    if chunk.content:
+                        stream.publish(chunk.content)
+            finally:
+                stream.close()
+                if self._streams.get(prompt_hash) is stream:
+                    del self._streams[prompt_hash]
+            answer = "".join(stream.chunks)
+        self.answer_cache[prompt_hash] = answer
+        self.answer_cache.move_to_end(prompt_hash)
+        if len(self.answer_cache) > self.max_cache_size:
+            self.answer_cache.popitem(last=False)
+        if query_embedding is not None:
+            self.semantic_cache.store(query or prompt, query_embedding, answer, kb_version, language)
+        return answer
+
+    def get_cache_stats(self) -> dict:
+        """Get answer cache statistics"""
+        return {
+            "exact_size": len(self.answer_cache),
+            "exact_max_size": self.max_cache_size,
+            "coalesced": self._inflight.shared,
+            "semantic": self.semantic_cache.get_stats() if self.semantic_cache else None
+        }
+
     def get_embeddings(self):
         """Get embeddings instance"""
         return self.embeddings
@@ -1,14 +1,19 @@
 from langchain.vectorstores import Chroma
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
-from typing import List, Dict, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
 import json
 from pathlib import Path
 from telegram_agent.application.rag_indexing_service.embeddings import EmbeddingCache
+from telegram_agent.application.rag_indexing_service.incremental_index import IncrementalIndexer
+from telegram_agent.application.rag_indexing_service.retrieval import AsyncVectorRetriever
 from telegram_agent.application.rag_indexing_service.llm import LLMManager
 from telegram_agent.config.settings import settings
 from telegram_agent.config.strings import strings
 from telegram_agent.infrastructure.utils.logger import logger
+from telegram_agent.infrastructure.utils.metrics import stage
+from telegram_agent.infrastructure.utils.rate_limiter import rate_limit_errors
 
 class RAGEngine:
     """RAG (Retrieval Augmented Generation) engine"""
@@ -18,8 +23,9 @@ class RAGEngine:
         self.embedding_cache = EmbeddingCache(self.llm_manager)
         self.embeddings = self.embedding_cache
         self.vector_store = None
+        self.retriever = None
+        self.kb_version = None
 
-        
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=settings.CHUNK_SIZE,
             chunk_overlap=settings.CHUNK_OVERLAP
@@ -48,13 +54,27 @@ class RAGEngine:
                 for item in data
             ]
             
-            # Split and create vector store
+            # Split and sync only new/changed chunks into the vector store
             chunks = self.text_splitter.split_documents(documents)
-            self.vector_store = Chroma.from_documents(
-                documents=chunks,
-                embedding=self.embeddings,
-                persist_directory=settings.VECTOR_DB_PATH
+            if self.vector_store is None:
+                self.vector_store = Chroma(
+                    collection_name=settings.VECTOR_COLLECTION_NAME,
+                    embedding_function=self.embeddings,
+                    persist_directory=settings.VECTOR_DB_PATH
+                )
+                self.retriever = AsyncVectorRetriever(
+                    self.vector_store,
+                    self.embedding_cache,
+                    max_workers=settings.VECTOR_SEARCH_WORKERS
+                )
+            indexer = IncrementalIndexer(
+                self.vector_store,
+                persist_directory=settings.VECTOR_DB_PATH,
+                collection_name=settings.VECTOR_COLLECTION_NAME,
+                embedding_model=settings.EMBEDDING_MODEL
             )
+            sync_result = indexer.sync(chunks)
+            self.kb_version = sync_result.version
             
             logger.info(f"✅ Loaded {len(documents)} documents, {len(chunks)} chunks")
             return True
@@ -63,16 +83,28 @@ class RAGEngine:
             logger.error(f"Failed to load knowledge base: {e}", exc_info=True)
             return False
     
-    async def search(self, query: str, k: int = None) -> List[Dict[str, Any]]:
-        """Search in knowledge base"""
-        if not self.vector_store:
+    async def search(self, query: str, k: int = None,
+                     timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Search in knowledge base without blocking the event loop"""
+        results, _ = await self.search_with_embedding(query, k, timeout)
+        return results
+
+    async def search_with_embedding(self, query: str, k: int = None, timeout: Optional[float] = None
+                                    ) -> Tuple[List[Dict[str, Any]], Optional[List[float]]]:
+        """search(), plus the query embedding it used (None if the search failed).
+
+        Passing the embedding on to generate_answer() saves it a second
+        embedding call for the semantic cache key.
+        """
+        if not self.retriever:
             logger.warning("Vector store not initialized")
-            return []
+            return [], None
         
         k = k or settings.MAX_RETRIEVAL_RESULTS
+        timeout = timeout or settings.RAG_SEARCH_TIMEOUT_SECONDS
         
         try:
-            results = self.vector_store.similarity_search_with_score(query, k=k)
+            embedding, results = await self.retriever.search_with_embedding(query, k=k, timeout=timeout)
             
             return [
                 {
@@ -81,13 +113,26 @@ class RAGEngine:
                     "score": float(score)
                 }
                 for doc, score in results
-            ]
+            ], embedding
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Search exceeded {timeout}s deadline: {query[:50]}...")
+            return [], None
+        except rate_limit_errors():
+            raise
         except Exception as e:
             logger.error(f"Search error: {e}", exc_info=True)
-            return []
+            return [], None
     
-    async def generate_answer(self, query: str, context: List[Dict]) -> Dict[str, Any]:
-        """Generate answer from context"""
+    async def generate_answer(self, query: str, context: List[Dict], language: str = None,
+                              on_partial: Optional[Callable[[str], Awaitable[None]]] = None,
+                              query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Generate answer from context (in English if language == "en").
+
+        If `on_partial` is given, the answer is streamed: it is called with
+        the full text generated so far every time a new chunk arrives.
+        `query_embedding` (from search_with_embedding) keys the semantic
+        cache; without it the query is embedded here.
+        """
         if not context:
             return {
                 "answer": strings.RAG_NO_CONTEXT,
@@ -96,35 +141,44 @@ class RAGEngine:
                 "sources_used": 0
             }
         
-        # Build context
-        context_text = "\n\n".join([
-            strings.CONTEXT_SOURCE.format(index=i+1, content=doc['content'])
-            for i, doc in enumerate(context)
-        ])
-        
         # Calculate confidence
         avg_score = sum(doc['score'] for doc in context) / len(context)
         confidence = max(0, min(1, 1 - (avg_score / 2)))
         
-        # Generate answer
-        prompt = strings.RAG_PROMPT_TEMPLATE.format(
-            context_text=context_text,
-            query=query
-        )
+        prompt = self.build_prompt(query, context, language)
         
-        try:
-            answer = await self.llm_manager.generate(prompt)
+        # Determine status
+        if confidence >= settings.CONFIDENCE_HIGH:
+            status = "high_confidence"
+            emoji = strings.EMOJI_HIGH_CONFIDENCE
+        elif confidence >= settings.CONFIDENCE_MEDIUM:
+            status = "medium_confidence"
+            emoji = strings.EMOJI_MEDIUM_CONFIDENCE
+        else:
+            status = "low_confidence"
+            emoji = strings.EMOJI_LOW_CONFIDENCE
+        
+        on_token = None
+        if on_partial is not None:
+            streamed = f"{emoji} "
             
-            # Determine status
-            if confidence >= settings.CONFIDENCE_HIGH:
-                status = "high_confidence"
-                emoji = strings.EMOJI_HIGH_CONFIDENCE
-            elif confidence >= settings.CONFIDENCE_MEDIUM:
-                status = "medium_confidence"
-                emoji = strings.EMOJI_MEDIUM_CONFIDENCE
-            else:
-                status = "low_confidence"
-                emoji = strings.EMOJI_LOW_CONFIDENCE
+            async def on_token(token: str):
+                nonlocal streamed
+                streamed += token
+                await on_partial(streamed)
+        
+        try:
+            with stage("embedding"):
+                query_embedding = await self._semantic_key(query, query_embedding)
+            with stage("generation"):
+                answer = await self.llm_manager.generate(
+                    prompt,
+                    query=query,
+                    query_embedding=query_embedding,
+                    kb_version=self.kb_version,
+                    on_token=on_token,
+                    language=language
+                )
             
             return {
                 "answer": f"{emoji} {answer}",
@@ -133,6 +187,8 @@ class RAGEngine:
                 "sources_used": len(context)
             }
             
+        except rate_limit_errors():
+            raise
         except Exception as e:
             logger.error(f"Answer generation error: {e}", exc_info=True)
             return {
@@ -141,3 +197,29 @@ class RAGEngine:
                 "status": "error",
                 "sources_used": 0
             }
+
+    @staticmethod
+    def build_prompt(query: str, context: List[Dict], language: str = None) -> str:
+        """Answer prompt for `query` over the retrieved `context` documents"""
+        context_text = "\n\n".join([
+            strings.CONTEXT_SOURCE.format(index=i+1, content=doc['content'])
+            for i, doc in enumerate(context)
+        ])
+        template = strings.RAG_PROMPT_TEMPLATE_EN if language == "en" else strings.RAG_PROMPT_TEMPLATE
+        return template.format(
+            context_text=context_text,
+            query=query
+        )
+
+    async def _semantic_key(self, query: str,
+                            embedding: Optional[List[float]] = None) -> Optional[List[float]]:
+        """Query embedding for the semantic answer cache (None if disabled/unavailable)"""
+        if not self.llm_manager.semantic_cache:
+            return None
+        if embedding is not None:
+            return embedding
+        try:
+            return await self.embedding_cache.aembed_query(query)
+        except Exception as e:
+            logger.warning(f"⚠️ Semantic cache key unavailable: {e}")
+            return None
@@ -0,0 +1,62 @@
+"""
+Async retrieval adapter for the vector store.
+
+The query embedding is awaited on the event loop and the (blocking)
+Chroma/SQLite query runs on a dedicated thread pool, so concurrent RAG
+searches overlap instead of queuing behind each other.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Optional, Tuple
+
+from langchain.schema import Document
+from langchain.vectorstores import Chroma
+
+from telegram_agent.application.rag_indexing_service.embeddings import EmbeddingCache
+from telegram_agent.infrastructure.utils.logger import logger
+from telegram_agent.infrastructure.utils.metrics import stage
+
+
+class AsyncVectorRetriever:
+    """Non-blocking similarity search with an optional deadline"""
+
+    def __init__(self, vector_store: Chroma, embedding_cache: EmbeddingCache, max_workers: int):
+        self.vector_store = vector_store
+        self.embedding_cache = embedding_cache
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="vector-search"
+        )
+        logger.info(f"✅ Async vector retriever initialized (workers: {max_workers})")
+
+    async def search(self, query: str, k: int,
+                     timeout: Optional[float] = None) -> List[Tuple[Document, float]]:
+        """Return (document, distance) pairs for the query.
+
+        Raises asyncio.TimeoutError if the search does not finish within
+        `timeout` seconds; the pending embedding call is cancelled.
+        """
+        _, results = await self.search_with_embedding(query, k, timeout)
+        return results
+
+    async def search_with_embedding(self, query: str, k: int, timeout: Optional[float] = None
+                                    ) -> Tuple[List[float], List[Tuple[Document, float]]]:
+        """Like search(), but also returns the query embedding it used"""
+        return await asyncio.wait_for(self._search(query, k), timeout=timeout)
+
+    async def _search(self, query: str, k: int) -> Tuple[List[float], List[Tuple[Document, float]]]:
+        with stage("embedding"):
+            embedding = await self.embedding_cache.aembed_query(query)
+        loop = asyncio.get_running_loop()
+        with stage("vector_search"):
+            results = await loop.run_in_executor(
+                self._executor,
+                partial(self.vector_store.similarity_search_by_vector_with_relevance_scores, embedding, k=k)
+            )
+        return embedding, results
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,134 @@
+"""
+Semantic answer cache for RAG generation.
+
+Answers are stored with the embedding of the question that produced them,
+so paraphrases ("what are your hours" / "when are you open") can reuse an
+answer without calling the chat model. Entries are tied to the knowledge
+base version they were generated from and dropped when it changes. They
+are also tagged with the answer language: a query only matches answers
+in its own language, however close the embeddings are.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from telegram_agent.infrastructure.utils.logger import logger
+
+
+class SemanticAnswerCache:
+    """Cosine-similarity lookup over previously answered queries"""
+
+    def __init__(self, threshold: float, near_miss_threshold: float, max_size: int):
+        self.threshold = threshold
+        self.near_miss_threshold = near_miss_threshold
+        self.max_size = max_size
+        self.kb_version: Optional[str] = None
+
+        # Ring buffer of unit vectors; row i belongs to self._answers[i]
+        self._matrix: Optional[np.ndarray] = None
+        self._queries: List[str] = []
+        self._answers: List[str] = []
+        # Language id per row (see _language_id); compared as one vector op
+        self._languages: Optional[np.ndarray] = None
+        self._language_ids: Dict[Optional[str], int] = {}
+        self._next = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.near_misses = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self, kb_version: Optional[str]):
+        if kb_version != self.kb_version:
+            if self._answers:
+                logger.info(f"🧠 Knowledge base changed, dropping {len(self._answers)} cached answers")
+            self.clear()
+            self.kb_version = kb_version
+
+    def _language_id(self, language: Optional[str]) -> int:
+        return self._language_ids.setdefault(language, len(self._language_ids))
+
+    def lookup(self, embedding: List[float], kb_version: Optional[str],
+               language: Optional[str] = None) -> Optional[str]:
+        """Return a cached answer in `language` for a semantically equivalent query, if any"""
+        self._check_version(kb_version)
+        if not self._answers:
+            self.misses += 1
+            return None
+
+        vector = self._normalize(embedding)
+        if vector.shape[0] != self._matrix.shape[1]:
+            self.misses += 1
+            return None
+
+        similarities = self._matrix[:len(self._answers)] @ vector
+        other_language = self._languages[:len(self._answers)] != self._language_id(language)
+        similarities[other_language] = -np.inf
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity == -np.inf:
+            self.misses += 1
+            return None
+
+        if similarity >= self.threshold:
+            self.hits += 1
+            logger.debug(
+                "🧠 Semantic cache hit (%.3f) for: %s", similarity, self._queries[best][:30],
+                category="semantic_cache"
+            )
+            return self._answers[best]
+
+        if similarity >= self.near_miss_threshold:
+            self.near_misses += 1
+            logger.debug(
+                "🧠 Semantic cache near miss (%.3f) for: %s", similarity, self._queries[best][:30],
+                category="semantic_cache"
+            )
+        else:
+            self.misses += 1
+        return None
+
+    def store(self, query: str, embedding: List[float], answer: str, kb_version: Optional[str],
+              language: Optional[str] = None):
+        """Remember an answer (written in `language`) for the given query embedding"""
+        self._check_version(kb_version)
+        vector = self._normalize(embedding)
+        if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+            self.clear()
+            self._matrix = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+            self._languages = np.zeros(self.max_size, dtype=np.int16)
+
+        slot = self._next
+        self._matrix[slot] = vector
+        self._languages[slot] = self._language_id(language)
+        if slot < len(self._answers):
+            # Overwrite the oldest entry
+            self._queries[slot] = query
+            self._answers[slot] = answer
+        else:
+            self._queries.append(query)
+            self._answers.append(answer)
+        self._next = (slot + 1) % self.max_size
+
+    def clear(self):
+        self._matrix = None
+        self._languages = None
+        self._queries = []
+        self._answers = []
+        self._next = 0
+
+    def get_stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "near_misses": self.near_misses,
+            "size": len(self._answers),
+            "max_size": self.max_size,
+            "threshold": self.threshold
+        }
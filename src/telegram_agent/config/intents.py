@@ -0,0 +1,48 @@
+# ========================================
+# config/intents.py
+# Routing keywords and order-number patterns
+# ========================================
+
+"""
+Keywords and patterns used to route messages to the agent tools.
+Compiled once by the intent matcher; add synonyms here.
+"""
+
+# Info intents handled by the agent's info tools
+INFO_KEYWORDS = {
+    "hours": ["שעות", "פעילות", "פתוח", "סגור", "hours", "open", "close"],
+    "shipping": ["משלוח", "delivery", "shipping", "הגעה", "זמן אספקה"],
+    "refund": ["החזר", "החזרה", "החזרות", "זיכוי", "ביטול", "refund", "return", "cancel"],
+    "faq": ["שאלות", "נפוצות", "faq", "שאלה"],
+    "contact": ["קשר", "ליצור קשר", "יצירת קשר", "תמיכה", "שירות", "contact", "support", "help"],
+}
+
+ORDER_INTENT = "order"
+
+ORDER_KEYWORDS = [
+    "הזמנה", "מספר הזמנה", "הזמנה שלי",
+    "מעקב", "tracking", "order", "משלוח שלי",
+    "סטטוס", "סטאטוס", "איפה", "הגיע"
+]
+
+# Hebrew prefix letters (ו, ה, ב, ל, מ, ש, כ) that attach to a keyword
+# without breaking the word, e.g. "הפעילות", "ובמשלוח"
+HEBREW_PREFIXES = "והבלמשכ"
+
+# Words ignored when judging how much of a message a keyword covers
+STOP_WORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "to", "of", "for", "in", "on",
+    "at", "and", "or", "my", "your", "our", "you", "i", "me", "we", "it", "this", "that",
+    "what", "when", "how", "do", "does", "can", "could", "would", "please", "about",
+    "with", "there", "hi", "hello",
+    "מה", "של", "שלי", "שלכם", "שלך", "את", "על", "עם", "זה", "זו", "אני", "אתם",
+    "יש", "אין", "האם", "איך", "מתי", "כמה", "לי", "לכם", "אם", "גם", "או", "בבקשה",
+    "היי", "שלום",
+}
+
+# Order number formats, in extraction priority order
+ORDER_PATTERNS = [
+    r'ORD-\d{5,}',      # ORD-12345
+    r'#\d{5,}',         # #12345
+    r'\b\d{5,}\b'       # 12345 (5+ digits)
+]
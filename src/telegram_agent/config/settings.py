@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -13,11 +13,93 @@ class Settings(BaseSettings):
     LLM_TEMPERATURE: float = 0.3
     EMBEDDING_MODEL: str = "text-embedding-3-small"
     
+    # LLM serving backend: "openai", "openai_compatible" (vLLM, Ollama, ...) or "fake" (offline)
+    LLM_BACKEND: str = "openai"
+    LLM_BASE_URL: Optional[str] = None  # required for openai_compatible, e.g. http://localhost:8000/v1
+    LLM_API_KEY: Optional[str] = None  # openai_compatible only; OPENAI_API_KEY is never sent elsewhere
+    EMBEDDING_BACKEND: Optional[str] = None  # defaults to LLM_BACKEND
+    EMBEDDING_BASE_URL: Optional[str] = None  # defaults to LLM_BASE_URL when the backends match
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    EMBEDDING_TIMEOUT_SECONDS: float = 10.0
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_MAX_CONNECTIONS: int = 100  # per backend and model
+    LLM_MAX_RETRIES: int = 2
+    FAKE_LLM_LATENCY_SECONDS: float = 0.0  # fake backend: delay before the first token
+    FAKE_LLM_TOKENS_PER_SECOND: float = 0.0  # fake backend: 0 answers instantly
+    
     # RAG Settings
     CHUNK_SIZE: int = 500
     CHUNK_OVERLAP: int = 50
     MAX_RETRIEVAL_RESULTS: int = 3
     LLM_CACHE_SIZE: int = 500
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92
+    SEMANTIC_CACHE_NEAR_MISS_THRESHOLD: float = 0.85
+    SEMANTIC_CACHE_SIZE: int = 1000
+    EMBEDDING_CACHE_SIZE: int = 1000
+    EMBEDDING_BATCH_SIZE: int = 100
+    EMBEDDING_BATCH_MAX_TOKENS: int = 50000
+    EMBEDDING_MAX_PARALLEL_BATCHES: int = 4
+    EMBEDDING_STORE_PATH: Optional[str] = "./data/embedding_cache.sqlite3"
+    EMBEDDING_STORE_MAX_MB: int = 256
+    VECTOR_SEARCH_WORKERS: int = 4
+    RAG_SEARCH_TIMEOUT_SECONDS: float = 5.0
+    
+    # Agent Settings
+    AGENT_MAX_CONCURRENCY: int = 4
+    AGENT_TIMEOUT_SECONDS: float = 20.0
+    DIRECT_TOOL_DISPATCH: bool = True
+    DIRECT_DISPATCH_MIN_COVERAGE: float = 0.4  # share of content words a single keyword must cover
+    WARM_UP_ON_START: bool = True  # build RAG and agent in the background at startup; off: on first use
+    WARM_UP_RETRY_SECONDS: float = 5.0  # first retry after a failed warm-up, doubled each time
+    WARM_UP_RETRY_MAX_SECONDS: float = 300.0
+    
+    # OpenAI rate limiting (per model; adjusted from x-ratelimit-* headers)
+    RATE_LIMIT_ENABLED: bool = True
+    LLM_RPM_LIMIT: int = 500
+    LLM_TPM_LIMIT: int = 200000
+    EMBEDDING_RPM_LIMIT: int = 3000
+    EMBEDDING_TPM_LIMIT: int = 1000000
+    RATE_LIMIT_MAX_WAIT_SECONDS: float = 5.0  # queue this long, then answer with the rate_limit fallback
+    LLM_EXPECTED_COMPLETION_TOKENS: int = 300
+    
+    # Telegram Serving
+    TELEGRAM_MODE: str = "polling"  # "polling" or "webhook"
+    TELEGRAM_API_BASE_URL: Optional[str] = None  # e.g. a local Bot API server; defaults to api.telegram.org
+    MAX_CONCURRENT_UPDATES: int = 8  # across chats; each chat is still handled in order
+    MAX_PENDING_UPDATES: int = 1000
+    WEBHOOK_URL: Optional[str] = None  # public base URL; webhook is registered on startup if set
+    WEBHOOK_PATH: str = "/telegram/webhook"
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8080
+    WEBHOOK_SECRET_TOKEN: Optional[str] = None
+    WEBHOOK_QUEUE_SIZE: int = 1000
+    WEBHOOK_MAX_CONNECTIONS: int = 40
+    
+    # Outbound Telegram sends
+    TELEGRAM_GLOBAL_SEND_RATE: float = 30.0  # messages per second across all chats
+    TELEGRAM_CHAT_SEND_RATE: float = 1.0  # per private chat, after the burst
+    TELEGRAM_GROUP_SEND_RATE: float = 0.33  # groups allow about 20 messages per minute
+    TELEGRAM_CHAT_SEND_BURST: int = 3
+    TELEGRAM_SEND_MAX_RETRIES: int = 3  # RetryAfter retries per call
+    TELEGRAM_SEND_QUEUE_SIZE: int = 5000  # typing indicators are dropped beyond this
+    
+    # Monitoring (/metrics and /health on METRICS_PORT)
+    METRICS_ENABLED: bool = True
+    METRICS_HOST: str = "127.0.0.1"  # /metrics and /health are unauthenticated; widen deliberately
+    METRICS_PORT: int = 9090
+    HEALTH_LLM_PROBE_SECONDS: float = 30.0  # 0 disables the probe (LLM always counted as ready)
+    HEALTH_QUEUE_SATURATION: float = 0.9  # not ready above this fraction of a queue's capacity
+    HEALTH_STATS_TTL_SECONDS: float = 5.0
+    
+    # Streaming replies
+    STREAMING_ENABLED: bool = True
+    STREAM_EDIT_INTERVAL_SECONDS: float = 1.0  # Telegram tolerates about one edit per second per chat
+    STREAM_FIRST_MESSAGE_MAX_CHARS: int = 200  # send this much even without a sentence boundary
+    
+    # Language Settings
+    LANGUAGE_SCRIPT_RATIO: float = 0.7
+    LANGUAGE_CACHE_SIZE: int = 10000
     
     # Admin Settings
     ADMIN_IDS: List[str] = ["YOUR_TELEGRAM_ID"]
@@ -28,14 +110,34 @@ class Settings(BaseSettings):
     
     # Context Settings
     MAX_CONVERSATION_HISTORY: int = 5
+    SESSION_MAX_USERS: int = 10000
+    SESSION_IDLE_TTL_SECONDS: float = 3600.0
+    SESSION_SWEEP_INTERVAL_SECONDS: float = 300.0  # 0 disables the periodic sweep
+    SESSION_BACKEND: str = "memory"  # "memory" or "sqlite" (shared between workers)
+    SESSION_DB_PATH: str = "./data/sessions.sqlite3"
     
     # Database
     VECTOR_DB_PATH: str = "./data/demo_db"
+    VECTOR_COLLECTION_NAME: str = "langchain"
     KNOWLEDGE_BASE_PATH: str = "./data/knowledge_base.json"
     
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FILE_PATH: str = "./logs"
+    LOG_FORMAT: str = "text"  # "text" or "json" (JSON lines)
+    LOG_QUEUE_ENABLED: bool = True  # write logs on a background thread
+    LOG_QUEUE_SIZE: int = 10000  # records beyond this are dropped, never blocking
+    LOG_FILE_ROTATION: str = "midnight"  # "midnight" (single process) or "external" (logrotate)
+    LOG_ROTATION_BACKUPS: int = 14  # daily files kept
+    # Fraction of debug lines kept per category (unlisted categories are not sampled)
+    LOG_SAMPLE_RATES: Dict[str, float] = {
+        "embedding_cache": 0.1,
+        "answer_cache": 0.1,
+        "semantic_cache": 0.1,
+        "rate_limit": 0.1,
+        "routing": 0.1,
+        "session": 0.1,
+    }
     
     # Qdrant Settings (optional for advanced vector DB)
     QDRANT_URL: str = "http://localhost:6333"
@@ -66,6 +66,9 @@ _Cache helps reduce API costs!_
         "📞 03-1234567\n\n"
         "קוד שגיאה: ERR-{error_code}"
     )
+
+    # Left in a streamed reply that couldn't be finished; the full answer follows
+    STREAM_SUPERSEDED = "⬇️ התשובה המלאה בהודעה הבאה"
     
     # Admin commands
     ADMIN_ONLY = "⛔ Admin only command"
@@ -83,6 +86,45 @@ Cost Savings:
 • Estimated Savings: ${savings:.2f}
 
 Use /clearcache to clear cache
+"""
+    
+    SEMANTIC_CACHE_INFO_TEMPLATE = """
+🧠 *Semantic Answer Cache*
+• Hits: {hits}
+• Near Misses: {near_misses}
+• Misses: {misses}
+• Entries: {size}/{max_size}
+"""
+    
+    SESSION_INFO_TEMPLATE = """
+👥 *Sessions*
+• Resident: {resident}/{max_sessions}
+• Evicted (idle): {evicted_idle}
+• Evicted (capacity): {evicted_capacity}
+"""
+    
+    WEBHOOK_INFO_TEMPLATE = """
+🌐 *Webhook*
+• Queue: {queue_depth}/{max_queue}
+• Workers: {busy}/{workers} busy ({utilization:.0%} utilization)
+• Processed: {processed} (failed: {failed})
+• Dropped (queue full): {dropped}
+"""
+    
+    SEND_QUEUE_INFO_TEMPLATE = """
+📤 *Outbound Queue*
+• Pending: {pending} (in flight: {in_flight}, chats: {chats})
+• Sent: {sent} (failed: {failed}, retried after flood wait: {retried})
+• Coalesced: {coalesced} • Dropped: {dropped}
+• Avg queue time: {avg_queue_ms:.0f}ms
+"""
+    
+    RATE_LIMIT_INFO_TEMPLATE = """
+🚦 *Rate Limit ({name})*
+• Limits: {rpm} req/min, {tpm} tokens/min
+• Available: {requests_available} req, {tokens_available} tokens
+• Admitted: {admitted} (throttled: {throttled}, {throttled_seconds:.1f}s waiting)
+• Rejected: {rejected} • Server 429s: {server_429s}
 """
     
     CACHE_CLEARED = "🗑️ Cache cleared successfully!"
@@ -105,6 +147,16 @@ Use /clearcache to clear cache
 
 תשובה (בעברית, ידידותית):"""
     
+    RAG_PROMPT_TEMPLATE_EN = """You are a customer support assistant. Answer the customer's question based **only** on the following context.
+The context may be in Hebrew. If the answer is not in the context, say that you don't have this information.
+
+Context:
+{context_text}
+
+Customer question: {query}
+
+Answer (in English, friendly):"""
+    
     # Context source template
     CONTEXT_SOURCE = "מקור {index}:\n{content}"
     
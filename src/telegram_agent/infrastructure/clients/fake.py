@@ -0,0 +1,138 @@
+"""
+In-process fake backend (LLM_BACKEND=fake).
+
+Runs the whole pipeline without network or API keys, for profiling and
+offline runs. Answers are fixed text, paced by FAKE_LLM_LATENCY_SECONDS
+(before the first token) and FAKE_LLM_TOKENS_PER_SECOND (0: no delay).
+ReAct agent prompts get a "Final Answer:", so the agent finishes in one
+step. Embeddings are hashed bags of words: deterministic, and texts that
+share words are close, so retrieval still ranks something sensible.
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from telegram_agent.infrastructure.clients.llm_backend import LLMBackend
+
+FAKE_ANSWER = (
+    "This is a simulated answer from the offline model. It is long enough to be "
+    "streamed in several chunks."
+)
+
+_TOKEN_RE = re.compile(r"\S+\s*")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model with configurable pacing"""
+
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @staticmethod
+    def answer_for(messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        if "Final Answer:" in prompt:
+            return f"Thought: I now know the final answer\nFinal Answer: {FAKE_ANSWER}"
+        return FAKE_ANSWER
+
+    def _token_delay(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        text = self.answer_for(messages)
+        time.sleep(self.latency + len(_TOKEN_RE.findall(text)) * self._token_delay())
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                         **kwargs: Any) -> ChatResult:
+        text = self.answer_for(messages)
+        await asyncio.sleep(self.latency + len(_TOKEN_RE.findall(text)) * self._token_delay())
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for token in _TOKEN_RE.findall(self.answer_for(messages)):
+            time.sleep(self._token_delay())
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        for token in _TOKEN_RE.findall(self.answer_for(messages)):
+            await asyncio.sleep(self._token_delay())
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class FakeEmbeddings(Embeddings):
+    """Hashed bag-of-words vectors, L2-normalised"""
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in _WORD_RE.findall(text.lower()) or [""]:
+            digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return self.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents(texts)
+
+
+class FakeBackend(LLMBackend):
+    """No network: FakeChatModel and FakeEmbeddings"""
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0, tokens_per_second: float = 0.0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+
+    def chat_model(self, model: str, temperature: float, **kwargs) -> FakeChatModel:
+        return FakeChatModel(
+            latency=self.latency,
+            tokens_per_second=self.tokens_per_second,
+            callbacks=kwargs.get("callbacks")
+        )
+
+    def embeddings(self, model: str) -> FakeEmbeddings:
+        return FakeEmbeddings()
+
+    def get_stats(self) -> dict:
+        return {"backend": self.name, "latency_seconds": self.latency,
+                "tokens_per_second": self.tokens_per_second}
@@ -0,0 +1,126 @@
+"""
+LLM serving backends.
+
+Every chat model and embeddings instance in the bot comes from here, so
+the serving backend is a setting rather than a code change:
+- "openai": api.openai.com (or a proxy at LLM_BASE_URL), with the shared
+  per-model rate limiters
+- "openai_compatible": any server speaking the OpenAI API at LLM_BASE_URL,
+  e.g. vLLM or Ollama next to the bot
+- "fake": deterministic in-process answers and embeddings, no network;
+  for profiling and offline runs
+
+Chat models are LangChain chat models, so ainvoke() and astream() work
+the same on every backend; embeddings implement LangChain's Embeddings.
+Chat and embeddings can be served by different backends
+(EMBEDDING_BACKEND / EMBEDDING_BASE_URL), and each keeps its own
+connection pools and timeouts.
+
+Backends (and langchain with them) are only imported when first built.
+"""
+
+from typing import TYPE_CHECKING, Dict, Optional
+
+from telegram_agent.config.settings import settings
+from telegram_agent.infrastructure.utils.rate_limiter import RateLimiter
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+    from langchain_core.language_models import BaseChatModel
+
+BACKENDS = ("openai", "openai_compatible", "fake")
+
+
+class LLMBackend:
+    """Chat models and embeddings from one serving backend"""
+
+    name = "base"
+
+    def chat_model(self, model: str, temperature: float, **kwargs) -> "BaseChatModel":
+        raise NotImplementedError
+
+    def embeddings(self, model: str) -> "Embeddings":
+        raise NotImplementedError
+
+    def rate_limiter(self, model: str) -> Optional[RateLimiter]:
+        """Client-side limiter for calls to `model`, if this backend has quotas"""
+        return None
+
+    async def probe(self, model: str, timeout: float = 5.0):
+        """Raise if the backend can't serve `model` right now"""
+
+    def get_stats(self) -> dict:
+        return {"backend": self.name}
+
+
+def build_backend(kind: str, base_url: Optional[str] = None, timeout: float = None) -> LLMBackend:
+    """Backend for a LLM_BACKEND / EMBEDDING_BACKEND value"""
+    timeout = settings.LLM_TIMEOUT_SECONDS if timeout is None else timeout
+    if kind in ("openai", "openai_compatible"):
+        from telegram_agent.infrastructure.clients.openai import OpenAIBackend, OpenAICompatibleBackend
+
+        params = dict(
+            timeout=timeout,
+            connect_timeout=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_retries=settings.LLM_MAX_RETRIES,
+        )
+        if kind == "openai":
+            return OpenAIBackend(base_url=base_url, **params)
+        if not base_url:
+            raise ValueError("LLM_BASE_URL is required for the openai_compatible backend")
+        return OpenAICompatibleBackend(base_url=base_url, api_key=settings.LLM_API_KEY, **params)
+    if kind == "fake":
+        from telegram_agent.infrastructure.clients.fake import FakeBackend
+
+        return FakeBackend(
+            latency=settings.FAKE_LLM_LATENCY_SECONDS,
+            tokens_per_second=settings.FAKE_LLM_TOKENS_PER_SECOND
+        )
+    raise ValueError(f"Unknown LLM backend {kind!r} (expected one of {', '.join(BACKENDS)})")
+
+
+# One backend per role, built on first use
+_backends: Dict[str, LLMBackend] = {}
+
+
+def get_chat_backend() -> LLMBackend:
+    if "chat" not in _backends:
+        _backends["chat"] = build_backend(settings.LLM_BACKEND, settings.LLM_BASE_URL)
+    return _backends["chat"]
+
+
+def get_embedding_backend() -> LLMBackend:
+    if "embeddings" not in _backends:
+        kind = settings.EMBEDDING_BACKEND or settings.LLM_BACKEND
+        # LLM_BASE_URL only carries over when both roles use the same kind of backend
+        same_kind = kind == settings.LLM_BACKEND
+        _backends["embeddings"] = build_backend(
+            kind,
+            settings.EMBEDDING_BASE_URL or (settings.LLM_BASE_URL if same_kind else None),
+            timeout=settings.EMBEDDING_TIMEOUT_SECONDS
+        )
+    return _backends["embeddings"]
+
+
+def create_chat_model(model: str = None, temperature: float = None, **kwargs) -> "BaseChatModel":
+    """Chat model for `model` on the configured backend"""
+    return get_chat_backend().chat_model(
+        model or settings.LLM_MODEL,
+        settings.LLM_TEMPERATURE if temperature is None else temperature,
+        **kwargs
+    )
+
+
+def create_embeddings(model: str = None) -> "Embeddings":
+    """Embeddings for `model` on the configured backend"""
+    return get_embedding_backend().embeddings(model or settings.EMBEDDING_MODEL)
+
+
+async def probe_model(model: str = None, timeout: float = 5.0):
+    """Check that the chat backend can serve `model`; raises on failure"""
+    await get_chat_backend().probe(model or settings.LLM_MODEL, timeout=timeout)
+
+
+def get_backend_stats() -> dict:
+    return {role: backend.get_stats() for role, backend in _backends.items()}
@@ -0,0 +1,194 @@
+"""
+OpenAI and OpenAI-compatible backends.
+
+Chat models and embeddings are built on the backend's own httpx clients
+(one pair per model), so the backend's pool size and timeouts apply and
+every response on the "openai" backend (including 429s the SDK retries
+internally) feeds the model's shared RateLimiter with the server's
+x-ratelimit-* headers. Chat models there also carry a callback that
+reserves capacity before each call, which covers LLMManager and the
+LangChain agent alike; EmbeddingCache reserves capacity itself.
+
+OpenAI-compatible servers (vLLM, Ollama, ...) don't send those headers
+and aren't bound by OpenAI's quotas, so they get no client-side limiter.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import openai
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from telegram_agent.config.settings import settings
+from telegram_agent.infrastructure.clients.llm_backend import LLMBackend
+from telegram_agent.infrastructure.utils.rate_limiter import RateLimiter, estimate_tokens, get_rate_limiter
+
+
+class RateLimitCallback(AsyncCallbackHandler):
+    """Reserves rate-limit capacity before every chat completion.
+
+    raise_error makes RateLimitExceeded abort the call (and the agent run)
+    instead of being logged and ignored.
+    """
+
+    raise_error = True
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any],
+                                  messages: List[List[BaseMessage]], **kwargs: Any) -> None:
+        prompt_tokens = sum(
+            estimate_tokens(str(message.content)) for batch in messages for message in batch
+        )
+        await self.limiter.acquire(prompt_tokens + settings.LLM_EXPECTED_COMPLETION_TOKENS)
+
+
+def _http_clients(limiter: Optional[RateLimiter], limits: httpx.Limits, timeout: httpx.Timeout):
+    """Sync and async httpx clients that report rate-limit headers to `limiter`"""
+    params = {"limits": limits, "timeout": timeout}
+    if limiter is None:
+        return httpx.Client(**params), httpx.AsyncClient(**params)
+
+    def on_response(response: httpx.Response):
+        limiter.update_from_headers(response.status_code, response.headers)
+
+    async def on_response_async(response: httpx.Response):
+        limiter.update_from_headers(response.status_code, response.headers)
+
+    return (
+        httpx.Client(event_hooks={"response": [on_response]}, **params),
+        httpx.AsyncClient(event_hooks={"response": [on_response_async]}, **params),
+    )
+
+
+class RawTextEmbeddings(OpenAIEmbeddings):
+    """OpenAIEmbeddings that sends texts as-is.
+
+    The stock class first splits every text into tiktoken token arrays,
+    which needs tiktoken's encoding files (downloaded on first use) and
+    only matches OpenAI's own models. OpenAI-compatible servers take the
+    text and apply their own tokenizer and context limit.
+    """
+
+    def _get_len_safe_embeddings(self, texts: List[str], *, engine: str,
+                                 chunk_size: Optional[int] = None) -> List[List[float]]:
+        size = chunk_size or self.chunk_size
+        embeddings: List[List[float]] = []
+        for start in range(0, len(texts), size):
+            response = self.client.create(input=texts[start:start + size], **self._invocation_params)
+            embeddings.extend(item.embedding for item in response.data)
+        return embeddings
+
+    async def _aget_len_safe_embeddings(self, texts: List[str], *, engine: str,
+                                        chunk_size: Optional[int] = None) -> List[List[float]]:
+        size = chunk_size or self.chunk_size
+        embeddings: List[List[float]] = []
+        for start in range(0, len(texts), size):
+            response = await self.async_client.create(
+                input=texts[start:start + size], **self._invocation_params
+            )
+            embeddings.extend(item.embedding for item in response.data)
+        return embeddings
+
+
+class OpenAIBackend(LLMBackend):
+    """api.openai.com, or a proxy in front of it at `base_url`"""
+
+    name = "openai"
+    rate_limited = True
+    embeddings_class = OpenAIEmbeddings
+
+    def __init__(self, base_url: str = None, api_key: str = None, timeout: float = 60.0,
+                 connect_timeout: float = 5.0, max_connections: int = 100, max_retries: int = 2):
+        # Same environment override ChatOpenAI itself honours
+        self.base_url = base_url or os.getenv("OPENAI_API_BASE") or None
+        self.api_key = api_key or settings.OPENAI_API_KEY
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_retries = max_retries
+        self._clients: Dict[str, Tuple[openai.OpenAI, openai.AsyncOpenAI]] = {}
+        self._probe_client: Optional[openai.AsyncOpenAI] = None
+
+    def _client_params(self) -> Dict[str, Any]:
+        return {"api_key": self.api_key, "base_url": self.base_url}
+
+    def rate_limiter(self, model: str) -> Optional[RateLimiter]:
+        return get_rate_limiter(model) if self.rate_limited else None
+
+    def _sdk_clients(self, model: str) -> Tuple[openai.OpenAI, openai.AsyncOpenAI]:
+        """SDK clients for `model`, on a pool reporting to its rate limiter"""
+        if model not in self._clients:
+            sync_http, async_http = _http_clients(self.rate_limiter(model), self.limits, self.timeout)
+            params = dict(self._client_params(), timeout=self.timeout, max_retries=self.max_retries)
+            self._clients[model] = (
+                openai.OpenAI(http_client=sync_http, **params),
+                openai.AsyncOpenAI(http_client=async_http, **params),
+            )
+        return self._clients[model]
+
+    def chat_model(self, model: str, temperature: float, **kwargs) -> ChatOpenAI:
+        """ChatOpenAI wired to the shared rate limiter for `model`"""
+        sync_client, async_client = self._sdk_clients(model)
+        limiter = self.rate_limiter(model)
+        callbacks = list(kwargs.pop("callbacks", None) or [])
+        if limiter is not None:
+            callbacks.append(RateLimitCallback(limiter))
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            openai_api_key=self.api_key,
+            client=sync_client.chat.completions,
+            async_client=async_client.chat.completions,
+            callbacks=callbacks or None,
+            **kwargs
+        )
+
+    def embeddings(self, model: str) -> OpenAIEmbeddings:
+        sync_client, async_client = self._sdk_clients(model)
+        return self.embeddings_class(
+            model=model,
+            openai_api_key=self.api_key,
+            client=sync_client.embeddings,
+            async_client=async_client.embeddings
+        )
+
+    def _get_probe_client(self) -> openai.AsyncOpenAI:
+        if self._probe_client is None:
+            self._probe_client = openai.AsyncOpenAI(max_retries=0, **self._client_params())
+        return self._probe_client
+
+    async def probe(self, model: str, timeout: float = 5.0):
+        """A single GET /models/{model} without retries.
+
+        It doesn't count against the completion rate limits.
+        """
+        await self._get_probe_client().models.retrieve(model, timeout=timeout)
+
+    def get_stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "base_url": self.base_url,
+            "models": sorted(self._clients),
+            "max_connections": self.limits.max_connections,
+            "timeout_seconds": self.timeout.read,
+        }
+
+
+class OpenAICompatibleBackend(OpenAIBackend):
+    """A self-hosted server speaking the OpenAI API (vLLM, Ollama, ...)"""
+
+    name = "openai_compatible"
+    rate_limited = False
+    embeddings_class = RawTextEmbeddings
+
+    def __init__(self, base_url: str, api_key: str = None, **kwargs):
+        # Never send the OpenAI key to another server; most local servers ignore the key
+        super().__init__(base_url=base_url, api_key=api_key or "EMPTY", **kwargs)
+
+    async def probe(self, model: str, timeout: float = 5.0):
+        """GET /models; not every server implements /models/{model}"""
+        await self._get_probe_client().models.list(timeout=timeout)
@@ -0,0 +1,158 @@
+# ========================================
+# integrations/health.py
+# Liveness, readiness and live counters for the monitoring server
+# ========================================
+
+"""
+Bot health for the monitoring listener.
+
+Requests only read counters that are already kept in memory, so the
+endpoints can be scraped every second. The two more expensive inputs are
+refreshed in the background instead:
+- LLM reachability, probed every HEALTH_LLM_PROBE_SECONDS
+- SQLite-backed cache stats, cached for HEALTH_STATS_TTL_SECONDS and
+  computed off the event loop
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from telegram_agent.application.conversation_service.handlers.language_handler import language_handler
+from telegram_agent.config.settings import settings
+from telegram_agent.infrastructure.clients.llm_backend import get_backend_stats, probe_model
+from telegram_agent.infrastructure.utils.logger import logger
+from telegram_agent.infrastructure.utils.metrics import REQUEST_SECONDS, REQUESTS_IN_FLIGHT
+from telegram_agent.infrastructure.utils.rate_limiter import get_all_stats as get_rate_limit_stats
+
+if TYPE_CHECKING:
+    from telegram_agent.infrastructure.telegram.telegram_bot import TelegramBot
+
+
+class BotHealth:
+    """Health checks and counters for one TelegramBot"""
+
+    def __init__(self, bot: "TelegramBot", probe_interval: float = None,
+                 saturation: float = None, stats_ttl: float = None):
+        self.bot = bot
+        self.probe_interval = settings.HEALTH_LLM_PROBE_SECONDS if probe_interval is None else probe_interval
+        self.saturation = saturation or settings.HEALTH_QUEUE_SATURATION
+        self.stats_ttl = settings.HEALTH_STATS_TTL_SECONDS if stats_ttl is None else stats_ttl
+        self.started_at = time.time()
+
+        self.llm_ok: Optional[bool] = None if self.probe_interval > 0 else True
+        self.llm_error: Optional[str] = None
+        self.llm_checked_at: Optional[float] = None
+        self._probe_task: Optional[asyncio.Task] = None
+
+        self._cache_stats: Optional[dict] = None
+        self._cache_stats_at = 0.0
+        self._cache_stats_task: Optional[asyncio.Task] = None
+
+    # ====== Background refresh ======
+    async def start(self):
+        if self.probe_interval > 0:
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self):
+        for task in (self._probe_task, self._cache_stats_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._probe_task = self._cache_stats_task = None
+
+    async def _probe_loop(self):
+        while True:
+            await self.probe_llm()
+            await asyncio.sleep(self.probe_interval)
+
+    async def probe_llm(self):
+        try:
+            await probe_model(settings.LLM_MODEL)
+        except Exception as e:
+            if self.llm_ok is not False:
+                logger.warning(f"⚠️ LLM probe failed: {e}")
+            self.llm_ok, self.llm_error = False, str(e)
+        else:
+            if self.llm_ok is False:
+                logger.info("✅ LLM reachable again")
+            self.llm_ok, self.llm_error = True, None
+        self.llm_checked_at = time.time()
+
+    # ====== Checks ======
+    def liveness(self) -> dict:
+        return {"status": "alive", "uptime_seconds": int(time.time() - self.started_at)}
+
+    def readiness(self) -> Tuple[bool, dict]:
+        updates = self.bot.update_processor.scheduler
+        # Webhook mode refuses updates at max_queue; polling is bounded by PTB's semaphore
+        max_updates = (
+            self.bot.webhook.max_queue if self.bot.webhook
+            else self.bot.update_processor.max_concurrent_updates
+        )
+        sender = self.bot.sender
+        rag = self.bot.agent.rag  # None until warm-up or the first RAG query built it
+        checks = {
+            "vector_store": rag is not None and rag.retriever is not None,
+            "llm": bool(self.llm_ok),
+            "update_queue": updates.pending < max_updates * self.saturation,
+            "send_queue": sender.pending < sender.max_pending * self.saturation,
+        }
+        # Probes only report. With WARM_UP_ON_START off the first message builds the
+        # vector store, so it can't gate readiness (traffic would never arrive)
+        required = [name for name in checks if name != "vector_store" or settings.WARM_UP_ON_START]
+        return all(checks[name] for name in required), checks
+
+    def snapshot(self) -> dict:
+        """Everything /health reports; cache stats may be up to stats_ttl old"""
+        ready, checks = self.readiness()
+        by_status = {route: count for (route,), count in REQUEST_SECONDS.counts().items()}
+        self._refresh_cache_stats()
+        return {
+            "status": "healthy" if ready else "unhealthy",
+            "uptime_seconds": int(time.time() - self.started_at),
+            "checks": checks,
+            "llm": {
+                "ok": self.llm_ok, "error": self.llm_error, "checked_at": self.llm_checked_at,
+                "backends": get_backend_stats(),
+            },
+            "messages": {
+                "total": sum(by_status.values()),
+                "in_flight": int(REQUESTS_IN_FLIGHT.value()),
+                "by_status": by_status,
+            },
+            "updates": self.bot.update_processor.scheduler.get_stats(),
+            "sends": self.bot.sender.get_stats(),
+            "agent": self.bot.agent.agent_runner.get_stats(),
+            "webhook": self.bot.webhook.get_stats() if self.bot.webhook else None,
+            "rate_limits": get_rate_limit_stats(),
+            "caches": self._cache_stats,
+        }
+
+    def _refresh_cache_stats(self):
+        fresh = time.monotonic() - self._cache_stats_at < self.stats_ttl
+        if fresh or (self._cache_stats_task and not self._cache_stats_task.done()):
+            return
+        self._cache_stats_task = asyncio.create_task(self._load_cache_stats())
+
+    async def _load_cache_stats(self):
+        # The SQLite stores run COUNT queries; keep them off the event loop
+        loop = asyncio.get_running_loop()
+        try:
+            self._cache_stats = await loop.run_in_executor(None, self._collect_cache_stats)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to collect cache stats: {e}")
+        self._cache_stats_at = time.monotonic()
+
+    def _collect_cache_stats(self) -> dict:
+        agent = self.bot.agent
+        rag = agent.rag
+        return {
+            "embeddings": rag.embedding_cache.get_stats() if rag else None,
+            "answers": rag.llm_manager.get_cache_stats() if rag else None,
+            "sessions": agent.session_store.get_stats(),
+            "languages": language_handler.get_stats(),
+        }
@@ -0,0 +1,364 @@
+# ========================================
+# integrations/send_scheduler.py
+# Outbound Telegram sends within global and per-chat limits
+# ========================================
+
+"""
+Outbound send scheduler.
+
+Handlers enqueue Bot API calls here instead of awaiting them. A single
+dispatcher task starts each call when both the global bucket
+(TELEGRAM_GLOBAL_SEND_RATE, about 30 messages per second) and the chat's
+own bucket allow it. Groups get the slower group rate. Each chat has at
+most one call in flight, and calls within a priority run FIFO, so
+replies arrive in order.
+
+Priorities: replies, then edits, then typing indicators. Typing only
+uses the global bucket. Pending typing actions are coalesced per chat
+and dropped once a reply for that chat is queued. Pending edits of the
+same message collapse to the latest text. A RetryAfter pauses the chat
+and puts the call back at the head of its queue.
+"""
+
+import asyncio
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional
+
+from telegram import Chat, Message
+from telegram.error import BadRequest, RetryAfter
+
+from telegram_agent.config.settings import settings
+from telegram_agent.infrastructure.utils.logger import logger
+from telegram_agent.infrastructure.utils.metrics import registry
+
+
+class SendPriority(IntEnum):
+    REPLY = 0
+    EDIT = 1
+    TYPING = 2
+
+
+SEND_SECONDS = registry.histogram(
+    "telegram_send_duration_seconds",
+    "Bot API call duration for outbound sends, by kind",
+    ["kind"]
+)
+SEND_QUEUE_SECONDS = registry.histogram(
+    "telegram_send_queue_seconds",
+    "Time outbound sends waited for rate-limit capacity, by kind",
+    ["kind"]
+)
+
+
+def _mark_retrieved(future: asyncio.Future):
+    if not future.cancelled():
+        future.exception()
+
+
+class _SendJob:
+    __slots__ = ("chat_id", "priority", "fn", "future", "coalesce_key", "attempts", "queued_at")
+
+    def __init__(self, chat_id: Hashable, priority: SendPriority, fn: Callable[[], Awaitable],
+                 future: asyncio.Future, coalesce_key: Optional[Hashable]):
+        self.chat_id = chat_id
+        self.priority = priority
+        self.fn = fn
+        self.future = future
+        self.coalesce_key = coalesce_key
+        self.attempts = 0
+        self.queued_at = time.monotonic()
+
+
+class _ChatLane:
+    """Pending sends and pacing state for one chat"""
+
+    __slots__ = ("queues", "rate", "burst", "tokens", "updated", "blocked_until", "busy")
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.queues: List[Deque[_SendJob]] = [deque() for _ in SendPriority]
+        self.rate = rate
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = now
+        self.blocked_until = 0.0
+        self.busy = False
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, priority: SendPriority, now: float) -> float:
+        """Seconds until a call of `priority` may start (0 = now)"""
+        wait = self.blocked_until - now
+        if priority != SendPriority.TYPING and self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return max(wait, 0.0)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self.queues)
+
+
+class TelegramSendScheduler:
+    """Prioritized, rate-limited queue for outbound Bot API calls"""
+
+    def __init__(self, global_rate: float = None, chat_rate: float = None,
+                 group_rate: float = None, chat_burst: int = None,
+                 max_retries: int = None, max_pending: int = None):
+        self.global_rate = global_rate or settings.TELEGRAM_GLOBAL_SEND_RATE
+        self.chat_rate = chat_rate or settings.TELEGRAM_CHAT_SEND_RATE
+        self.group_rate = group_rate or settings.TELEGRAM_GROUP_SEND_RATE
+        self.chat_burst = chat_burst or settings.TELEGRAM_CHAT_SEND_BURST
+        self.max_retries = settings.TELEGRAM_SEND_MAX_RETRIES if max_retries is None else max_retries
+        self.max_pending = max_pending or settings.TELEGRAM_SEND_QUEUE_SIZE
+
+        self._lanes: Dict[Hashable, _ChatLane] = {}
+        self._coalesce: Dict[Hashable, _SendJob] = {}
+        self._global_tokens = self.global_rate
+        self._global_updated = time.monotonic()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._tasks = set()
+        self.pending = 0
+        self.in_flight = 0
+
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.queue_seconds = 0.0
+
+    # ====== Enqueueing ======
+    def submit(self, chat_id: Hashable, priority: SendPriority, fn: Callable[[], Awaitable],
+               coalesce_key: Optional[Hashable] = None) -> asyncio.Future:
+        """Queue `fn` (a Bot API call) for `chat_id`; the future resolves with its result.
+
+        With `coalesce_key`, a call still waiting under the same key is
+        replaced by this one and both callers share its future.
+        """
+        existing = self._coalesce.get(coalesce_key) if coalesce_key is not None else None
+        if existing is not None:
+            existing.fn = fn
+            self.coalesced += 1
+            return existing.future
+
+        future = asyncio.get_running_loop().create_future()
+        # Most callers never await the future; don't warn about its exception
+        future.add_done_callback(_mark_retrieved)
+
+        if priority == SendPriority.TYPING and self.pending >= self.max_pending:
+            # Typing is cosmetic; shed it first under backpressure
+            self.dropped += 1
+            future.set_result(None)
+            return future
+
+        lane = self._lane(chat_id)
+        if priority == SendPriority.REPLY:
+            # The reply makes any queued typing indicator stale
+            self._drop_queued(lane, SendPriority.TYPING)
+
+        job = _SendJob(chat_id, priority, fn, future, coalesce_key)
+        lane.queues[priority].append(job)
+        if coalesce_key is not None:
+            self._coalesce[coalesce_key] = job
+        self.pending += 1
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        return future
+
+    def reply(self, message: Message, text: str, parse_mode: str = None, **kwargs) -> asyncio.Future:
+        """Reply to `message`; falls back to plain text if the markup doesn't parse"""
+        async def send():
+            try:
+                return await message.reply_text(text, parse_mode=parse_mode, **kwargs)
+            except BadRequest as e:
+                if not parse_mode or "parse" not in str(e).lower():
+                    raise
+                logger.warning(f"⚠️ Reply markup rejected ({e}), sending plain text")
+                return await message.reply_text(text, **kwargs)
+
+        return self.submit(message.chat_id, SendPriority.REPLY, send)
+
+    def edit(self, message: Message, text: str, parse_mode: str = None) -> asyncio.Future:
+        """Edit a sent message; queued edits of the same message keep only the latest text"""
+        return self.submit(
+            message.chat_id, SendPriority.EDIT,
+            lambda: message.edit_text(text, parse_mode=parse_mode),
+            coalesce_key=("edit", message.chat_id, message.message_id)
+        )
+
+    def delete(self, message: Message) -> asyncio.Future:
+        """Delete a sent message; replaces any edit of it that is still queued"""
+        return self.submit(
+            message.chat_id, SendPriority.EDIT,
+            message.delete,
+            coalesce_key=("edit", message.chat_id, message.message_id)
+        )
+
+    def typing(self, chat: Chat) -> asyncio.Future:
+        """Show the typing indicator; at most one is queued per chat"""
+        return self.submit(
+            chat.id, SendPriority.TYPING,
+            lambda: chat.send_action("typing"),
+            coalesce_key=("typing", chat.id)
+        )
+
+    def _lane(self, chat_id: Hashable) -> _ChatLane:
+        lane = self._lanes.get(chat_id)
+        if lane is None:
+            # Negative ids are groups and channels, which have a lower limit
+            is_group = isinstance(chat_id, int) and chat_id < 0
+            rate = self.group_rate if is_group else self.chat_rate
+            lane = self._lanes[chat_id] = _ChatLane(rate, self.chat_burst, time.monotonic())
+        return lane
+
+    def _drop_queued(self, lane: _ChatLane, priority: SendPriority):
+        queue = lane.queues[priority]
+        while queue:
+            job = queue.popleft()
+            self._forget(job)
+            self.pending -= 1
+            self.coalesced += 1
+            if not job.future.done():
+                job.future.set_result(None)
+
+    def _forget(self, job: _SendJob):
+        if job.coalesce_key is not None and self._coalesce.get(job.coalesce_key) is job:
+            del self._coalesce[job.coalesce_key]
+
+    # ====== Dispatching ======
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def _refill_global(self, now: float):
+        self._global_tokens = min(
+            self.global_rate, self._global_tokens + (now - self._global_updated) * self.global_rate
+        )
+        self._global_updated = now
+
+    def _next_job(self) -> tuple:
+        """(job, None) if a call can start now, else (None, seconds to wait or None)"""
+        now = time.monotonic()
+        self._refill_global(now)
+        if self._global_tokens < 1:
+            return None, (1 - self._global_tokens) / self.global_rate
+
+        wait = None
+        for priority in SendPriority:
+            for chat_id, lane in list(self._lanes.items()):
+                if lane.busy:
+                    continue
+                lane.refill(now)
+                if not lane.pending:
+                    if lane.tokens >= lane.burst and lane.blocked_until <= now:
+                        del self._lanes[chat_id]  # fully recovered, nothing to remember
+                    continue
+                if not lane.queues[priority]:
+                    continue
+                lane_wait = lane.wait_for(priority, now)
+                if lane_wait == 0:
+                    # Rotate so the next pick starts with another chat
+                    del self._lanes[chat_id]
+                    self._lanes[chat_id] = lane
+                    return lane.queues[priority].popleft(), None
+                wait = lane_wait if wait is None else min(wait, lane_wait)
+        return None, wait
+
+    async def _dispatch(self):
+        while True:
+            job, wait = self._next_job()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._forget(job)
+            self.pending -= 1
+            self._global_tokens -= 1
+            lane = self._lanes[job.chat_id]
+            if job.priority != SendPriority.TYPING:
+                lane.tokens -= 1
+            lane.busy = True
+            self.in_flight += 1
+            task = asyncio.create_task(self._execute(lane, job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, lane: _ChatLane, job: _SendJob):
+        kind = job.priority.name.lower()
+        started = time.monotonic()
+        if job.attempts == 0:
+            self.queue_seconds += started - job.queued_at
+            SEND_QUEUE_SECONDS.observe(started - job.queued_at, kind=kind)
+        try:
+            result = await job.fn()
+            SEND_SECONDS.observe(time.monotonic() - started, kind=kind)
+        except RetryAfter as e:
+            lane.blocked_until = max(lane.blocked_until, time.monotonic() + e.retry_after)
+            if job.attempts < self.max_retries and not job.future.cancelled():
+                job.attempts += 1
+                self.retried += 1
+                logger.warning(f"⚠️ Chat {job.chat_id} rate limited, retrying in {e.retry_after}s")
+                lane.queues[job.priority].appendleft(job)
+                self.pending += 1
+            else:
+                self._fail(job, e)
+        except Exception as e:
+            self._fail(job, e)
+        else:
+            self.sent += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            lane.busy = False
+            self.in_flight -= 1
+            self._wakeup.set()
+
+    def _fail(self, job: _SendJob, error: Exception):
+        self.failed += 1
+        logger.error(f"Failed to send to chat {job.chat_id}: {error}")
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    async def shutdown(self, timeout: float = 10.0):
+        """Let queued sends go out (up to `timeout`), then stop"""
+        deadline = time.monotonic() + timeout
+        while (self.pending or self.in_flight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        for lane in self._lanes.values():
+            for queue in lane.queues:
+                for job in queue:
+                    job.future.cancel()
+                queue.clear()
+        self._lanes.clear()
+        self._coalesce.clear()
+        self.pending = 0
+
+    def get_stats(self) -> dict:
+        started = self.sent + self.failed
+        return {
+            "pending": self.pending,
+            "in_flight": self.in_flight,
+            "chats": len(self._lanes),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "avg_queue_ms": self.queue_seconds / started * 1000 if started else 0.0
+        }
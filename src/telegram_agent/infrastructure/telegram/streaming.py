@@ -0,0 +1,163 @@
+# ========================================
+# integrations/streaming.py
+# Progressive Telegram replies for streamed answers
+# ========================================
+
+"""
+Streams a generated answer into one Telegram message.
+
+The first message is sent as soon as the answer reaches its first
+sentence boundary (or STREAM_FIRST_MESSAGE_MAX_CHARS). After that a
+background task edits it with the latest text at most once per
+STREAM_EDIT_INTERVAL_SECONDS, so generation never waits on Telegram and
+edits stay within its rate limits. Intermediate edits are plain text;
+the final edit applies Markdown. With a TelegramSendScheduler, sends and
+edits go through its per-chat pacing.
+"""
+
+import asyncio
+import re
+import time
+from typing import Optional
+
+from telegram import Message
+from telegram.error import BadRequest, RetryAfter, TelegramError
+
+from telegram_agent.config.settings import settings
+from telegram_agent.config.strings import strings
+from telegram_agent.infrastructure.telegram.send_scheduler import TelegramSendScheduler
+from telegram_agent.infrastructure.utils.logger import logger
+
+_SENTENCE_END = re.compile(r"[.!?…:\n](?=\s|$)")
+
+# Telegram's limit for a single message
+MAX_MESSAGE_CHARS = 4096
+
+
+class StreamingReply:
+    """One Telegram reply that is edited while the answer is generated"""
+
+    def __init__(self, message: Message, edit_interval: float = None,
+                 first_message_max_chars: int = None, sender: TelegramSendScheduler = None):
+        self.message = message
+        self.sender = sender
+        self.edit_interval = edit_interval or settings.STREAM_EDIT_INTERVAL_SECONDS
+        self.first_message_max_chars = first_message_max_chars or settings.STREAM_FIRST_MESSAGE_MAX_CHARS
+        self.sent: Optional[Message] = None
+        self.first_text_at: Optional[float] = None
+        self.edits = 0
+        self._latest = ""
+        self._shown = ""
+        self._pump_task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return self.sent is not None
+
+    def _first_chunk(self, text: str) -> Optional[str]:
+        boundary = _SENTENCE_END.search(text)
+        if boundary:
+            return text[:boundary.end()].strip() or None
+        if len(text) >= self.first_message_max_chars:
+            return text
+        return None
+
+    async def update(self, text: str):
+        """Called with the full text generated so far"""
+        self._latest = text[:MAX_MESSAGE_CHARS]
+        if self.sent is not None:
+            return  # the pump picks up the latest text
+
+        visible = self._first_chunk(self._latest)
+        if visible is None:
+            return
+        try:
+            if self.sender:
+                self.sent = await self.sender.reply(self.message, visible)
+            else:
+                self.sent = await self.message.reply_text(visible)
+        except TelegramError as e:
+            # Try again on the next chunk; finish() falls back to a normal reply
+            logger.warning(f"⚠️ Failed to send streamed reply: {e}")
+            return
+        self._shown = visible
+        self.first_text_at = time.monotonic()
+        self._pump_task = asyncio.create_task(self._pump())
+
+    async def _pump(self):
+        while True:
+            await asyncio.sleep(self.edit_interval)
+            if self._latest != self._shown:
+                await self._edit(self._latest)
+
+    async def _edit(self, text: str, parse_mode: str = None) -> bool:
+        try:
+            if self.sender:
+                await self.sender.edit(self.sent, text, parse_mode)
+            else:
+                await self.sent.edit_text(text, parse_mode=parse_mode)
+        except RetryAfter as e:
+            logger.warning(f"⚠️ Edit rate limited, waiting {e.retry_after}s")
+            await asyncio.sleep(e.retry_after)
+            return False
+        except BadRequest as e:
+            if "not modified" in str(e).lower():
+                self._shown = text
+                return True
+            if parse_mode:
+                raise
+            logger.warning(f"⚠️ Failed to edit streamed reply: {e}")
+            return False
+        except TelegramError as e:
+            logger.warning(f"⚠️ Failed to edit streamed reply: {e}")
+            return False
+        self._shown = text
+        self.edits += 1
+        return True
+
+    async def _retract(self):
+        """Take the partial answer down before the caller sends the full one"""
+        try:
+            if self.sender:
+                await self.sender.delete(self.sent)
+            else:
+                await self.sent.delete()
+            return
+        except TelegramError as e:
+            logger.warning(f"⚠️ Failed to delete streamed reply ({e}), marking it superseded")
+        await self._edit(strings.STREAM_SUPERSEDED)
+
+    async def close(self):
+        """Stop background edits"""
+        if self._pump_task:
+            self._pump_task.cancel()
+            try:
+                await self._pump_task
+            except asyncio.CancelledError:
+                pass
+            self._pump_task = None
+
+    async def finish(self, final_text: str, parse_mode: str = "Markdown") -> bool:
+        """Replace the streamed text with the final answer.
+
+        Returns False if nothing was streamed or the final edit failed; the
+        caller then replies normally, so the user always gets the full answer.
+        A partial answer that can't be finished is deleted (or, failing that,
+        replaced by a short pointer) so it isn't left above the full one.
+        """
+        await self.close()
+        if self.sent is None:
+            return False
+
+        final_text = final_text[:MAX_MESSAGE_CHARS]
+        for _ in range(2):
+            try:
+                if await self._edit(final_text, parse_mode):
+                    return True
+            except BadRequest as e:
+                # Streamed text may not be valid Markdown; keep it plain
+                logger.warning(f"⚠️ Final Markdown edit failed ({e}), sending plain text")
+                parse_mode = None
+        logger.warning("⚠️ Final edit of streamed reply failed, sending a new message")
+        await self._retract()
+        return False
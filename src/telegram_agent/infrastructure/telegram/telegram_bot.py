@@ -8,6 +8,8 @@ from telegram.ext import (
     Application, CommandHandler,
     MessageHandler, filters, ContextTypes
 )
+import asyncio
+import secrets
 import signal
 import sys
 import time
@@ -15,7 +17,15 @@ import time
 from telegram_agent.application.conversation_service.support_agent import SupportAgent
 from telegram_agent.config.settings import settings
 from telegram_agent.config.strings import strings
+from telegram_agent.infrastructure.telegram.health import BotHealth
+from telegram_agent.infrastructure.telegram.send_scheduler import TelegramSendScheduler
+from telegram_agent.infrastructure.telegram.streaming import StreamingReply
+from telegram_agent.infrastructure.telegram.update_scheduler import PerChatUpdateProcessor
+from telegram_agent.infrastructure.telegram.webhook import WebhookServer
 from telegram_agent.infrastructure.utils.logger import logger
+from telegram_agent.infrastructure.utils.metrics import registry
+from telegram_agent.infrastructure.utils.monitoring import MonitoringServer
+from telegram_agent.infrastructure.utils.rate_limiter import get_all_stats as get_rate_limit_stats
 
 
 class TelegramBot:
@@ -23,7 +33,29 @@ class TelegramBot:
 
     def __init__(self):
         self.agent = SupportAgent()
-        self.app = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).build()
+        # Different chats are handled concurrently, each chat strictly in order
+        self.update_processor = PerChatUpdateProcessor(
+            max_concurrent_updates=settings.MAX_CONCURRENT_UPDATES,
+            max_pending_updates=settings.MAX_PENDING_UPDATES
+        )
+        # All outbound messages go through one paced, prioritized queue
+        self.sender = TelegramSendScheduler()
+        builder = Application.builder().token(settings.TELEGRAM_BOT_TOKEN)
+        if settings.TELEGRAM_API_BASE_URL:
+            builder = builder.base_url(settings.TELEGRAM_API_BASE_URL)
+        self.app = (
+            builder
+            .concurrent_updates(self.update_processor)
+            .post_init(self._post_init)
+            .post_shutdown(self._post_shutdown)
+            .build()
+        )
+        self.webhook = None
+        self._warm_up_task = None
+        self._sweep_task = None
+        self.health = BotHealth(self)
+        self.monitoring = MonitoringServer(health=self.health) if settings.METRICS_ENABLED else None
+        self._register_metrics()
         self._setup_handlers()
         self._setup_shutdown_handlers()
         logger.info("✅ Telegram bot initialized")
@@ -37,6 +69,19 @@ class TelegramBot:
         logger.info("🛑 Bot shutting down gracefully...")
         sys.exit(0)
 
+    def _register_metrics(self):
+        updates = self.update_processor.scheduler
+        registry.gauge("telegram_updates_pending", "Updates waiting for a worker",
+                       fn=lambda: updates.pending)
+        registry.gauge("telegram_updates_running", "Updates being processed",
+                       fn=lambda: updates.running)
+        registry.gauge("telegram_send_pending", "Outbound sends waiting for capacity",
+                       fn=lambda: self.sender.pending)
+        registry.counter("telegram_send_failures_total", "Outbound sends that failed",
+                         fn=lambda: self.sender.failed)
+        registry.gauge("agent_queue_depth", "Agent queries waiting for a slot",
+                       fn=lambda: self.agent.agent_runner.waiting)
+
     def _setup_handlers(self):
         self.app.add_handler(CommandHandler("start", self.start_command))
         self.app.add_handler(CommandHandler("help", self.help_command))
@@ -50,25 +95,30 @@ class TelegramBot:
         )
 
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        await update.message.reply_text(strings.START_MESSAGE)
+        self.sender.reply(update.message, strings.START_MESSAGE)
 
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        await update.message.reply_text(strings.HELP_MESSAGE)
+        self.sender.reply(update.message, strings.HELP_MESSAGE)
 
     async def reset_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user_id = str(update.effective_user.id)
+        await self.agent.session_store.aload(user_id)
         self.agent.context_handler.clear_context(user_id)
-        await update.message.reply_text(strings.RESET_MESSAGE)
+        await self.agent.session_store.aflush(user_id)
+        self.sender.reply(update.message, strings.RESET_MESSAGE)
 
     async def bye_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        await update.message.reply_text(strings.BYE_MESSAGE)
+        self.sender.reply(update.message, strings.BYE_MESSAGE)
 
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user_id = str(update.effective_user.id)
+        await self.agent.session_store.aload(user_id)
         has_context = self.agent.context_handler.has_context(user_id)
 
         # Get cache stats
-        cache_stats = self.agent.rag.embedding_cache.get_stats()
+        rag = await self.agent.get_rag()
+        # The persistent tier runs SQLite queries; keep them off the event loop
+        cache_stats = await asyncio.to_thread(rag.embedding_cache.get_stats)
         cache_hit_rate = (
             cache_stats['hits'] / (cache_stats['hits'] + cache_stats['misses']) * 100
             if cache_stats['hits'] + cache_stats['misses'] > 0 else 0
@@ -84,7 +134,7 @@ class TelegramBot:
             size=cache_stats['size'],
             max_size=cache_stats['max_size']
         )
-        await update.message.reply_text(stats_text, parse_mode="Markdown")
+        self.sender.reply(update.message, stats_text, parse_mode="Markdown")
 
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Enhanced message handler with better error handling"""
@@ -95,17 +145,18 @@ class TelegramBot:
 
         user_message = update.message.text
         user_id = str(update.effective_user.id)
+        received_at = time.monotonic()
+        stream = StreamingReply(update.message, sender=self.sender) if settings.STREAMING_ENABLED else None
 
-        try:
-            await update.message.chat.send_action("typing")
-        except Exception as e:
-            logger.error(f"Failed to send typing action: {e}")
+        # Queued, not awaited; dropped if the reply is queued first
+        self.sender.typing(update.message.chat)
 
         try:
             result = await self.agent.process_message(
                 query=user_message,
                 user_id=user_id,
-                platform="telegram"
+                platform="telegram",
+                on_partial=stream.update if stream else None
             )
 
             response = result["answer"]
@@ -113,27 +164,38 @@ class TelegramBot:
                 confidence_pct = int(result["confidence"] * 100)
                 response += strings.CONFIDENCE_SUFFIX.format(confidence=confidence_pct)
 
-            await update.message.reply_text(response, parse_mode="Markdown")
+            if stream and await stream.finish(response):
+                logger.log_first_text(
+                    user_id, int((stream.first_text_at - received_at) * 1000), streamed=True
+                )
+            else:
+                def on_sent(future):
+                    if not future.cancelled() and future.exception() is None:
+                        logger.log_first_text(
+                            user_id, int((time.monotonic() - received_at) * 1000), streamed=False
+                        )
+
+                sent = self.sender.reply(update.message, response, parse_mode="Markdown")
+                sent.add_done_callback(on_sent)
 
         except Exception as e:
+            if stream:
+                await stream.close()
             logger.error(f"Critical error in handle_message for user {user_id}: {e}", exc_info=True)
-            try:
-                error_message = strings.ERROR_TECHNICAL.format(
-                    error_code=int(time.time())
-                )
-                await update.message.reply_text(error_message)
-            except Exception as send_error:
-                logger.error(f"Failed to send error message to user: {send_error}")
-            pass
+            error_message = strings.ERROR_TECHNICAL.format(
+                error_code=int(time.time())
+            )
+            self.sender.reply(update.message, error_message)
 
     async def cache_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user_id = str(update.effective_user.id)
 
         if user_id not in settings.ADMIN_IDS:
-            await update.message.reply_text(strings.ADMIN_ONLY)
+            self.sender.reply(update.message, strings.ADMIN_ONLY)
             return
 
-        cache_stats = self.agent.rag.embedding_cache.get_stats()
+        rag = await self.agent.get_rag()
+        cache_stats = await asyncio.to_thread(rag.embedding_cache.get_stats)
         hit_rate = (
             cache_stats['hits'] / (cache_stats['hits'] + cache_stats['misses']) * 100
             if cache_stats['hits'] + cache_stats['misses'] > 0 else 0
@@ -148,18 +210,121 @@ class TelegramBot:
             savings=cache_stats['hits'] * 0.0001
         )
 
-        await update.message.reply_text(cache_info, parse_mode="Markdown")
+        semantic_stats = rag.llm_manager.get_cache_stats()["semantic"]
+        if semantic_stats:
+            cache_info += strings.SEMANTIC_CACHE_INFO_TEMPLATE.format(**semantic_stats)
+        cache_info += strings.SESSION_INFO_TEMPLATE.format(
+            **await self.agent.session_store.aget_stats()
+        )
+        if self.webhook:
+            cache_info += strings.WEBHOOK_INFO_TEMPLATE.format(**self.webhook.get_stats())
+        cache_info += strings.SEND_QUEUE_INFO_TEMPLATE.format(**self.sender.get_stats())
+        for name, limiter_stats in get_rate_limit_stats().items():
+            cache_info += strings.RATE_LIMIT_INFO_TEMPLATE.format(name=name, **limiter_stats)
+
+        self.sender.reply(update.message, cache_info, parse_mode="Markdown")
 
     async def clearcache_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user_id = str(update.effective_user.id)
 
         if user_id not in settings.ADMIN_IDS:
-            await update.message.reply_text(strings.ADMIN_ONLY)
+            self.sender.reply(update.message, strings.ADMIN_ONLY)
             return
 
-        self.agent.rag.embedding_cache.clear_cache()
-        await update.message.reply_text(strings.CACHE_CLEARED)
+        rag = await self.agent.get_rag()
+        await asyncio.to_thread(rag.embedding_cache.clear_cache)
+        self.sender.reply(update.message, strings.CACHE_CLEARED)
+
+    def ensure_warm_up(self):
+        """Build RAG and the agent in the background unless built or already building"""
+        task = self._warm_up_task
+        if task is None or (task.done() and self.agent.rag is None):
+            self._warm_up_task = asyncio.create_task(self.agent.warm_up())
+
+    def _start_warm_up(self):
+        # Updates are served meanwhile; the first RAG or agent query waits for the build.
+        # Without it, the first message that needs them builds them
+        if settings.WARM_UP_ON_START:
+            self.ensure_warm_up()
+
+    def _start_session_sweep(self):
+        # Drops sessions of users who went quiet, whether or not new users arrive
+        if settings.SESSION_SWEEP_INTERVAL_SECONDS > 0:
+            self._sweep_task = asyncio.create_task(self.agent.session_store.run_sweeper())
+
+    def _stop_background_tasks(self):
+        for task in (self._warm_up_task, self._sweep_task):
+            if task:
+                task.cancel()
+
+    async def _post_init(self, application: Application):
+        # Polling mode; the webhook path starts its listeners itself
+        self._start_warm_up()
+        self._start_session_sweep()
+        if self.monitoring:
+            await self.monitoring.start(settings.METRICS_HOST, settings.METRICS_PORT)
+
+    async def _post_shutdown(self, application: Application):
+        # Polling mode; the webhook path drains the queue itself
+        self._stop_background_tasks()
+        await self.sender.shutdown()
+        if self.monitoring:
+            await self.monitoring.stop()
 
     def run(self):
         logger.info("🚀 Starting Telegram bot...")
-        self.app.run_polling(allowed_updates=Update.ALL_TYPES)
+        if settings.TELEGRAM_MODE == "webhook":
+            asyncio.run(self._run_webhook())
+        else:
+            self.app.run_polling(allowed_updates=Update.ALL_TYPES)
+
+    async def _run_webhook(self):
+        """Serve updates over a webhook until SIGINT/SIGTERM"""
+        secret_token = settings.WEBHOOK_SECRET_TOKEN
+        if not secret_token:
+            if not settings.WEBHOOK_URL:
+                raise ValueError("WEBHOOK_SECRET_TOKEN is required when WEBHOOK_URL is not set")
+            # We register the webhook ourselves, so a per-run secret is enough
+            secret_token = secrets.token_urlsafe(32)
+
+        self.webhook = WebhookServer(
+            self.app,
+            secret_token=secret_token,
+            path=settings.WEBHOOK_PATH,
+            max_queue=settings.WEBHOOK_QUEUE_SIZE,
+            workers=settings.MAX_CONCURRENT_UPDATES,
+            scheduler=self.update_processor.scheduler
+        )
+
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop_event.set)
+
+        await self.app.initialize()
+        await self.app.start()
+        self._start_warm_up()
+        self._start_session_sweep()
+        try:
+            if self.monitoring:
+                await self.monitoring.start(settings.METRICS_HOST, settings.METRICS_PORT)
+            await self.webhook.start(settings.WEBHOOK_HOST, settings.WEBHOOK_PORT)
+            if settings.WEBHOOK_URL:
+                await self.app.bot.set_webhook(
+                    url=settings.WEBHOOK_URL.rstrip("/") + settings.WEBHOOK_PATH,
+                    secret_token=secret_token,
+                    allowed_updates=Update.ALL_TYPES,
+                    max_connections=settings.WEBHOOK_MAX_CONNECTIONS
+                )
+                logger.info(f"✅ Webhook registered: {settings.WEBHOOK_URL}")
+            await stop_event.wait()
+            logger.info("⚠️ Shutdown signal received...")
+        finally:
+            self._stop_background_tasks()
+            await self.webhook.stop()
+            await self.sender.shutdown()
+            if self.monitoring:
+                await self.monitoring.stop()
+            await self.app.stop()
+            await self.app.shutdown()
+            logger.info("🛑 Bot shutting down gracefully...")
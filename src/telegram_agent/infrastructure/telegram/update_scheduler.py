@@ -0,0 +1,186 @@
+# ========================================
+# integrations/update_scheduler.py
+# Per-chat ordered, cross-chat concurrent update processing
+# ========================================
+
+"""
+Keyed serialization for Telegram updates.
+
+Every chat gets a FIFO lane. Lanes run concurrently up to a global limit,
+but at most one job per lane runs at a time, so a user's messages are
+handled strictly in order (context history and the order-number
+follow-up stay consistent) while other users are not blocked.
+
+Waiting jobs never hold a concurrency slot: a lane only takes a slot when
+its next job can actually run, and it goes to the back of the ready queue
+after each job, so one busy chat can't starve the others.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, Hashable, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from telegram_agent.infrastructure.utils.logger import logger
+
+
+def chat_key(update: object) -> Optional[Hashable]:
+    """Serialization key for an update (its chat), or None if it has no chat"""
+    if isinstance(update, Update) and update.effective_chat:
+        return update.effective_chat.id
+    return None
+
+
+def _mark_retrieved(future: asyncio.Future):
+    if not future.cancelled():
+        future.exception()
+
+
+class KeyedScheduler:
+    """Run jobs concurrently across keys and strictly in order within a key"""
+
+    def __init__(self, max_concurrency: int):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer")
+        self.max_concurrency = max_concurrency
+        self._lanes: Dict[Hashable, Deque[Tuple[Awaitable, asyncio.Future]]] = {}
+        self._ready: Deque[Hashable] = deque()
+        self._tasks = set()
+        self._idle: Optional[asyncio.Event] = None
+        self.running = 0
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self._busy_seconds = 0.0
+        self._started_at = time.monotonic()
+
+    def submit(self, key: Optional[Hashable], job: Awaitable) -> asyncio.Future:
+        """Queue `job` on the lane for `key` (None = no ordering constraint)"""
+        future = asyncio.get_running_loop().create_future()
+        # Fire-and-forget callers never await the future; don't warn about its exception
+        future.add_done_callback(_mark_retrieved)
+        if key is None:
+            key = object()  # lane of its own
+
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = deque()
+            self._ready.append(key)
+        lane.append((job, future))
+
+        self.pending += 1
+        if self._idle is not None:
+            self._idle.clear()
+        self._pump()
+        return future
+
+    async def run(self, key: Optional[Hashable], job: Awaitable) -> Any:
+        """Submit `job` and wait for its result"""
+        return await self.submit(key, job)
+
+    def _pump(self):
+        while self.running < self.max_concurrency and self._ready:
+            key = self._ready.popleft()
+            job, future = self._lanes[key][0]
+            self.running += 1
+            self.pending -= 1
+            task = asyncio.create_task(self._run_job(key, job, future))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_job(self, key: Hashable, job: Awaitable, future: asyncio.Future):
+        started = time.monotonic()
+        try:
+            if future.cancelled():
+                # Caller gave up before the job started
+                if asyncio.iscoroutine(job):
+                    job.close()
+            else:
+                result = await job
+                if not future.done():
+                    future.set_result(result)
+                self.completed += 1
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+        except Exception as e:
+            self.failed += 1
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            self._busy_seconds += time.monotonic() - started
+            self.running -= 1
+            lane = self._lanes[key]
+            lane.popleft()
+            if lane:
+                self._ready.append(key)  # round-robin: back of the line
+            else:
+                del self._lanes[key]
+            self._pump()
+            if not self.running and not self.pending and self._idle is not None:
+                self._idle.set()
+
+    async def join(self):
+        """Wait until every submitted job has finished"""
+        if not self.running and not self.pending:
+            return
+        if self._idle is None:
+            self._idle = asyncio.Event()
+        await self._idle.wait()
+
+    async def shutdown(self, timeout: float = 10.0):
+        """Let queued jobs finish for up to `timeout`, then cancel the rest"""
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Cancelling {self.running + self.pending} unfinished updates on shutdown")
+            for lane in self._lanes.values():
+                for job, future in list(lane)[1:]:
+                    future.cancel()
+                    if asyncio.iscoroutine(job):
+                        job.close()
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._lanes.clear()
+            self._ready.clear()
+            self.pending = 0
+
+    def get_stats(self) -> dict:
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "running": self.running,
+            "pending": self.pending,
+            "lanes": len(self._lanes),
+            "max_concurrency": self.max_concurrency,
+            "utilization": min(self._busy_seconds / (elapsed * self.max_concurrency), 1.0),
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """python-telegram-bot update processor backed by a KeyedScheduler
+
+    PTB's own semaphore is taken before do_process_update, so it is sized
+    to `max_pending_updates` and only bounds how many updates may be in
+    flight; the real concurrency limit is applied by the scheduler, after
+    the per-chat ordering.
+    """
+
+    def __init__(self, max_concurrent_updates: int, max_pending_updates: int):
+        super().__init__(max(max_pending_updates, max_concurrent_updates))
+        self.scheduler = KeyedScheduler(max_concurrent_updates)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        await self.scheduler.run(chat_key(update), coroutine)
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        await self.scheduler.shutdown()
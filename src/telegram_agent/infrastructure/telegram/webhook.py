@@ -0,0 +1,114 @@
+# ========================================
+# integrations/webhook.py
+# Telegram webhook server with an internal worker pool
+# ========================================
+
+"""
+Webhook serving mode.
+
+Telegram POSTs each update to WEBHOOK_PATH. The handler checks the secret
+token, queues the update on its chat's lane in a KeyedScheduler and
+answers 200 immediately; up to `workers` updates are processed at once
+through Application.process_update (which ends in
+SupportAgent.process_message), in order within each chat. When
+`max_queue` updates are already waiting the update is refused with 503
+so Telegram redelivers it later instead of timing out on a slow reply.
+"""
+
+import hmac
+from typing import Optional
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+from telegram_agent.infrastructure.telegram.update_scheduler import KeyedScheduler, chat_key
+from telegram_agent.infrastructure.utils.logger import logger
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """Accepts Telegram updates over HTTP and processes them with N workers"""
+
+    def __init__(self, application: Application, secret_token: str, path: str,
+                 max_queue: int, workers: int, scheduler: KeyedScheduler = None):
+        self.application = application
+        self.secret_token = secret_token
+        self.path = path
+        self.max_queue = max_queue
+        self.scheduler = scheduler or KeyedScheduler(workers)
+        self._runner: Optional[web.AppRunner] = None
+
+        self.received = 0
+        self.dropped = 0
+        self.unauthorized = 0
+
+    # ====== HTTP ======
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        return app
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode(), self.secret_token.encode()):
+            self.unauthorized += 1
+            logger.warning(f"⚠️ Rejected webhook call with bad secret from {request.remote}")
+            return web.Response(status=403)
+
+        try:
+            update = Update.de_json(await request.json(), self.application.bot)
+        except Exception as e:
+            logger.warning(f"⚠️ Malformed webhook payload: {e}")
+            return web.Response(status=400)
+
+        if self.scheduler.pending >= self.max_queue:
+            # Telegram retries non-2xx responses, so the update isn't lost
+            self.dropped += 1
+            logger.warning(f"⚠️ Update queue full ({self.max_queue}), refusing update {update.update_id}")
+            return web.Response(status=503)
+
+        self.received += 1
+        self.scheduler.submit(chat_key(update), self._process(update))
+        return web.Response(status=200)
+
+    # ====== Processing ======
+    async def _process(self, update: Update):
+        try:
+            await self.application.process_update(update)
+        except Exception as e:
+            logger.error(f"Failed to process update {update.update_id}: {e}", exc_info=True)
+            raise
+
+    async def start(self, host: str, port: int):
+        """Start the HTTP listener"""
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(
+            f"🌐 Webhook listening on {host}:{port}{self.path} "
+            f"({self.scheduler.max_concurrency} workers)"
+        )
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """Stop accepting updates and let queued ones finish"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        await self.scheduler.shutdown(drain_timeout)
+
+    def get_stats(self) -> dict:
+        scheduler = self.scheduler.get_stats()
+        return {
+            "queue_depth": scheduler["pending"],
+            "max_queue": self.max_queue,
+            "workers": scheduler["max_concurrency"],
+            "busy": scheduler["running"],
+            "utilization": scheduler["utilization"],
+            "received": self.received,
+            "processed": scheduler["completed"],
+            "failed": scheduler["failed"],
+            "dropped": self.dropped,
+            "unauthorized": self.unauthorized
+        }
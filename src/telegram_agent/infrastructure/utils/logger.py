@@ -1,90 +1,223 @@
+import atexit
+import copy
+import json
 import logging
-from datetime import datetime
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler, WatchedFileHandler
 from pathlib import Path
+from typing import Dict, Optional
 from telegram_agent.config.settings import settings
 
+# Fields every JSON line carries (null when a line doesn't set them)
+JSON_FIELDS = ("user_id", "route", "latency_ms", "confidence")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, message and the record's fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None) or {}
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for name in JSON_FIELDS:
+            entry[name] = fields.get(name)
+        entry.update((name, value) for name, value in fields.items() if name not in entry)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: a full queue drops the record and counts it"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the args but keep exc_info for the listener's formatter
+
+        The stock prepare() formats the whole record here, folding the
+        traceback into the message and clearing exc_info, so the JSON
+        formatter could never emit "exc". The listener runs in this
+        process, so the exception objects can travel as they are.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
 class BotLogger:
-    """Structured logging for the bot"""
-    
+    """Structured logging for the bot.
+
+    With LOG_QUEUE_ENABLED, callers only put records on a bounded queue;
+    file and console output happen on a background thread, so a slow
+    disk or a blocked stdout never stalls the event loop. Messages take
+    %-style args and are only formatted when the level is enabled.
+    """
+
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._initialize()
         return cls._instance
-    
+
     def _initialize(self):
         """Initialize logger"""
         # Create logs directory
         Path(settings.LOG_FILE_PATH).mkdir(exist_ok=True)
-        
+
         # Setup logger
         self.logger = logging.getLogger("SupportBot")
         self.logger.setLevel(getattr(logging, settings.LOG_LEVEL))
-        
-        # File handler
-        log_file = Path(settings.LOG_FILE_PATH) / f"bot_{datetime.now().strftime('%Y%m%d')}.log"
-        fh = logging.FileHandler(log_file, encoding='utf-8')
-        
+
+        # File handler. "midnight" rotates in-process (bot.log, bot.log.YYYY-MM-DD, ...)
+        # and needs a single writer; "external" reopens the file after logrotate moves it,
+        # so several processes can append to the same bot.log
+        log_file = Path(settings.LOG_FILE_PATH) / "bot.log"
+        if settings.LOG_FILE_ROTATION == "external":
+            fh = WatchedFileHandler(log_file, encoding='utf-8')
+        else:
+            fh = TimedRotatingFileHandler(
+                log_file, when="midnight", backupCount=settings.LOG_ROTATION_BACKUPS, encoding='utf-8'
+            )
+
         # Console handler
         ch = logging.StreamHandler()
-        
+
         # Formatter
-        formatter = logging.Formatter(
-            '%(asctime)s | %(levelname)-8s | %(message)s',
-            datefmt='%H:%M:%S'
-        )
+        if settings.LOG_FORMAT == "json":
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                '%(asctime)s | %(levelname)-8s | %(message)s',
+                datefmt='%H:%M:%S'
+            )
         fh.setFormatter(formatter)
         ch.setFormatter(formatter)
-        
-        self.logger.addHandler(fh)
-        self.logger.addHandler(ch)
-    
+
+        self.sample_rates: Dict[str, float] = dict(settings.LOG_SAMPLE_RATES)
+        self.sampled_out: Dict[str, int] = {}
+        self._queue_handler: Optional[_DroppingQueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+
+        if settings.LOG_QUEUE_ENABLED:
+            self._queue_handler = _DroppingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+            self._listener = QueueListener(self._queue_handler.queue, fh, ch, respect_handler_level=True)
+            self._listener.start()
+            self.logger.addHandler(self._queue_handler)
+            # Flush what's queued when the process exits
+            atexit.register(self.shutdown)
+        else:
+            self.logger.addHandler(fh)
+            self.logger.addHandler(ch)
+
+    def shutdown(self):
+        """Stop the background writer after it drains the queue"""
+        if self._listener:
+            self._listener.stop()
+            self._listener = None
+
+    def get_stats(self) -> dict:
+        return {
+            "queued": self._queue_handler.queue.qsize() if self._queue_handler else 0,
+            "dropped": self._queue_handler.dropped if self._queue_handler else 0,
+            "sampled_out": dict(self.sampled_out)
+        }
+
+    def _log(self, level: int, message: str, args: tuple, fields: dict,
+             exc_info: bool = False, category: str = None):
+        if not self.logger.isEnabledFor(level):
+            return
+        if category is not None:
+            rate = self.sample_rates.get(category, 1.0)
+            if rate < 1.0 and random.random() >= rate:
+                self.sampled_out[category] = self.sampled_out.get(category, 0) + 1
+                return
+            fields["category"] = category
+        self.logger.log(
+            level, message, *args,
+            exc_info=exc_info, extra={"fields": fields} if fields else None, stacklevel=3
+        )
+
     def log_query(self, user_id: str, query: str, platform: str = "telegram"):
         """Log incoming query"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         self.logger.info(
-            f"📨 Query | User: {user_id} | Platform: {platform} | "
-            f"Query: {query[:50]}{'...' if len(query) > 50 else ''}"
+            "📨 Query | User: %s | Platform: %s | Query: %s",
+            user_id, platform, query[:50] + ("..." if len(query) > 50 else ""),
+            extra={"fields": {"user_id": user_id, "platform": platform}}
         )
 
     def log_response(self, user_id: str, confidence: float,
             status: str, latency_ms: int, sources: int):
         """Log response with metrics"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         emoji = "✅" if confidence >= 0.8 else "⚠️" if confidence >= 0.5 else "❓"
         self.logger.info(
-            f"{emoji} Response | User: {user_id} | "
-            f"Confidence: {confidence:.0%} | Status: {status} | "
-            f"Sources: {sources} | Latency: {latency_ms}ms"
+            "%s Response | User: %s | Confidence: %.0f%% | Status: %s | Sources: %s | Latency: %sms",
+            emoji, user_id, confidence * 100, status, sources, latency_ms,
+            extra={"fields": {
+                "user_id": user_id, "route": status, "latency_ms": latency_ms,
+                "confidence": round(confidence, 3), "sources": sources
+            }}
+        )
+
+    def log_first_text(self, user_id: str, latency_ms: int, streamed: bool):
+        """Log time until the user first saw text (primary latency metric)"""
+        mode = "stream" if streamed else "full"
+        self._log(
+            logging.INFO, "⏱️ First Text | User: %s | Mode: %s | Latency: %sms",
+            (user_id, mode, latency_ms),
+            {"user_id": user_id, "latency_ms": latency_ms, "mode": mode}
         )
 
     def log_error(self, user_id: str, error: Exception, context: str = ""):
         """Log error with context"""
-        self.logger.error(
-            f"❌ Error | User: {user_id} | Context: {context} | "
-            f"Error: {str(error)}", 
+        self._log(
+            logging.ERROR, "❌ Error | User: %s | Context: %s | Error: %s",
+            (user_id, context, error),
+            {"user_id": user_id, "context": context},
             exc_info=True
-        ) 
-        
+        )
+
     def log_approval_needed(self, user_id: str, query: str, confidence: float):
         """Log when manual approval is needed"""
-        self.logger.warning(
-            f"⏳ Approval Needed | User: {user_id} | "
-            f"Confidence: {confidence:.0%} | Query: {query[:50]}"
+        self._log(
+            logging.WARNING, "⏳ Approval Needed | User: %s | Confidence: %.0f%% | Query: %s",
+            (user_id, confidence * 100, query[:50]),
+            {"user_id": user_id, "confidence": round(confidence, 3)}
         )
-      
-
-    def info(self, message: str):
-        self.logger.info(message)
-    
-    def warning(self, message: str):
-        self.logger.warning(message)
-    
-    def error(self, message: str, exc_info: bool = False):
-        self.logger.error(message, exc_info=exc_info)
-    
-    def debug(self, message: str):
-        self.logger.debug(message)
+
+    def info(self, message: str, *args, **fields):
+        self._log(logging.INFO, message, args, fields)
+
+    def warning(self, message: str, *args, **fields):
+        self._log(logging.WARNING, message, args, fields)
+
+    def error(self, message: str, *args, exc_info: bool = False, **fields):
+        self._log(logging.ERROR, message, args, fields, exc_info=exc_info)
+
+    def debug(self, message: str, *args, category: str = None, **fields):
+        """Debug line; a `category` listed in LOG_SAMPLE_RATES is sampled"""
+        self._log(logging.DEBUG, message, args, fields, category=category)
 
 # Global logger instance
 logger = BotLogger()
@@ -0,0 +1,278 @@
+"""
+In-process metrics in the Prometheus text format.
+
+Histograms use fixed buckets (one bisect and a few additions per
+observation), so timing the hot path costs microseconds. Request stages
+are timed with `stage()`. Each stage's duration is collected on the
+request that is active in the current context. When the request
+finishes, all of them are recorded under the request's route
+(agent_handled, high_confidence, no_context, ...). The route isn't known
+until the end, which is why stages are not recorded directly.
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Includes the spec's 3 second response target as a bucket edge
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count; `fn` reads the value from existing stats instead"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 fn: Callable[[], float] = None):
+        super().__init__(name, help, labelnames)
+        self._fn = fn
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        if self._fn is not None:
+            return self._fn()
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        if self._fn is not None:
+            return [f"{self.name} {_format_value(self._fn())}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Current value (queue depth, utilization, ...)"""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values (seconds, by convention)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # The last slot counts values above every bucket edge
+                series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series.count if series else 0
+
+    def counts(self) -> Dict[Tuple[str, ...], int]:
+        """Observation count for every label combination seen so far"""
+        with self._lock:
+            return {key: series.count for key, series in self._series.items()}
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            snapshot = [
+                (key, list(series.counts), series.sum, series.count)
+                for key, series in sorted(self._series.items())
+            ]
+        lines = []
+        for key, counts, total, count in snapshot:
+            cumulative = 0
+            for edge, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(edge)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics, rendered together for the /metrics endpoint"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                if getattr(metric, "_fn", None) is not None:
+                    # Callback metrics follow the newest owner (e.g. a rebuilt bot)
+                    existing._fn = metric._fn
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = (),
+                fn: Callable[[], float] = None) -> Counter:
+        return self._register(Counter(name, help, labelnames, fn))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (),
+              fn: Callable[[], float] = None) -> Gauge:
+        return self._register(Gauge(name, help, labelnames, fn))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_SECONDS = registry.histogram(
+    "support_request_duration_seconds",
+    "Time to produce an answer, by route",
+    ["route"]
+)
+STAGE_SECONDS = registry.histogram(
+    "support_stage_duration_seconds",
+    "Time spent in each processing stage, by route",
+    ["stage", "route"]
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "support_requests_in_flight",
+    "Messages currently being answered"
+)
+
+
+# ====== Per-request stage timing ======
+class RequestTimer:
+    """Stage timings for one request, recorded under its route on finish()"""
+
+    __slots__ = ("started", "stages", "_token")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self._token = _current_request.set(self)
+        REQUESTS_IN_FLIGHT.inc()
+
+    def add(self, stage_name: str, seconds: float):
+        self.stages[stage_name] = self.stages.get(stage_name, 0.0) + seconds
+
+    def finish(self, route: str):
+        _current_request.reset(self._token)
+        REQUESTS_IN_FLIGHT.dec()
+        REQUEST_SECONDS.observe(time.perf_counter() - self.started, route=route)
+        for stage_name, seconds in self.stages.items():
+            STAGE_SECONDS.observe(seconds, stage=stage_name, route=route)
+
+
+_current_request: contextvars.ContextVar[Optional[RequestTimer]] = contextvars.ContextVar(
+    "current_request", default=None
+)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as stage `name` of the current request (no-op outside one)"""
+    request = _current_request.get()
+    if request is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        request.add(name, time.perf_counter() - started)
@@ -0,0 +1,80 @@
+"""
+Monitoring HTTP listener.
+
+Runs on the bot's own event loop, on its own port (METRICS_PORT),
+separate from the public webhook listener, in both polling and webhook
+mode. It serves:
+- /metrics: the metrics registry in the Prometheus text format
+- /health/live: 200 while the loop is responsive
+- /health/ready: 200 or 503, with the individual checks
+- /health: counters and cache stats as JSON
+
+The health endpoints are only served when a health provider is given
+(see infrastructure/telegram/health.py).
+"""
+
+from typing import Optional, Protocol, Tuple
+
+from aiohttp import web
+
+from telegram_agent.infrastructure.utils.logger import logger
+from telegram_agent.infrastructure.utils.metrics import MetricsRegistry, registry as default_registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class HealthProvider(Protocol):
+    async def start(self): ...
+    async def stop(self): ...
+    def liveness(self) -> dict: ...
+    def readiness(self) -> Tuple[bool, dict]: ...
+    def snapshot(self) -> dict: ...
+
+
+class MonitoringServer:
+    """Metrics and health endpoints on a dedicated aiohttp listener"""
+
+    def __init__(self, registry: MetricsRegistry = None, health: HealthProvider = None):
+        self.registry = registry or default_registry
+        self.health = health
+        self._runner: Optional[web.AppRunner] = None
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        if self.health:
+            app.router.add_get("/health", self.handle_health)
+            app.router.add_get("/health/live", self.handle_live)
+            app.router.add_get("/health/ready", self.handle_ready)
+        return app
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.registry.render().encode("utf-8"),
+                            headers={"Content-Type": CONTENT_TYPE})
+
+    async def handle_live(self, request: web.Request) -> web.Response:
+        return web.json_response(self.health.liveness())
+
+    async def handle_ready(self, request: web.Request) -> web.Response:
+        ready, checks = self.health.readiness()
+        return web.json_response({"ready": ready, "checks": checks}, status=200 if ready else 503)
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        snapshot = self.health.snapshot()
+        status = 200 if snapshot["status"] == "healthy" else 503
+        return web.json_response(snapshot, status=status)
+
+    async def start(self, host: str, port: int):
+        if self.health:
+            await self.health.start()
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"📈 Monitoring listening on {host}:{port} (/metrics, /health)")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        if self.health:
+            await self.health.stop()
@@ -0,0 +1,223 @@
+"""
+Client-side admission control for OpenAI calls.
+
+One RateLimiter per model holds two token buckets: requests per minute
+and tokens per minute. Callers reserve capacity before each API call and
+wait for it if needed; when the wait would exceed the deadline they fail
+fast with RateLimitExceeded instead of adding to a 429 storm.
+
+Reservations may drive a bucket below zero, so callers queue up in order
+and each one's wait is known at reservation time. The buckets follow the
+x-ratelimit-* response headers and back off on Retry-After.
+
+A 429 the OpenAI SDK gave up retrying (openai.RateLimitError) means the
+same thing to callers; rate_limit_errors() lists both exception types.
+"""
+
+import asyncio
+import math
+import re
+import sys
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple, Type
+
+from telegram_agent.config.settings import settings
+from telegram_agent.infrastructure.utils.logger import logger
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class RateLimitExceeded(Exception):
+    """Capacity won't be available before the caller's deadline"""
+
+    def __init__(self, name: str, wait: float):
+        super().__init__(f"{name}: rate limit reached (would wait {wait:.1f}s)")
+        self.wait = wait
+
+
+def rate_limit_errors() -> Tuple[Type[Exception], ...]:
+    """Exceptions that mean "rate limited", for use in except clauses.
+
+    openai is only looked up, never imported: if it isn't loaded, no
+    OpenAI call can have raised its RateLimitError.
+    """
+    openai = sys.modules.get("openai")
+    if openai is None:
+        return (RateLimitExceeded,)
+    return (RateLimitExceeded, openai.RateLimitError)
+
+
+def estimate_tokens(text: str) -> int:
+    # Conservative estimate that also holds for Hebrew text
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def parse_reset(value: str) -> Optional[float]:
+    """Parse OpenAI reset durations such as '1s', '6m0s' or '120ms'"""
+    parts = _DURATION_PART.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(amount) * _UNIT_SECONDS[unit] for amount, unit in parts)
+
+
+class _Bucket:
+    __slots__ = ("capacity", "rate", "level", "updated")
+
+    def __init__(self, per_minute: int, now: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = now
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` is covered, given the current level"""
+        deficit = amount - self.level
+        return deficit / self.rate if deficit > 0 else 0.0
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limiter for one model"""
+
+    def __init__(self, name: str, requests_per_minute: int, tokens_per_minute: int,
+                 max_wait: float):
+        now = time.monotonic()
+        self.name = name
+        self.max_wait = max_wait
+        self._requests = _Bucket(requests_per_minute, now)
+        self._tokens = _Bucket(tokens_per_minute, now)
+        self._blocked_until = 0.0
+        # Used from the event loop and from executor threads
+        self._lock = threading.Lock()
+
+        self.admitted = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.throttled_seconds = 0.0
+        self.server_429s = 0
+
+    def reserve(self, tokens: int, max_wait: Optional[float] = None) -> float:
+        """Reserve one request and `tokens`; returns how long to wait before calling"""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        with self._lock:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            tokens = min(tokens, self._tokens.capacity)  # oversized calls still get through
+            wait = max(
+                self._requests.wait_for(1),
+                self._tokens.wait_for(tokens),
+                self._blocked_until - now,
+                0.0
+            )
+            if wait > max_wait:
+                self.rejected += 1
+                raise RateLimitExceeded(self.name, wait)
+            self._requests.level -= 1
+            self._tokens.level -= tokens
+            self.admitted += 1
+            if wait > 0:
+                self.throttled += 1
+                self.throttled_seconds += wait
+            return wait
+
+    async def acquire(self, tokens: int, max_wait: Optional[float] = None):
+        """Wait (without blocking the loop) until the call may proceed"""
+        wait = self.reserve(tokens, max_wait)
+        if wait > 0:
+            logger.debug("🚦 %s: throttled %.0fms", self.name, wait * 1000, category="rate_limit")
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, tokens: int, max_wait: Optional[float] = None):
+        """Blocking variant for worker threads"""
+        wait = self.reserve(tokens, max_wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    def update_from_headers(self, status_code: int, headers: Mapping[str, str]):
+        """Adapt to the server's view of our limits"""
+        with self._lock:
+            now = time.monotonic()
+            for bucket, kind in ((self._requests, "requests"), (self._tokens, "tokens")):
+                limit = headers.get(f"x-ratelimit-limit-{kind}")
+                if limit and limit.isdigit() and int(limit) > 0:
+                    bucket.refill(now)
+                    bucket.capacity = float(limit)
+                    bucket.rate = int(limit) / 60.0
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                if remaining and remaining.isdigit():
+                    bucket.refill(now)
+                    bucket.level = min(bucket.level, float(remaining))
+
+            if status_code == 429:
+                self.server_429s += 1
+                retry_after = self._retry_after(headers)
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+                logger.warning(f"🚦 {self.name}: 429 from server, backing off {retry_after:.1f}s")
+
+    @staticmethod
+    def _retry_after(headers: Mapping[str, str]) -> float:
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except ValueError:
+            pass
+        resets = [
+            parse_reset(headers.get(f"x-ratelimit-reset-{kind}", ""))
+            for kind in ("requests", "tokens")
+        ]
+        return max([reset for reset in resets if reset is not None], default=1.0)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            return {
+                "rpm": int(self._requests.capacity),
+                "tpm": int(self._tokens.capacity),
+                "requests_available": max(0, int(self._requests.level)),
+                "tokens_available": max(0, int(self._tokens.level)),
+                "admitted": self.admitted,
+                "throttled": self.throttled,
+                "rejected": self.rejected,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "server_429s": self.server_429s
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> Optional[RateLimiter]:
+    """Shared limiter for a model (None when RATE_LIMIT_ENABLED is off)"""
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            if model == settings.EMBEDDING_MODEL:
+                rpm, tpm = settings.EMBEDDING_RPM_LIMIT, settings.EMBEDDING_TPM_LIMIT
+            else:
+                rpm, tpm = settings.LLM_RPM_LIMIT, settings.LLM_TPM_LIMIT
+            limiter = _limiters[model] = RateLimiter(
+                model, rpm, tpm, max_wait=settings.RATE_LIMIT_MAX_WAIT_SECONDS
+            )
+        return limiter
+
+
+def get_all_stats() -> Dict[str, dict]:
+    with _limiters_lock:
+        return {name: limiter.get_stats() for name, limiter in _limiters.items()}
+
+
+# Batch jobs (indexing) may wait as long as it takes
+NO_DEADLINE = math.inf
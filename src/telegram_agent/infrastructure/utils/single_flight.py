@@ -0,0 +1,127 @@
+"""
+Single-flight request coalescing.
+
+Concurrent calls with the same key share one execution: the first caller
+starts the work, later callers wait on the same result. Errors reach
+every waiter. The async variant runs the work in its own task behind
+asyncio.shield, so cancelling one waiter (even the first) doesn't cancel
+the shared call.
+
+A shared call that produces output incrementally publishes it to a
+ChunkBroadcast; each waiter replays it with its own callback, so a slow
+or failing callback only affects the waiter it belongs to.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+T = TypeVar("T")
+
+
+def _consume_exception(task: asyncio.Future):
+    # Every waiter may have been cancelled; don't warn about an unretrieved error
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """Coalesce identical in-flight coroutine calls"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.shared = 0
+
+    def join(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> "asyncio.Future[T]":
+        """Return the in-flight task for key, starting fn() if there is none"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self.started += 1
+            task.add_done_callback(_consume_exception)
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            self.shared += 1
+        return task
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await fn() once per key; concurrent callers share the result"""
+        return await asyncio.shield(self.join(key, fn))
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class ChunkBroadcast:
+    """Chunks of one shared call, replayed to every waiter from the start"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def publish(self, chunk: str):
+        self.chunks.append(chunk)
+        self._wake()
+
+    def close(self):
+        self.closed = True
+        self._wake()
+
+    def _wake(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self, on_chunk: Callable[[str], Awaitable[None]]):
+        """Pass every chunk to on_chunk in order; returns once the call is done"""
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.chunks):
+                await on_chunk(self.chunks[sent])
+                sent += 1
+            if self.closed:
+                return
+            if changed is self._changed:
+                await changed.wait()
+
+
+class ThreadSingleFlight:
+    """Coalesce identical in-flight blocking calls across threads"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+                self.started += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,376 @@
+"""
+Micro-benchmarks for the code every message runs through.
+
+Each benchmark calls one function over a corpus of realistic Hebrew and
+English messages (and, for the history functions, sessions with 0, 2 and
+MAX_CONVERSATION_HISTORY turns). Reported per call:
+- ns/op: best of --rounds timed runs over the whole corpus, divided by
+  the number of calls (timeit auto-ranges the loop count)
+- alloc B/op: mean peak of memory allocated during one call (tracemalloc)
+
+Baselines work like pytest-benchmark's save/compare:
+    python -m tests.benchmarks --save before
+    # ... change the code ...
+    python -m tests.benchmarks --compare before --max-regression 15
+
+Baselines are JSON files in .benchmarks/ (git-ignored: numbers only
+compare on the same machine). --compare exits 1 when any benchmark got
+slower than --max-regression percent. --filter runs a subset.
+
+From the command line, logging runs at WARNING unless LOG_LEVEL is set, so INFO lines on the
+hot path (e.g. "Extracted order number") aren't written to the console
+hundreds of thousands of times.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import re
+import sys
+import time
+import timeit
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).parent.parent
+src_path = REPO_ROOT / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "benchmark-token")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-key")
+
+BASELINE_DIR = REPO_ROOT / ".benchmarks"
+
+HEBREW_MESSAGES = [
+    "שלום",
+    "מה שעות הפעילות שלכם?",
+    "איפה ההזמנה שלי? מספר הזמנה 12345",
+    "בדוק בבקשה את ההזמנה",
+    "54321",
+    "כמה זמן לוקח משלוח לאילת?",
+    "איך אפשר להחזיר מוצר שלא התאים לי?",
+    "אפשר לדבר עם נציג אנושי?",
+    "האם יש אחריות על המוצרים ומה היא כוללת?",
+    "הזמנתי לפני שבוע ועדיין לא קיבלתי כלום, ההזמנה 98765, מה קורה איתה? אני ממש מחכה לזה",
+    "תודה רבה!",
+    "מה מדיניות ההחזרים וכמה זמן לוקח לקבל את הכסף בחזרה?",
+]
+
+ENGLISH_MESSAGES = [
+    "hi",
+    "What are your opening hours?",
+    "Where is my order #12345?",
+    "Can you check my order please",
+    "order 54321",
+    "How long does shipping take?",
+    "How do I return a product that didn't fit?",
+    "Can I talk to a human agent?",
+    "Do the products come with a warranty and what does it cover?",
+    "I ordered a week ago and still haven't received anything, order 98765, what is going on? "
+    "I really need this before the weekend",
+    "thanks!",
+    "What is the refund policy and how long until I get my money back?",
+]
+
+MESSAGES = HEBREW_MESSAGES + ENGLISH_MESSAGES
+
+
+# ====== Registry ======
+# name -> setup() returning (fn, items); fn(item) is one operation
+BENCHMARKS: Dict[str, Callable[[], Tuple[Callable[[Any], Any], Sequence[Any]]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _history_users(store, context_handler, lengths=None) -> List[str]:
+    """One user per history length, each with that many turns"""
+    from telegram_agent.config.settings import settings
+
+    lengths = lengths or (0, 2, settings.MAX_CONVERSATION_HISTORY)
+    users = []
+    for length in lengths:
+        user_id = f"history-{length}"
+        store.get_or_create(user_id)
+        for turn in range(length):
+            query = MESSAGES[turn % len(MESSAGES)]
+            context_handler.add_message(user_id, query, f"תשובה {turn}: " + "טקסט " * 40, 0.8)
+        users.append(user_id)
+    return users
+
+
+@benchmark("intent_matcher.match")
+def bench_intent_match():
+    from telegram_agent.application.conversation_service.intent_matcher import intent_matcher
+
+    return intent_matcher.match, MESSAGES
+
+
+@benchmark("SupportAgent._should_use_agent")
+def bench_should_use_agent():
+    from telegram_agent.application.conversation_service.handlers.order_handler import OrderHandler
+    from telegram_agent.application.conversation_service.handlers.session_store import BoundedSessionStore
+    from telegram_agent.application.conversation_service.support_agent import SupportAgent
+
+    # Only the order handler is used; skip building the RAG engine
+    agent = SimpleNamespace(order_handler=OrderHandler(BoundedSessionStore()))
+    return (lambda query: SupportAgent._should_use_agent(agent, query, "bench-user")), MESSAGES
+
+
+@benchmark("OrderHandler.is_order_query")
+def bench_is_order_query():
+    from telegram_agent.application.conversation_service.handlers.order_handler import OrderHandler
+    from telegram_agent.application.conversation_service.handlers.session_store import BoundedSessionStore
+
+    handler = OrderHandler(BoundedSessionStore())
+    # Half the users were just asked for their order number
+    handler.store.get_or_create("waiting-user").waiting_for_order = True
+    handler.store.get_or_create("idle-user")
+    items = [(query, user_id) for query in MESSAGES for user_id in ("waiting-user", "idle-user")]
+    return (lambda item: handler.is_order_query(*item)), items
+
+
+@benchmark("OrderHandler.extract_order_number")
+def bench_extract_order_number():
+    from telegram_agent.application.conversation_service.handlers.order_handler import OrderHandler
+    from telegram_agent.application.conversation_service.handlers.session_store import BoundedSessionStore
+
+    return OrderHandler(BoundedSessionStore()).extract_order_number, MESSAGES
+
+
+@benchmark("ContextHandler.get_context")
+def bench_get_context():
+    from telegram_agent.application.conversation_service.handlers.context_handler import ContextHandler
+    from telegram_agent.application.conversation_service.handlers.session_store import BoundedSessionStore
+
+    handler = ContextHandler(BoundedSessionStore())
+    return handler.get_context, _history_users(handler.store, handler)
+
+
+@benchmark("ContextHandler.add_message")
+def bench_add_message():
+    from telegram_agent.application.conversation_service.handlers.context_handler import ContextHandler
+    from telegram_agent.application.conversation_service.handlers.session_store import BoundedSessionStore
+
+    handler = ContextHandler(BoundedSessionStore())
+    users = _history_users(handler.store, handler)
+    items = [(user_id, query) for user_id in users for query in MESSAGES[::4]]
+    answer = "✅ " + "טקסט תשובה " * 30
+    return (lambda item: handler.add_message(item[0], item[1], answer, 0.9)), items
+
+
+@benchmark("EmbeddingCache.embed_query[hit]")
+def bench_embed_query_hit():
+    from telegram_agent.application.rag_indexing_service.embeddings import EmbeddingCache
+    from telegram_agent.config.settings import settings
+
+    class NoEmbeddings:
+        def embed_query(self, text):
+            return [0.1] * 1536
+
+    # Measure the in-memory tier, not SQLite
+    store_path, settings.EMBEDDING_STORE_PATH = settings.EMBEDDING_STORE_PATH, None
+    try:
+        cache = EmbeddingCache(SimpleNamespace(get_embeddings=NoEmbeddings))
+    finally:
+        settings.EMBEDDING_STORE_PATH = store_path
+    cache.rate_limiter = None
+    for message in MESSAGES:
+        cache.embed_query(message)  # warm: every timed call is a hit
+    return cache.embed_query, MESSAGES
+
+
+@benchmark("RAGEngine.build_prompt")
+def bench_build_prompt():
+    from telegram_agent.application.rag_indexing_service.rag import RAGEngine
+
+    knowledge_base = json.loads((REPO_ROOT / "data" / "knowledge_base.json").read_text(encoding="utf-8"))
+    documents = [
+        {"content": item["content"], "metadata": item.get("metadata", {}), "score": 0.4 + i * 0.1}
+        for i, item in enumerate(knowledge_base[:3])
+    ]
+    items = [(message, "en" if message in ENGLISH_MESSAGES else "he") for message in MESSAGES]
+    return (lambda item: RAGEngine.build_prompt(item[0], documents, item[1])), items
+
+
+@benchmark("get_localized_answer[resolved]")
+def bench_localized_resolved():
+    from telegram_agent.application.conversation_service.handlers.language_handler import current_language
+    from telegram_agent.application.conversation_service.workflow.info_tools import get_localized_answer
+    from telegram_agent.config.strings import info_strings
+
+    current_language.set("he")
+
+    def op(message):
+        return get_localized_answer(
+            info_strings.WORKING_HOURS_ANSWER_HE, info_strings.WORKING_HOURS_ANSWER_EN, message
+        )
+    return op, MESSAGES
+
+
+@benchmark("get_localized_answer[detect]")
+def bench_localized_detect():
+    from telegram_agent.application.conversation_service.handlers.language_handler import current_language
+    from telegram_agent.application.conversation_service.workflow.info_tools import get_localized_answer
+    from telegram_agent.config.strings import info_strings
+
+    current_language.set(None)
+
+    def op(message):
+        return get_localized_answer(
+            info_strings.WORKING_HOURS_ANSWER_HE, info_strings.WORKING_HOURS_ANSWER_EN, message
+        )
+    return op, MESSAGES
+
+
+# ====== Measurement ======
+def measure(fn: Callable[[Any], Any], items: Sequence[Any], rounds: int = 7,
+            min_time: float = 0.5) -> dict:
+    """ns/op (best round) and mean/max allocated bytes per call"""
+
+    def run_corpus():
+        for item in items:
+            fn(item)
+
+    run_corpus()  # warm caches and lazy imports
+    timer = timeit.Timer(run_corpus)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time / rounds or number >= 1_000_000:
+            break
+        number *= 2
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        best = min(timer.repeat(repeat=rounds, number=number))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    ops = number * len(items)
+
+    tracemalloc.start()
+    try:
+        allocated = []
+        for item in items:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn(item)
+            _, peak = tracemalloc.get_traced_memory()
+            allocated.append(max(0, peak - before))
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ns_per_op": round(best / ops * 1e9, 1),
+        "alloc_bytes_per_op": round(sum(allocated) / len(allocated), 1),
+        "alloc_bytes_max": max(allocated),
+        "ops": ops,
+        "rounds": rounds,
+    }
+
+
+def run_benchmarks(pattern: str = None, rounds: int = 7, min_time: float = 0.5) -> Dict[str, dict]:
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        fn, items = setup()
+        results[name] = measure(fn, items, rounds=rounds, min_time=min_time)
+    return results
+
+
+# ====== Baselines ======
+def baseline_path(name: str, directory: Path = None) -> Path:
+    return (directory or BASELINE_DIR) / f"{name}.json"
+
+
+def save_baseline(name: str, results: Dict[str, dict], directory: Path = None) -> Path:
+    path = baseline_path(name, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "benchmarks": results,
+    }, indent=2), encoding="utf-8")
+    return path
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict]) -> Dict[str, dict]:
+    """Per benchmark: relative change in ns/op and allocations (positive is worse)"""
+    changes = {}
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        changes[name] = {
+            "time_pct": _pct(current["ns_per_op"], previous["ns_per_op"]),
+            "alloc_pct": _pct(current["alloc_bytes_per_op"], previous["alloc_bytes_per_op"]),
+        }
+    return changes
+
+
+def _pct(current: float, previous: float) -> float:
+    if not previous:
+        return 0.0
+    return round((current - previous) / previous * 100, 1)
+
+
+def format_results(results: Dict[str, dict], changes: Dict[str, dict] = None) -> str:
+    lines = [f"{'benchmark':<36} {'ns/op':>10} {'alloc B/op':>11}" + ("   vs baseline" if changes else "")]
+    for name, result in results.items():
+        line = f"{name:<36} {result['ns_per_op']:>10,.0f} {result['alloc_bytes_per_op']:>11,.0f}"
+        if changes and name in changes:
+            change = changes[name]
+            line += f"   {change['time_pct']:+6.1f}% time {change['alloc_pct']:+6.1f}% alloc"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the per-message hot paths")
+    parser.add_argument("--filter", help="regex; only run matching benchmarks")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per benchmark, roughly")
+    parser.add_argument("--save", metavar="NAME", help="save results as baseline NAME")
+    parser.add_argument("--compare", metavar="NAME", help="compare against baseline NAME")
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="with --compare, fail when ns/op grew by more than this percent")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    if "LOG_LEVEL" not in os.environ:
+        from telegram_agent.infrastructure.utils.logger import logger
+
+        logger.logger.setLevel(logging.WARNING)
+    results = run_benchmarks(args.filter, rounds=args.rounds, min_time=args.min_time)
+    changes = None
+    if args.compare:
+        baseline = json.loads(baseline_path(args.compare).read_text(encoding="utf-8"))
+        changes = compare(results, baseline["benchmarks"])
+    print(format_results(results, changes))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.save:
+        print(f"Saved baseline to {save_baseline(args.save, results)}")
+    if changes:
+        slower = [name for name, change in changes.items() if change["time_pct"] > args.max_regression]
+        if slower:
+            print(f"FAIL: slower than baseline by more than {args.max_regression}%: {', '.join(slower)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Keep test runs (and the subprocesses they start) out of the real ./logs
+os.environ.setdefault("LOG_FILE_PATH", tempfile.mkdtemp(prefix="bot-logs-"))
@@ -0,0 +1,366 @@
+"""
+Local stand-ins for the OpenAI and Telegram APIs, used by the load test.
+
+Both are plain aiohttp apps that listen on 127.0.0.1 (on a free port by
+default); point LLM_BASE_URL (with LLM_BACKEND=openai_compatible) and
+TELEGRAM_API_BASE_URL at them before importing telegram_agent.
+
+FakeOpenAIServer speaks the subset of the OpenAI HTTP API the bot uses:
+- POST /v1/chat/completions, streamed or not. The reply is paced by
+  `latency` (time to first token) and `tokens_per_second`. ReAct agent
+  prompts get a "Final Answer:" so the agent finishes in one step.
+- POST /v1/embeddings: deterministic bag-of-words vectors, so texts that
+  share words are close. Honours the SDK's default base64 encoding.
+- GET /v1/models and /v1/models/{model}: what the health probes call.
+
+FakeTelegramServer answers Bot API calls (getMe, sendMessage,
+editMessageText, sendChatAction, ...) after `latency` and records when
+each chat received a message. `flood_rate` answers that fraction of
+sends with a 429 to exercise RetryAfter handling.
+
+ServiceThread runs the servers on their own loop in a daemon thread.
+The bot calls the APIs synchronously in places (the knowledge base is
+embedded while the RAG engine is built), which would deadlock against a
+server on the caller's loop, and the servers' own work shouldn't show up
+in the bot's event-loop lag.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+ANSWER_TEXT = (
+    "This is a simulated answer from the local load-test model. It is long enough "
+    "to be streamed in several chunks and to exercise message edits on the way."
+)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+async def _start_site(app: web.Application, host: str, port: int):
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    # Port 0 picks a free port; read back the one we got
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, port
+
+
+def _resolve(future: asyncio.Future, value):
+    if not future.done():
+        future.set_result(value)
+
+
+class ServiceThread:
+    """Runs fake servers on a private event loop in a daemon thread"""
+
+    def __init__(self, *servers):
+        self.servers = servers
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="fake-services", daemon=True)
+
+    def _call(self, coroutine, timeout: float = 10.0):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def start(self):
+        self._thread.start()
+        for server in self.servers:
+            self._call(server.start())
+
+    def stop(self):
+        for server in self.servers:
+            self._call(server.stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class FakeOpenAIServer:
+    """OpenAI-compatible chat and embedding endpoints with configurable speed"""
+
+    def __init__(self, latency: float = 0.5, tokens_per_second: float = 50.0,
+                 embedding_latency: float = 0.05, dimensions: int = 256,
+                 rate_limited: bool = False):
+        self.latency = latency
+        # Answer every chat and embedding request with 429 Too Many Requests
+        self.rate_limited = rate_limited
+        self.tokens_per_second = tokens_per_second
+        self.embedding_latency = embedding_latency
+        self.dimensions = dimensions
+        self.port: Optional[int] = None
+        self._runner: Optional[web.AppRunner] = None
+
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.handle_chat)
+        app.router.add_post("/v1/embeddings", self.handle_embeddings)
+        app.router.add_get("/v1/models", self.handle_models)
+        app.router.add_get("/v1/models/{model}", self.handle_model)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._runner, self.port = await _start_site(self.build_app(), host, port)
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def get_stats(self) -> dict:
+        return {"requests": dict(self.requests), "peak_in_flight": self.peak_in_flight}
+
+    def _enter(self, kind: str):
+        self.requests[kind] += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    @staticmethod
+    def _headers() -> dict:
+        # Plenty of headroom, but enough for the client limiter to follow
+        return {
+            "x-ratelimit-limit-requests": "100000",
+            "x-ratelimit-remaining-requests": "99999",
+            "x-ratelimit-reset-requests": "1ms",
+            "x-ratelimit-limit-tokens": "100000000",
+            "x-ratelimit-remaining-tokens": "99999999",
+            "x-ratelimit-reset-tokens": "1ms",
+        }
+
+    def _too_many_requests(self) -> web.Response:
+        self.requests["rate_limited"] += 1
+        return web.json_response({
+            "error": {
+                "message": "Rate limit reached for requests",
+                "type": "requests",
+                "param": None,
+                "code": "rate_limit_exceeded",
+            }
+        }, status=429, headers={
+            **self._headers(),
+            "x-ratelimit-remaining-requests": "0",
+            "retry-after-ms": "10",
+        })
+
+    # ====== Chat ======
+    @staticmethod
+    def _answer_for(messages: List[dict]) -> str:
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        if "Final Answer:" in prompt:
+            return f"Thought: I now know the final answer\nFinal Answer: {ANSWER_TEXT}"
+        return ANSWER_TEXT
+
+    async def handle_chat(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        if self.rate_limited:
+            return self._too_many_requests()
+        self._enter("chat")
+        try:
+            tokens = re.findall(r"\S+\s*", self._answer_for(body.get("messages", [])))
+            model = body.get("model", "fake")
+            await asyncio.sleep(self.latency)
+            if body.get("stream"):
+                return await self._stream_chat(request, model, tokens)
+            await asyncio.sleep(len(tokens) / self.tokens_per_second)
+            return web.json_response({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens),
+                          "total_tokens": len(tokens)},
+            }, headers=self._headers())
+        finally:
+            self.in_flight -= 1
+
+    async def _stream_chat(self, request: web.Request, model: str, tokens: List[str]):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", **self._headers()})
+        await response.prepare(request)
+
+        def chunk(delta: dict, finish_reason: Optional[str] = None) -> bytes:
+            data = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data)}\n\n".encode("utf-8")
+
+        await response.write(chunk({"role": "assistant", "content": ""}))
+        for token in tokens:
+            await response.write(chunk({"content": token}))
+            await asyncio.sleep(1 / self.tokens_per_second)
+        await response.write(chunk({}, "stop"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    # ====== Embeddings ======
+    def embed(self, text) -> List[float]:
+        """Hashed bag of words (or token ids), L2-normalised"""
+        words = _WORD_RE.findall(text.lower()) if isinstance(text, str) else [str(t) for t in text]
+        vector = [0.0] * self.dimensions
+        for word in words or [""]:
+            digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    async def handle_embeddings(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if self.rate_limited:
+            return self._too_many_requests()
+        self._enter("embeddings")
+        try:
+            inputs = body["input"]
+            # A single string, a list of strings, or (pre-tokenized) lists of ints
+            if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+                inputs = [inputs]
+            await asyncio.sleep(self.embedding_latency)
+            as_base64 = body.get("encoding_format") == "base64"
+            data = []
+            for index, text in enumerate(inputs):
+                vector = self.embed(text)
+                if as_base64:
+                    vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+                data.append({"object": "embedding", "index": index, "embedding": vector})
+            return web.json_response({
+                "object": "list",
+                "data": data,
+                "model": body.get("model", "fake"),
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            }, headers=self._headers())
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    def _model(model_id: str) -> dict:
+        return {"id": model_id, "object": "model", "created": 0, "owned_by": "fake"}
+
+    async def handle_models(self, request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": [self._model("fake")]})
+
+    async def handle_model(self, request: web.Request) -> web.Response:
+        return web.json_response(self._model(request.match_info["model"]))
+
+
+class FakeTelegramServer:
+    """Bot API stand-in that records what each chat was sent"""
+
+    def __init__(self, latency: float = 0.02, flood_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.flood_rate = flood_rate
+        self.port: Optional[int] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._random = random.Random(seed)
+        self._message_ids = 0
+
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.flooded = 0
+        # chat_id -> monotonic times of sendMessage calls
+        self.sent_at: Dict[int, List[float]] = defaultdict(list)
+        self._waiters: Dict[int, List[asyncio.Future]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """Value for TELEGRAM_API_BASE_URL (PTB appends the token)"""
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle_method)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._runner, self.port = await _start_site(self.build_app(), host, port)
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def get_stats(self) -> dict:
+        return {"calls": dict(self.calls), "flooded": self.flooded}
+
+    def next_message(self, chat_id: int) -> asyncio.Future:
+        """Resolves with the time of the next sendMessage to `chat_id`.
+
+        Safe to call from a loop other than the server's; the future
+        belongs to the caller's loop.
+        """
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._waiters[chat_id].append(future)
+        return future
+
+    async def handle_method(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+        self.calls[method] += 1
+        await asyncio.sleep(self.latency)
+
+        if method == "getMe":
+            return self._ok({"id": 1, "is_bot": True, "first_name": "Load", "username": "load_test_bot"})
+        if method in ("sendMessage", "editMessageText"):
+            if self.flood_rate and self._random.random() < self.flood_rate:
+                self.flooded += 1
+                return web.json_response({
+                    "ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1},
+                })
+            chat_id = int(params["chat_id"])
+            if method == "sendMessage":
+                self._message_ids += 1
+                message_id = self._message_ids
+                self._record_send(chat_id)
+            else:
+                message_id = int(params["message_id"])
+            return self._ok({
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params.get("text", ""),
+            })
+        return self._ok(True)
+
+    def _record_send(self, chat_id: int):
+        now = time.monotonic()
+        self.sent_at[chat_id].append(now)
+        with self._lock:
+            waiters = self._waiters.pop(chat_id, [])
+        for future in waiters:
+            future.get_loop().call_soon_threadsafe(_resolve, future, now)
+
+    @staticmethod
+    def _ok(result) -> web.Response:
+        return web.json_response({"ok": True, "result": result})
@@ -0,0 +1,189 @@
+"""
+Import-time report for the bot's entry points (cold start).
+
+Each target module is imported in a fresh interpreter under
+`python -X importtime`, --runs times; the best run is reported:
+- total: cumulative import time of the target module
+- by package: self time summed per top-level package, largest first
+- heavy: which of HEAVY_PACKAGES the import pulled in
+
+Baselines work like tests/benchmarks.py:
+    python -m tests.import_time --save before
+    # ... change the code ...
+    python -m tests.import_time --compare before
+
+Baselines are JSON files in .benchmarks/ (import-NAME.json). --compare
+exits 1 when a target got slower than --max-regression percent, and
+--forbid-heavy exits 1 when a target imports one of HEAVY_PACKAGES.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from tests.benchmarks import BASELINE_DIR, REPO_ROOT, _pct
+
+TARGETS = {
+    "telegram_bot": "telegram_agent.infrastructure.telegram.telegram_bot",
+    "support_agent": "telegram_agent.application.conversation_service.support_agent",
+    "workflow.agent": "telegram_agent.application.conversation_service.workflow.agent",
+    "health": "telegram_agent.infrastructure.telegram.health",
+}
+
+# Needed to answer RAG or agent queries, not to start the bot
+HEAVY_PACKAGES = (
+    "langchain", "langchain_core", "langchain_openai", "langchain_community",
+    "openai", "tiktoken", "chromadb", "langdetect", "numpy",
+)
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output: str) -> List[dict]:
+    """Rows of `-X importtime` output: module, self_us, cumulative_us, depth"""
+    rows = []
+    for line in output.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": len(indent) // 2,
+            })
+    return rows
+
+
+def summarize(rows: List[dict], target: str) -> dict:
+    by_package: Dict[str, int] = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        by_package[package] = by_package.get(package, 0) + row["self_us"]
+    total = next((row["cumulative_us"] for row in reversed(rows) if row["module"] == target), 0)
+    return {
+        "module": target,
+        "total_ms": round(total / 1000, 1),
+        "by_package_ms": {
+            package: round(us / 1000, 1)
+            for package, us in sorted(by_package.items(), key=lambda item: -item[1])
+        },
+        "heavy": sorted(package for package in HEAVY_PACKAGES if package in by_package),
+    }
+
+
+def measure_import(module: str, runs: int = 5) -> dict:
+    """Best of `runs` imports of `module`, each in a new interpreter"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT / "src"), env.get("PYTHONPATH")]))
+    env.setdefault("TELEGRAM_BOT_TOKEN", "import-time-token")
+    env.setdefault("OPENAI_API_KEY", "import-time-key")
+    env.setdefault("LOG_LEVEL", "WARNING")
+
+    best = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"importing {module} failed:\n{completed.stderr[-2000:]}")
+        summary = summarize(parse_importtime(completed.stderr), module)
+        if best is None or summary["total_ms"] < best["total_ms"]:
+            best = summary
+    return best
+
+
+def run_report(targets: Dict[str, str] = None, runs: int = 5) -> Dict[str, dict]:
+    return {name: measure_import(module, runs) for name, module in (targets or TARGETS).items()}
+
+
+def baseline_path(name: str, directory: Path = None) -> Path:
+    return (directory or BASELINE_DIR) / f"import-{name}.json"
+
+
+def save_baseline(name: str, results: Dict[str, dict], directory: Path = None) -> Path:
+    path = baseline_path(name, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "imports": results,
+    }, indent=2), encoding="utf-8")
+    return path
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict]) -> Dict[str, float]:
+    """Per target: relative change in total import time (positive is worse)"""
+    return {
+        name: _pct(result["total_ms"], baseline[name]["total_ms"])
+        for name, result in results.items() if name in baseline
+    }
+
+
+def format_results(results: Dict[str, dict], changes: Dict[str, float] = None,
+                   baseline: Dict[str, dict] = None, top: int = 8) -> str:
+    lines = []
+    for name, result in results.items():
+        line = f"{name:<16} {result['total_ms']:>8,.1f} ms"
+        if changes and name in changes:
+            line += f"   was {baseline[name]['total_ms']:,.1f} ms ({changes[name]:+.1f}%)"
+        lines.append(line)
+        packages = list(result["by_package_ms"].items())[:top]
+        lines.append("    " + ", ".join(f"{package} {ms:,.1f}" for package, ms in packages))
+        lines.append(f"    heavy: {', '.join(result['heavy']) or 'none'}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time report for the bot's entry points")
+    parser.add_argument("--module", action="append", metavar="MODULE",
+                        help="import this module instead of the default targets (repeatable)")
+    parser.add_argument("--runs", type=int, default=5, help="imports per target; the fastest is kept")
+    parser.add_argument("--top", type=int, default=8, help="packages listed per target")
+    parser.add_argument("--save", metavar="NAME", help="save results as baseline NAME")
+    parser.add_argument("--compare", metavar="NAME", help="compare against baseline NAME")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="with --compare, fail when an import got slower by more than this percent")
+    parser.add_argument("--forbid-heavy", action="store_true",
+                        help="fail when a target imports one of the heavy packages")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    targets = {module: module for module in args.module} if args.module else TARGETS
+    results = run_report(targets, runs=args.runs)
+    changes = baseline = None
+    if args.compare:
+        baseline = json.loads(baseline_path(args.compare).read_text(encoding="utf-8"))["imports"]
+        changes = compare(results, baseline)
+    print(format_results(results, changes, baseline, top=args.top))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.save:
+        print(f"Saved baseline to {save_baseline(args.save, results)}")
+
+    failed = False
+    if changes:
+        slower = [name for name, change in changes.items() if change > args.max_regression]
+        if slower:
+            print(f"FAIL: slower than baseline by more than {args.max_regression}%: {', '.join(slower)}")
+            failed = True
+    if args.forbid_heavy:
+        heavy = [name for name, result in results.items() if result["heavy"]]
+        if heavy:
+            print(f"FAIL: heavy packages imported by: {', '.join(heavy)}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
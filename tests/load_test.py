@@ -0,0 +1,401 @@
+"""
+Concurrent-user load test.
+
+Drives SupportAgent.process_message (--mode agent) or the full Telegram
+path (--mode telegram: fake Updates through the per-chat update
+processor, TelegramBot.handle_message and the send queue) against the
+local stand-ins in tests/fake_services.py, so no API keys or network
+are needed. The bot talks to the fake OpenAI server through the
+openai_compatible backend; --in-process uses the fake backend instead,
+which takes HTTP out of the picture entirely.
+
+Virtual users arrive at --arrival-rate per second (evenly spaced, or
+exponentially with --poisson) and each sends --messages-per-user
+messages one after the other, waiting for the answer and --think-time
+in between. --concurrency caps the messages in flight (0: no cap).
+
+Reported:
+- throughput (messages answered per second over the run)
+- p50/p95/p99/max latency, overall and per route (the result status);
+  in telegram mode, until the chat received its first message (streamed
+  or not), which is what the user waits for
+- event-loop lag: how late a 50 ms ticker woke up
+
+Run from the repository root:
+    python -m tests.load_test --users 200 --arrival-rate 50
+    python -m tests.load_test --mode telegram --users 1000 --json report.json
+
+With --max-p95 / --max-error-rate the exit code is 1 when a threshold
+is exceeded, so the run can gate CI.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from tests.fake_services import FakeOpenAIServer, FakeTelegramServer, ServiceThread
+
+REPO_ROOT = Path(__file__).parent.parent
+src_path = REPO_ROOT / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+# Hebrew and English: order lookups and FAQ tools, questions that need
+# the agent (several intents) and open questions answered by RAG
+QUERIES = [
+    "מה שעות הפעילות שלכם?",
+    "איך אפשר ליצור איתכם קשר?",
+    "מה הסטטוס של הזמנה 12345?",
+    "בדוק בבקשה את ההזמנה שלי",
+    "מה שעות הפעילות ואיך יוצרים קשר?",
+    "האם יש אחריות על המוצרים?",
+    "אפשר לשלם בתשלומים?",
+    "What are your opening hours?",
+    "Where is my order 54321?",
+    "What are your hours and how can I contact support?",
+    "Can I pay with PayPal?",
+    "Do the products come with a warranty?",
+]
+
+# Statuses that mean the user got an error or fallback instead of an answer
+ERROR_ROUTES = {
+    "error", "agent_error", "agent_timeout", "agent_exception", "rate_limited", "exception", "timeout",
+}
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """Nearest-rank percentile of `samples` (0 for none)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples: List[float]) -> dict:
+    return {
+        "count": len(samples),
+        "p50": round(percentile(samples, 50), 4),
+        "p95": round(percentile(samples, 95), 4),
+        "p99": round(percentile(samples, 99), 4),
+        "max": round(max(samples), 4) if samples else 0.0,
+    }
+
+
+class LoopLagMonitor:
+    """Samples how late a periodic timer fires on the running loop"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        expected = loop.time() + self.interval
+        while True:
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self.samples.append(max(0.0, now - expected))
+            expected = now + self.interval
+
+    def summary_ms(self) -> dict:
+        ms = [lag * 1000 for lag in self.samples]
+        return {
+            "p50": round(percentile(ms, 50), 2),
+            "p99": round(percentile(ms, 99), 2),
+            "max": round(max(ms), 2) if ms else 0.0,
+        }
+
+
+def configure_environment(args, openai_server: FakeOpenAIServer,
+                          telegram_server: FakeTelegramServer, workdir: str):
+    """Point settings at the fakes; must run before telegram_agent is imported"""
+    os.environ.update({
+        "OPENAI_API_KEY": "load-test",
+        "LLM_BACKEND": "fake" if args.in_process else "openai_compatible",
+        "LLM_BASE_URL": openai_server.base_url,
+        "FAKE_LLM_LATENCY_SECONDS": str(args.llm_latency),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.llm_tokens_per_second),
+        "TELEGRAM_BOT_TOKEN": "123456:load-test",
+        "TELEGRAM_API_BASE_URL": telegram_server.base_url,
+        "KNOWLEDGE_BASE_PATH": str(REPO_ROOT / "data" / "knowledge_base.json"),
+        "VECTOR_DB_PATH": os.path.join(workdir, "vector_db"),
+        "EMBEDDING_STORE_PATH": "",
+        "SESSION_BACKEND": "memory",
+        "LOG_FILE_PATH": os.path.join(workdir, "logs"),
+        "LOG_LEVEL": "WARNING",
+        "METRICS_ENABLED": "false",
+        "HEALTH_LLM_PROBE_SECONDS": "0",
+    })
+    for assignment in args.set:
+        name, _, value = assignment.partition("=")
+        os.environ[name] = value
+
+
+class LoadTest:
+    """One run: virtual users against a SupportAgent or TelegramBot"""
+
+    def __init__(self, args, telegram_server: FakeTelegramServer):
+        self.args = args
+        self.telegram_server = telegram_server
+        self.random = random.Random(args.seed)
+        self.limit = asyncio.Semaphore(args.concurrency) if args.concurrency > 0 else None
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.exceptions: Dict[str, int] = defaultdict(int)
+        self._query_count = 0
+
+        self.agent = None
+        self.bot = None
+        self._routes: Dict[str, str] = {}
+        self._update_id = 0
+
+    async def setup(self):
+        if self.args.mode == "telegram":
+            from telegram_agent.infrastructure.telegram.telegram_bot import TelegramBot
+
+            self.bot = TelegramBot()
+            self.agent = self.bot.agent
+            self._track_routes()
+            await self.bot.app.initialize()
+        else:
+            from telegram_agent.application.conversation_service.support_agent import SupportAgent
+
+            self.agent = SupportAgent()
+        # Measure steady state: the RAG engine and agent are built before users arrive
+        await self.agent.warm_up()
+
+    async def teardown(self):
+        if self.bot:
+            await self.bot.sender.shutdown(timeout=self.args.timeout)
+            await self.bot.app.shutdown()
+
+    def _track_routes(self):
+        # handle_message doesn't return the status; note it per user
+        process_message = self.agent.process_message
+
+        async def tracked(*args, **kwargs):
+            result = await process_message(*args, **kwargs)
+            self._routes[kwargs["user_id"]] = result["status"]
+            return result
+
+        self.agent.process_message = tracked
+
+    def next_query(self) -> str:
+        self._query_count += 1
+        query = self.random.choice(QUERIES)
+        if self.random.random() < self.args.unique_fraction:
+            query = f"{query} ({self._query_count})"  # defeats the answer caches
+        return query
+
+    # ====== Users ======
+    async def run(self) -> float:
+        """Run every user to completion; returns the wall time"""
+        started = time.monotonic()
+        users = []
+        for index in range(self.args.users):
+            users.append(asyncio.create_task(self.user(100000 + index)))
+            if self.args.arrival_rate > 0:
+                gap = 1 / self.args.arrival_rate
+                await asyncio.sleep(self.random.expovariate(self.args.arrival_rate) if self.args.poisson else gap)
+        await asyncio.gather(*users)
+        return time.monotonic() - started
+
+    async def user(self, user_id: int):
+        for number in range(self.args.messages_per_user):
+            if number and self.args.think_time:
+                await asyncio.sleep(self.args.think_time)
+            query = self.next_query()
+            if self.limit:
+                async with self.limit:
+                    await self.send(user_id, query)
+            else:
+                await self.send(user_id, query)
+
+    async def send(self, user_id: int, query: str):
+        started = time.monotonic()
+        try:
+            if self.bot:
+                route = await asyncio.wait_for(self.send_update(user_id, query), self.args.timeout)
+            else:
+                result = await asyncio.wait_for(
+                    self.agent.process_message(query=query, user_id=str(user_id), platform="load_test"),
+                    self.args.timeout
+                )
+                route = result["status"]
+        except asyncio.TimeoutError:
+            route = "timeout"
+        except Exception as e:
+            route = "exception"
+            self.exceptions[type(e).__name__] += 1
+        self.latencies[route].append(time.monotonic() - started)
+
+    async def send_update(self, chat_id: int, query: str) -> str:
+        from telegram import Update
+
+        self._update_id += 1
+        update = Update.de_json({
+            "update_id": self._update_id,
+            "message": {
+                "message_id": self._update_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+                "text": query,
+            },
+        }, self.bot.app.bot)
+
+        first_message = self.telegram_server.next_message(chat_id)
+        processor = self.bot.update_processor
+        await processor.process_update(update, self.bot.app.process_update(update))
+        # The reply may still be queued when the handler returns
+        await first_message
+        return self._routes.pop(str(chat_id), "exception")
+
+    # ====== Report ======
+    def report(self, elapsed: float) -> dict:
+        all_samples = [sample for samples in self.latencies.values() for sample in samples]
+        errors = sum(len(samples) for route, samples in self.latencies.items() if route in ERROR_ROUTES)
+        report = {
+            "mode": self.args.mode,
+            "users": self.args.users,
+            "messages": len(all_samples),
+            "errors": errors,
+            "error_rate": round(errors / len(all_samples), 4) if all_samples else 0.0,
+            "duration_seconds": round(elapsed, 3),
+            "throughput_per_second": round(len(all_samples) / elapsed, 2) if elapsed else 0.0,
+            "latency_seconds": summarize(all_samples),
+            "routes": {route: summarize(samples) for route, samples in sorted(self.latencies.items())},
+            "exceptions": dict(self.exceptions),
+        }
+        if self.bot:
+            report["send_queue"] = self.bot.sender.get_stats()
+        return report
+
+
+async def run_load_test(args) -> dict:
+    openai_server = FakeOpenAIServer(
+        latency=args.llm_latency, tokens_per_second=args.llm_tokens_per_second,
+        embedding_latency=args.embedding_latency
+    )
+    telegram_server = FakeTelegramServer(
+        latency=args.telegram_latency, flood_rate=args.telegram_flood_rate, seed=args.seed
+    )
+    services = ServiceThread(openai_server, telegram_server)
+    services.start()
+    monitor = LoopLagMonitor()
+
+    with tempfile.TemporaryDirectory(prefix="load_test_") as workdir:
+        configure_environment(args, openai_server, telegram_server, workdir)
+        test = LoadTest(args, telegram_server)
+        try:
+            await test.setup()
+            monitor.start()
+            elapsed = await test.run()
+            await monitor.stop()
+            report = test.report(elapsed)
+        finally:
+            await monitor.stop()
+            await test.teardown()
+            services.stop()
+
+    report["loop_lag_ms"] = monitor.summary_ms()
+    report["fake_openai"] = openai_server.get_stats()
+    report["fake_telegram"] = telegram_server.get_stats()
+    return report
+
+
+def format_report(report: dict) -> str:
+    def row(name: str, stats: dict) -> str:
+        return (f"  {name:<18} {stats['count']:>6}  {stats['p50']:>7.3f}  {stats['p95']:>7.3f}"
+                f"  {stats['p99']:>7.3f}  {stats['max']:>7.3f}")
+
+    lines = [
+        f"Mode: {report['mode']} | Users: {report['users']} | Messages: {report['messages']}"
+        f" | Errors: {report['errors']} ({report['error_rate']:.1%})",
+        f"Duration: {report['duration_seconds']:.2f}s | Throughput: {report['throughput_per_second']:.2f} msg/s",
+        "",
+        f"  {'route':<18} {'count':>6}  {'p50':>7}  {'p95':>7}  {'p99':>7}  {'max':>7}   (seconds)",
+        row("all", report["latency_seconds"]),
+    ]
+    lines += [row(route, stats) for route, stats in report["routes"].items()]
+    lag = report["loop_lag_ms"]
+    lines += [
+        "",
+        f"Event-loop lag: p50 {lag['p50']:.1f}ms | p99 {lag['p99']:.1f}ms | max {lag['max']:.1f}ms",
+        f"Fake OpenAI: {report['fake_openai']}",
+        f"Fake Telegram: {report['fake_telegram']}",
+    ]
+    if report["exceptions"]:
+        lines.append(f"Exceptions: {report['exceptions']}")
+    return "\n".join(lines)
+
+
+def parse_args(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Concurrent-user load test against local fakes")
+    parser.add_argument("--mode", choices=("agent", "telegram"), default="agent")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--messages-per-user", type=int, default=1)
+    parser.add_argument("--arrival-rate", type=float, default=50.0, help="new users per second (0: all at once)")
+    parser.add_argument("--poisson", action="store_true", help="exponential gaps between arrivals")
+    parser.add_argument("--concurrency", type=int, default=0, help="max messages in flight (0: no cap)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds between a user's messages")
+    parser.add_argument("--unique-fraction", type=float, default=0.5,
+                        help="share of queries made unique so they miss the caches")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-message timeout in seconds")
+    parser.add_argument("--in-process", action="store_true",
+                        help="use the in-process fake LLM backend instead of the fake HTTP server")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="fake LLM time to first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--telegram-latency", type=float, default=0.02)
+    parser.add_argument("--telegram-flood-rate", type=float, default=0.0,
+                        help="share of sends answered with 429 retry_after")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="extra setting for the bot (repeatable)")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--max-p95", type=float, help="fail when overall p95 latency exceeds this")
+    parser.add_argument("--max-error-rate", type=float, help="fail when the error rate exceeds this")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_load_test(args))
+    print(format_report(report))
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    failed = False
+    if args.max_p95 is not None and report["latency_seconds"]["p95"] > args.max_p95:
+        print(f"FAIL: p95 {report['latency_seconds']['p95']:.3f}s > {args.max_p95}s")
+        failed = True
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        print(f"FAIL: error rate {report['error_rate']:.1%} > {args.max_error_rate:.1%}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
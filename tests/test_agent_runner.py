@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.application.conversation_service.workflow.agent import AsyncAgentRunner
+
+
+class SlowAgent:
+    """Stand-in for AgentExecutor that records peak concurrency"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+
+    async def arun(self, query: str) -> str:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if query == "boom":
+                raise RuntimeError("agent failure")
+            return f"answer: {query}"
+        finally:
+            self.running -= 1
+
+
+def test_concurrency_is_bounded():
+    slow_agent = SlowAgent(delay=0.05)
+    runner = AsyncAgentRunner(slow_agent, max_concurrency=2, timeout=5)
+
+    async def scenario():
+        return await asyncio.gather(*(runner.run(f"q{i}") for i in range(6)))
+
+    results = asyncio.run(scenario())
+    assert results == [f"answer: q{i}" for i in range(6)]
+    assert slow_agent.peak == 2
+    stats = runner.get_stats()
+    assert stats["completed"] == 6
+    assert stats["queue_depth"] == 0
+    assert stats["max_wait_ms"] > 0
+
+
+def test_timeout_and_errors():
+    runner = AsyncAgentRunner(SlowAgent(delay=0.2), max_concurrency=1, timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(runner.run("slow"))
+    assert runner.get_stats()["timeouts"] == 1
+
+    runner = AsyncAgentRunner(SlowAgent(delay=0), max_concurrency=1, timeout=1)
+    assert asyncio.run(runner.run("boom")) is None
+    assert runner.get_stats()["errors"] == 1
+
+
+def test_executor_is_built_on_first_run_only():
+    builds = []
+
+    def factory():
+        builds.append(1)
+        return SlowAgent(delay=0)
+
+    runner = AsyncAgentRunner(None, max_concurrency=2, timeout=5, factory=factory)
+    assert not builds
+
+    async def scenario():
+        return await asyncio.gather(*(runner.run(f"q{i}") for i in range(3)))
+
+    assert asyncio.run(scenario()) == ["answer: q0", "answer: q1", "answer: q2"]
+    assert len(builds) == 1
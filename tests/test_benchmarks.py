@@ -0,0 +1,25 @@
+"""Keeps tests/benchmarks.py runnable; timings themselves aren't asserted"""
+
+from tests import benchmarks
+
+
+def test_every_benchmark_runs():
+    results = benchmarks.run_benchmarks(rounds=1, min_time=0.001)
+    assert set(results) == set(benchmarks.BENCHMARKS)
+    for result in results.values():
+        assert result["ns_per_op"] > 0
+        assert result["alloc_bytes_per_op"] >= 0
+
+
+def test_baseline_round_trip_flags_regressions(tmp_path):
+    baseline = {"fast": {"ns_per_op": 100.0, "alloc_bytes_per_op": 50.0}}
+    path = benchmarks.save_baseline("before", baseline, directory=tmp_path)
+    assert path == tmp_path / "before.json"
+
+    current = {
+        "fast": {"ns_per_op": 150.0, "alloc_bytes_per_op": 25.0},
+        "new": {"ns_per_op": 10.0, "alloc_bytes_per_op": 0.0},
+    }
+    changes = benchmarks.compare(current, baseline)
+    assert changes == {"fast": {"time_pct": 50.0, "alloc_pct": -50.0}}
+    assert "+50.0% time" in benchmarks.format_results(current, changes)
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.application.rag_indexing_service.embeddings import EmbeddingCache
+from telegram_agent.config.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def memory_only_cache(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_STORE_PATH", None)
+
+
+class RecordingEmbeddings:
+    """Records every batch sent to the embeddings API"""
+
+    def __init__(self):
+        self.batches = []
+
+    def _vector(self, text):
+        return [float(len(text)), float(ord(text[0]))]
+
+    def embed_query(self, text):
+        self.batches.append([text])
+        return self._vector(text)
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(0)
+        return self.embed_documents(texts)
+
+
+class FakeLLMManager:
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def get_embeddings(self):
+        return self.embeddings
+
+
+def _cache():
+    embeddings = RecordingEmbeddings()
+    return EmbeddingCache(FakeLLMManager(embeddings)), embeddings
+
+
+def test_misses_are_batched_and_results_keep_order(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_SIZE", 10)
+    cache, embeddings = _cache()
+    texts = [f"document {i}" for i in range(25)]
+
+    vectors = cache.embed_documents(texts)
+
+    assert vectors == [embeddings._vector(text) for text in texts]
+    assert sorted(len(batch) for batch in embeddings.batches) == [5, 10, 10]
+
+
+def test_only_misses_and_unique_texts_are_sent():
+    cache, embeddings = _cache()
+    cache.embed_query("cached")
+    embeddings.batches.clear()
+
+    vectors = asyncio.run(cache.aembed_documents(["cached", "new", "new", "other"]))
+
+    assert vectors[1] == vectors[2]
+    assert embeddings.batches == [["new", "other"]]
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_token_limit_splits_batches(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_TOKENS", 50)
+    cache, embeddings = _cache()
+    cache.embed_documents(["x" * 90, "y" * 90, "z" * 90])
+    assert len(embeddings.batches) == 3
@@ -0,0 +1,137 @@
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.application.rag_indexing_service.embedding_store import PersistentEmbeddingStore
+from telegram_agent.application.rag_indexing_service.embeddings import EmbeddingCache
+from telegram_agent.config.settings import settings
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return [0.5, float(len(text))]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+class FakeLLMManager:
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def get_embeddings(self):
+        return self.embeddings
+
+
+def test_vectors_round_trip_as_float32(tmp_path):
+    store = PersistentEmbeddingStore(str(tmp_path / "emb.sqlite3"), "model-a", max_bytes=1 << 20)
+    key = store.key("hello")
+    store.put_many({key: [0.1, 0.25, -3.0]})
+
+    reopened = PersistentEmbeddingStore(str(tmp_path / "emb.sqlite3"), "model-a", max_bytes=1 << 20)
+    vector = reopened.get_many([key])[key]
+    assert vector[1:] == [0.25, -3.0]
+    assert abs(vector[0] - 0.1) < 1e-6
+    assert len(reopened.pack(vector)) == 12
+
+    other_model = PersistentEmbeddingStore(str(tmp_path / "emb.sqlite3"), "model-b", max_bytes=1 << 20)
+    assert other_model.get_many([key]) == {}
+
+
+def test_key_uses_normalized_text():
+    assert PersistentEmbeddingStore.key("  hello   world ") == PersistentEmbeddingStore.key("hello world")
+
+
+def test_size_based_eviction_drops_oldest(tmp_path):
+    store = PersistentEmbeddingStore(str(tmp_path / "emb.sqlite3"), "m", max_bytes=40 * 16)
+    store.EVICTION_CHECK_INTERVAL = 1
+    for i in range(60):
+        store.put_many({f"h{i}": [float(i)] * 4})
+
+    stats = store.get_stats()
+    assert stats["bytes"] <= 40 * 16
+    assert stats["evicted"] > 0
+    assert store.get_many(["h59"])
+    assert not store.get_many(["h0"])
+
+
+def test_cache_is_warm_after_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_STORE_PATH", str(tmp_path / "emb.sqlite3"))
+    embeddings = CountingEmbeddings()
+
+    EmbeddingCache(FakeLLMManager(embeddings)).embed_documents(["a", "bb", "ccc"])
+    assert embeddings.calls == 3
+
+    restarted = EmbeddingCache(FakeLLMManager(embeddings))
+    assert restarted.embed_query("bb") == [0.5, 2.0]
+    assert restarted.embed_documents(["a", "ccc"]) == [[0.5, 1.0], [0.5, 3.0]]
+    assert embeddings.calls == 3
+    assert restarted.get_stats()["disk_hits"] == 3
+
+
+def test_reads_defer_access_time_writes(tmp_path):
+    store = PersistentEmbeddingStore(str(tmp_path / "emb.sqlite3"), "m", max_bytes=1 << 20)
+    store.put_many({"old": [1.0], "new": [2.0]})
+
+    def last_access(text_hash):
+        return store._conn().execute(
+            "SELECT last_access FROM embeddings WHERE text_hash = ?", (text_hash,)
+        ).fetchone()[0]
+
+    before = last_access("old")
+    assert store.get_many(["old"])
+    assert last_access("old") == before  # the read didn't write
+
+    store.put_many({"other": [3.0]})  # collected access times ride along
+    assert last_access("old") > before
+
+    store.get_many(["new"])
+    touched = last_access("new")
+    store.flush_access_times()
+    assert last_access("new") > touched
+
+
+def test_async_lookups_and_writes_run_off_the_event_loop(tmp_path, monkeypatch):
+    import asyncio
+    import threading
+
+    monkeypatch.setattr(settings, "EMBEDDING_STORE_PATH", str(tmp_path / "emb.sqlite3"))
+
+    class AsyncEmbeddings(CountingEmbeddings):
+        async def aembed_query(self, text):
+            return self.embed_query(text)
+
+        async def aembed_documents(self, texts):
+            return self.embed_documents(texts)
+
+    cache = EmbeddingCache(FakeLLMManager(AsyncEmbeddings()))
+    store_threads = []
+    for name in ("get_many", "put_many"):
+        original = getattr(cache.store, name)
+
+        def recorded(*args, _original=original, **kwargs):
+            store_threads.append(threading.current_thread())
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(cache.store, name, recorded)
+
+    async def scenario():
+        await cache.aembed_query("hello")
+        await cache.aembed_documents(["a", "bb"])
+        cache._cache.clear()
+        return await cache.aembed_query("hello")
+
+    assert asyncio.run(scenario()) == [0.5, 5.0]
+    assert store_threads and threading.main_thread() not in store_threads
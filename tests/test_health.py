@@ -0,0 +1,169 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from telegram_agent.application.conversation_service import support_agent as support_agent_module
+from telegram_agent.application.conversation_service.support_agent import SupportAgent
+from telegram_agent.infrastructure.telegram import health as health_module
+from telegram_agent.infrastructure.telegram.health import BotHealth
+from telegram_agent.infrastructure.telegram.send_scheduler import TelegramSendScheduler
+from telegram_agent.infrastructure.telegram.update_scheduler import KeyedScheduler
+from telegram_agent.infrastructure.utils.metrics import RequestTimer
+from telegram_agent.infrastructure.utils.monitoring import MonitoringServer
+
+
+class StatsStub:
+    def __init__(self, stats=None):
+        self.stats = stats or {}
+
+    def get_stats(self):
+        return self.stats
+
+    def get_cache_stats(self):
+        return self.stats
+
+
+def make_bot(retriever=object(), max_pending=10):
+    agent = SimpleNamespace(
+        rag=SimpleNamespace(
+            retriever=retriever,
+            embedding_cache=StatsStub({"hits": 3}),
+            llm_manager=StatsStub({"exact_size": 1})
+        ),
+        session_store=StatsStub({"resident": 2}),
+        agent_runner=StatsStub({"queue_depth": 0})
+    )
+    bot = SimpleNamespace(
+        agent=agent,
+        update_processor=SimpleNamespace(
+            scheduler=KeyedScheduler(2), max_concurrent_updates=max_pending
+        ),
+        sender=TelegramSendScheduler(max_pending=100),
+        webhook=None
+    )
+    return bot
+
+
+def test_live_and_ready_endpoints():
+    async def scenario():
+        bot = make_bot()
+        health = BotHealth(bot, probe_interval=0)
+        async with TestClient(TestServer(MonitoringServer(health=health).build_app())) as client:
+            live = await client.get("/health/live")
+            ready = await client.get("/health/ready")
+            bot.agent.rag.retriever = None
+            not_ready = await client.get("/health/ready")
+            return live.status, ready.status, not_ready.status, await not_ready.json()
+
+    live, ready, not_ready, body = asyncio.run(scenario())
+    assert (live, ready, not_ready) == (200, 200, 503)
+    assert body["checks"]["vector_store"] is False
+    assert body["checks"]["llm"] is True
+
+
+def test_not_ready_until_rag_engine_is_built():
+    bot = make_bot()
+    bot.agent.rag = None  # warm-up still running
+    health = BotHealth(bot, probe_interval=0)
+    ready, checks = health.readiness()
+    assert not ready
+    assert checks["vector_store"] is False
+    assert health._collect_cache_stats()["embeddings"] is None
+
+
+def test_lazy_warm_up_does_not_gate_readiness(monkeypatch):
+    monkeypatch.setattr(health_module.settings, "WARM_UP_ON_START", False)
+    bot = make_bot()
+    bot.agent.rag = None  # built by the first message
+    ready, checks = BotHealth(bot, probe_interval=0).readiness()
+    assert ready
+    assert checks["vector_store"] is False
+
+
+def test_warm_up_retries_until_it_succeeds(monkeypatch):
+    agent = SupportAgent()
+    attempts = []
+
+    async def flaky_get_rag():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise ConnectionError("vector store unavailable")
+        agent.rag = SimpleNamespace(kb_version="v1", retriever=object())
+        return agent.rag
+
+    monkeypatch.setattr(agent, "get_rag", flaky_get_rag)
+    monkeypatch.setattr(support_agent_module, "get_agent", lambda: None)
+    asyncio.run(agent.warm_up(retry_delay=0.02, max_retry_delay=0.03))
+
+    assert len(attempts) == 3
+    assert agent.rag.kb_version == "v1"
+    # Backoff doubles, capped at max_retry_delay
+    assert attempts[2] - attempts[1] >= 0.03
+
+
+def test_saturated_update_queue_is_not_ready():
+    async def scenario():
+        bot = make_bot(max_pending=2)
+        gate = asyncio.Event()
+        for chat in range(5):  # two run, three wait
+            bot.update_processor.scheduler.submit(chat, gate.wait())
+        await asyncio.sleep(0)
+        ready, checks = BotHealth(bot, probe_interval=0).readiness()
+        gate.set()
+        await bot.update_processor.scheduler.join()
+        return ready, checks
+
+    ready, checks = asyncio.run(scenario())
+    assert not ready
+    assert checks["update_queue"] is False
+
+
+def test_failed_llm_probe_marks_not_ready(monkeypatch):
+    async def unreachable(model, timeout=5.0):
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(health_module, "probe_model", unreachable)
+
+    async def scenario():
+        health = BotHealth(make_bot(), probe_interval=60)
+        assert health.readiness()[0] is False  # not probed yet
+        await health.probe_llm()
+        return health.readiness(), health.llm_error
+
+    (ready, checks), error = asyncio.run(scenario())
+    assert not ready
+    assert checks["llm"] is False
+    assert "refused" in error
+
+
+def test_health_reports_counters_and_cached_stats():
+    async def scenario():
+        health = BotHealth(make_bot(), probe_interval=0, stats_ttl=60)
+        timer = RequestTimer()
+        timer.finish("health_test_route")
+        async with TestClient(TestServer(MonitoringServer(health=health).build_app())) as client:
+            first = await (await client.get("/health")).json()
+            await asyncio.sleep(0.05)  # stats are collected off the loop
+            second = await (await client.get("/health")).json()
+        await health.stop()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first["status"] == "healthy"
+    assert first["messages"]["by_status"]["health_test_route"] >= 1
+    assert first["messages"]["in_flight"] == 0
+    assert second["caches"]["embeddings"] == {"hits": 3}
+    assert second["caches"]["sessions"] == {"resident": 2}
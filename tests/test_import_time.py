@@ -0,0 +1,46 @@
+"""Cold-start guards: the bot's entry points import without langchain and friends"""
+
+import subprocess
+import sys
+
+from tests import import_time
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     json.decoder
+import time:       200 |        300 |   json
+import time:        50 |         50 |     telegram_agent.config
+import time:       400 |        750 | telegram_agent.config.settings
+"""
+
+
+def test_parse_and_summarize_importtime_output():
+    rows = import_time.parse_importtime(SAMPLE)
+    assert [row["depth"] for row in rows] == [2, 1, 2, 0]
+
+    summary = import_time.summarize(rows, "telegram_agent.config.settings")
+    assert summary["total_ms"] == 0.8
+    assert summary["by_package_ms"] == {"telegram_agent": 0.5, "json": 0.3}
+    assert summary["heavy"] == []
+
+
+def test_bot_imports_without_heavy_packages():
+    result = import_time.measure_import(import_time.TARGETS["telegram_bot"], runs=1)
+    assert result["heavy"] == []
+
+
+def test_support_agent_builds_rag_and_agent_on_first_use():
+    script = (
+        "import sys\n"
+        "from telegram_agent.application.conversation_service.support_agent import SupportAgent\n"
+        "agent = SupportAgent()\n"
+        "assert agent.rag is None\n"
+        f"print(sorted(p for p in {import_time.HEAVY_PACKAGES!r} if p in sys.modules))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script], cwd=import_time.REPO_ROOT, capture_output=True, text=True,
+        env={**import_time.os.environ, "PYTHONPATH": str(import_time.REPO_ROOT / "src"),
+             "TELEGRAM_BOT_TOKEN": "test-token", "OPENAI_API_KEY": "test-key"}
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,79 @@
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from langchain.schema import Document
+from langchain.vectorstores import Chroma
+from langchain_core.embeddings import Embeddings
+
+from telegram_agent.application.rag_indexing_service.incremental_index import IncrementalIndexer
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that count how many texts were embedded"""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+
+def _indexer(tmp_path, embeddings):
+    store = Chroma(
+        collection_name="test_kb",
+        embedding_function=embeddings,
+        persist_directory=str(tmp_path)
+    )
+    return IncrementalIndexer(store, str(tmp_path), "test_kb", "test-model")
+
+
+def test_restart_costs_no_embeddings(tmp_path):
+    chunks = [Document(page_content=f"chunk {i}", metadata={"i": i}) for i in range(5)]
+
+    embeddings = CountingEmbeddings()
+    first = _indexer(tmp_path, embeddings).sync(chunks)
+    assert first.added == 5
+    assert embeddings.embedded == 5
+
+    # Simulate a restart: new store object over the same persisted directory
+    second = _indexer(tmp_path, embeddings).sync(chunks)
+    assert second.added == 0 and second.removed == 0
+    assert second.version == first.version
+    assert embeddings.embedded == 5
+
+
+def test_only_changed_chunks_are_embedded_and_stale_removed(tmp_path):
+    embeddings = CountingEmbeddings()
+    indexer = _indexer(tmp_path, embeddings)
+    indexer.sync([Document(page_content=f"chunk {i}") for i in range(3)])
+
+    updated = [
+        Document(page_content="chunk 0"),
+        Document(page_content="chunk 1 (edited)"),
+    ]
+    result = indexer.sync(updated)
+
+    assert result.added == 1
+    assert result.removed == 2
+    assert embeddings.embedded == 4
+    assert indexer.vector_store._collection.count() == 2
+
+
+def test_duplicate_chunks_are_stored_once(tmp_path):
+    indexer = _indexer(tmp_path, CountingEmbeddings())
+    result = indexer.sync([Document(page_content="same")] * 3)
+    assert result.total == 1
+    assert indexer.vector_store._collection.count() == 1
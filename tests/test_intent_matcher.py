@@ -0,0 +1,131 @@
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.application.conversation_service.handlers.order_handler import OrderHandler
+from telegram_agent.application.conversation_service.intent_matcher import AhoCorasick, intent_matcher
+
+
+def test_automaton_finds_overlapping_keywords():
+    automaton = AhoCorasick({"he": ["a"], "she": ["b"], "hers": ["c"], "his": ["d"]})
+    found = sorted((start, keyword) for start, _, keyword, _ in automaton.iter_matches("ushers"))
+    assert found == [(1, "she"), (2, "he"), (2, "hers")]
+
+
+def test_all_intents_positions_and_order_numbers_in_one_pass():
+    text = "איפה ההזמנה שלי #54321? ומה שעות הפעילות"
+    match = intent_matcher.match(text)
+
+    assert match.intents == {"order", "hours"}
+    assert match.info_intents == {"hours"}
+    hours_hit = next(hit for hit in match.keyword_hits if hit.intent == "hours")
+    assert text[hours_hit.start:hours_hit.end] == "שעות"
+    assert [hit.value for hit in match.order_numbers] == ["#54321"]
+
+
+def test_order_number_priority_matches_previous_behaviour():
+    assert intent_matcher.match("12345 and ORD-67890").first_order_number == "ORD-67890"
+    assert intent_matcher.match("order #12345").first_order_number == "#12345"
+    assert intent_matcher.match("1234").first_order_number is None
+
+
+def test_order_handler_detection():
+    handler = OrderHandler()
+    cases = [
+        ("אפשר לבדוק סטטוס הזמנה?", True),
+        ("13354", True),
+        ("מה שעות הפעילות?", False),
+        ("ORD-12345", True),
+        ("#54321", True),
+        ("What is your REFUND policy", False),
+    ]
+    for query, expected in cases:
+        assert handler.is_order_query(query, "test_user") == expected, query
+
+
+def test_keywords_are_case_insensitive():
+    assert intent_matcher.match("Opening HOURS please").info_intents == {"hours"}
+    assert intent_matcher.match("Track my Order").has_order_keyword
+
+
+def test_direct_dispatch_only_for_unambiguous_intents():
+    from telegram_agent.application.conversation_service.workflow.tools import select_direct_tool
+
+    assert select_direct_tool(intent_matcher.match("What are your opening hours?")) == "hours"
+    assert select_direct_tool(intent_matcher.match("ORD-13354")) == "order"
+    # 'משלוח' is nested inside the order keyword 'משלוח שלי'
+    assert select_direct_tool(intent_matcher.match("איפה המשלוח שלי 13354")) == "order"
+    # Two info intents, or order keyword without a number -> agent / order flow
+    assert select_direct_tool(intent_matcher.match("shipping and refund policy")) is None
+    assert select_direct_tool(intent_matcher.match("refund for order 13354")) is None
+    assert select_direct_tool(intent_matcher.match("where is my order")) is None
+    assert select_direct_tool(intent_matcher.match("tell me about the product")) is None
+
+
+def test_direct_dispatch_needs_whole_words_and_a_strong_match():
+    from telegram_agent.application.conversation_service.workflow.tools import select_direct_tool
+
+    # Keyword inside another word, or mentioned in passing -> agent decides
+    for query in [
+        "I opened the box and the lamp is broken",
+        "The closet door arrived scratched",
+        "Is this product open source?",
+        "This was really helpful, thanks",
+        "Is support for PayPal available?",
+    ]:
+        assert select_direct_tool(intent_matcher.match(query)) is None, query
+
+    assert select_direct_tool(intent_matcher.match("מה שעות הפעילות שלכם?")) == "hours"
+    assert select_direct_tool(intent_matcher.match("מה מדיניות ההחזרות?")) == "refund"
+    assert select_direct_tool(intent_matcher.match("How do I contact support?")) == "contact"
+
+
+def test_whole_word_hits_allow_hebrew_prefixes():
+    assert {hit.keyword for hit in intent_matcher.match("ובשעות הפעילות").word_hits} == {"שעות", "פעילות"}
+    assert not intent_matcher.match("closet").word_hits
+    assert intent_matcher.match("closet").info_intents == {"hours"}  # routing itself is unchanged
+
+
+def test_whole_words_survive_lowercasing_that_changes_length():
+    from telegram_agent.application.conversation_service.workflow.tools import select_direct_tool
+
+    # 'İ'.lower() is two code points, shifting every later offset by one
+    match = intent_matcher.match("İstanbul shipping")
+    assert len(match.lowered) == len(match.text) + 1
+    assert {hit.keyword for hit in match.word_hits} == {"shipping"}
+    assert select_direct_tool(intent_matcher.match("İ shipping")) == "shipping"
+
+
+def test_direct_dispatch_looks_up_every_order_number(tmp_path, monkeypatch):
+    import json
+
+    from telegram_agent.application.conversation_service.workflow import order_tools
+    from telegram_agent.application.conversation_service.workflow.order_repository import OrderRepository
+    from telegram_agent.application.conversation_service.workflow.tools import dispatch_direct
+
+    kb = tmp_path / "kb.json"
+    kb.write_text(json.dumps([
+        {"order_id": "13354", "content": "Order 13354 shipped"},
+        {"order_id": "24680", "content": "Order 24680 delivered"},
+    ]), encoding="utf-8")
+    repo = OrderRepository(str(kb))
+    bulk_calls = []
+    get_many = repo.get_many
+    monkeypatch.setattr(repo, "get_many", lambda ids: bulk_calls.append(list(ids)) or get_many(ids))
+    monkeypatch.setattr(order_tools, "order_repository", repo)
+
+    query = "ORD-13354 #24680 55555"
+    intent, answer = dispatch_direct(intent_matcher.match(query), query, "u-bulk")
+    assert intent == "order"
+    assert bulk_calls == [["ORD-13354", "#24680", "55555"]]
+    assert "Order 13354 shipped" in answer
+    assert "Order 24680 delivered" in answer
+    assert "55555" in answer
@@ -0,0 +1,64 @@
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.application.conversation_service.handlers.language_handler import (
+    LanguageHandler, current_language
+)
+from telegram_agent.application.conversation_service.workflow.info_tools import get_localized_answer
+
+
+def test_script_classification():
+    assert LanguageHandler.classify_script("מה שעות הפעילות?") == "he"
+    assert LanguageHandler.classify_script("What are your hours?") == "en"
+    # Brand names inside Hebrew text don't flip the language
+    assert LanguageHandler.classify_script("האם יש משלוח עם DHL לחיפה?") == "he"
+    assert LanguageHandler.classify_script("13354") is None
+    assert LanguageHandler.classify_script("ok שלום") is None
+
+
+def test_resolve_skips_statistical_detection_for_clear_scripts():
+    handler = LanguageHandler()
+    assert handler.resolve("שלום", "u1") == "he"
+    assert handler.resolve("hello there", "u2") == "en"
+    assert handler.statistical_resolved == 0
+    assert handler.script_resolved == 2
+
+
+def test_ambiguous_text_reuses_user_language():
+    handler = LanguageHandler()
+    handler.resolve("Where is my order?", "u1")
+    assert handler.resolve("13354", "u1") == "en"
+    assert handler.cache_resolved == 1
+    assert handler.statistical_resolved == 0
+    # Unknown user with no letters falls back to Hebrew
+    assert handler.resolve("13354", "u2") == "he"
+
+
+def test_user_cache_is_bounded():
+    handler = LanguageHandler()
+    handler.max_users = 2
+    for user_id in ("a", "b", "c"):
+        handler.resolve("hello", user_id)
+    assert handler.get("a") is None
+    assert handler.get("c") == "en"
+
+
+def test_localized_answer_uses_message_language():
+    token = current_language.set("en")
+    try:
+        # Tool input may be paraphrased by the agent; the message language wins
+        assert get_localized_answer("עברית", "English", "שעות") == "English"
+    finally:
+        current_language.reset(token)
+    assert get_localized_answer("עברית", "English", "שעות") == "עברית"
+    assert get_localized_answer("עברית", "English", "hours please") == "English"
+    assert get_localized_answer("עברית", "English", None) == "English"
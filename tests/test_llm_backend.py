@@ -0,0 +1,108 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.infrastructure.clients import llm_backend
+from telegram_agent.infrastructure.clients.fake import FAKE_ANSWER, FakeBackend, FakeChatModel
+from telegram_agent.infrastructure.clients.llm_backend import build_backend
+from telegram_agent.infrastructure.clients.openai import (
+    OpenAIBackend, OpenAICompatibleBackend, RateLimitCallback, RawTextEmbeddings
+)
+from telegram_agent.config.settings import settings
+from tests.fake_services import FakeOpenAIServer
+
+
+def cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_fake_backend_chats_streams_and_embeds():
+    backend = FakeBackend()
+    chat = backend.chat_model("any", 0)
+
+    async def scenario():
+        answer = (await chat.ainvoke("שלום")).content
+        chunks = [chunk.content async for chunk in chat.astream("שלום")]
+        react = (await chat.ainvoke("... Final Answer: the final answer ...")).content
+        return answer, chunks, react
+
+    answer, chunks, react = asyncio.run(scenario())
+    assert answer == FAKE_ANSWER
+    assert len(chunks) > 1 and "".join(chunks) == FAKE_ANSWER
+    assert "Final Answer:" in react
+
+    embeddings = backend.embeddings("any")
+    hours, hours_again, refund = embeddings.embed_documents(
+        ["מה שעות הפעילות", "שעות הפעילות בשישי", "how do refunds work"]
+    )
+    assert embeddings.embed_query("מה שעות הפעילות") == hours
+    assert cosine(hours, hours_again) > cosine(hours, refund)
+
+
+def test_openai_backend_shares_a_pool_per_model_and_rate_limits():
+    backend = OpenAIBackend(max_connections=7, timeout=12.0)
+    first = backend.chat_model("gpt-test", 0)
+    second = backend.chat_model("gpt-test", 0.5)
+    assert first.async_client is second.async_client
+    assert any(isinstance(callback, RateLimitCallback) for callback in first.callbacks)
+    assert backend.get_stats()["max_connections"] == 7
+    assert backend.get_stats()["timeout_seconds"] == 12.0
+
+
+def test_compatible_backend_needs_a_url_and_never_gets_the_openai_key():
+    with pytest.raises(ValueError):
+        build_backend("openai_compatible", None)
+    with pytest.raises(ValueError):
+        build_backend("ollama")
+
+    backend = build_backend("openai_compatible", "http://localhost:8000/v1")
+    sync_client, _ = backend._sdk_clients("local-model")
+    assert sync_client.api_key != settings.OPENAI_API_KEY
+    assert backend.rate_limiter("local-model") is None
+    assert isinstance(backend.embeddings("local-embed"), RawTextEmbeddings)
+    assert not backend.chat_model("local-model", 0).callbacks
+
+
+def test_compatible_backend_against_a_local_server():
+    async def scenario():
+        server = FakeOpenAIServer(latency=0, tokens_per_second=1000, embedding_latency=0)
+        await server.start()
+        try:
+            backend = OpenAICompatibleBackend(base_url=server.base_url)
+            await backend.probe("local-model")
+            chat = backend.chat_model("local-model", 0)
+            answer = (await chat.ainvoke("hello")).content
+            streamed = "".join([chunk.content async for chunk in chat.astream("hello")])
+            vectors = await backend.embeddings("local-embed").aembed_documents(["a b", "c"])
+            return answer, streamed, vectors
+        finally:
+            await server.stop()
+
+    answer, streamed, vectors = asyncio.run(scenario())
+    assert answer == streamed != ""
+    assert len(vectors) == 2 and len(vectors[0]) == 256
+
+
+def test_backends_come_from_settings(monkeypatch):
+    monkeypatch.setattr(llm_backend, "_backends", {})
+    monkeypatch.setattr(settings, "LLM_BACKEND", "fake")
+    monkeypatch.setattr(settings, "LLM_BASE_URL", "http://localhost:8000/v1")
+    monkeypatch.setattr(settings, "EMBEDDING_BACKEND", "openai")
+
+    assert isinstance(llm_backend.create_chat_model(), FakeChatModel)
+    embedding_backend = llm_backend.get_embedding_backend()
+    # The chat server's URL isn't reused for a different kind of backend
+    assert isinstance(embedding_backend, OpenAIBackend)
+    assert embedding_backend.base_url != "http://localhost:8000/v1"
+    assert set(llm_backend.get_backend_stats()) == {"chat", "embeddings"}
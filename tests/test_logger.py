@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import queue
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.infrastructure.utils.logger import JsonFormatter, _DroppingQueueHandler, logger
+
+
+class CountingArg:
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "arg"
+
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def capture():
+    handler = Capture()
+    logger.logger.addHandler(handler)
+    return handler
+
+
+def test_disabled_levels_are_never_formatted():
+    arg = CountingArg()
+    previous = logger.logger.level
+    logger.logger.setLevel(logging.INFO)
+    try:
+        logger.debug("value: %s", arg)
+    finally:
+        logger.logger.setLevel(previous)
+    assert arg.formatted == 0
+
+
+def test_fields_reach_records_and_json_lines():
+    handler = capture()
+    try:
+        logger.log_response("u1", 0.91, "high_confidence", 840, 3)
+    finally:
+        logger.logger.removeHandler(handler)
+
+    line = json.loads(JsonFormatter().format(handler.records[-1]))
+    assert line["user_id"] == "u1"
+    assert line["route"] == "high_confidence"
+    assert line["latency_ms"] == 840
+    assert line["confidence"] == 0.91
+    assert line["sources"] == 3
+    assert "Latency: 840ms" in line["message"]
+
+
+def test_json_lines_have_fixed_fields_and_keep_hebrew():
+    record = logging.LogRecord("SupportBot", logging.INFO, __file__, 1, "שלום %s", ("עולם",), None)
+    line = json.loads(JsonFormatter().format(record))
+    assert line["message"] == "שלום עולם"
+    assert {"ts", "level", "user_id", "route", "latency_ms", "confidence"} <= set(line)
+    assert line["route"] is None
+
+
+def test_categories_are_sampled():
+    handler = capture()
+    previous_level = logger.logger.level
+    previous_rates = logger.sample_rates
+    logger.logger.setLevel(logging.DEBUG)
+    logger.sample_rates = {"noisy": 0.0, "kept": 1.0}
+    try:
+        for _ in range(5):
+            logger.debug("noisy line", category="noisy")
+            logger.debug("kept line", category="kept")
+    finally:
+        logger.logger.setLevel(previous_level)
+        logger.sample_rates = previous_rates
+        logger.logger.removeHandler(handler)
+
+    messages = [record.getMessage() for record in handler.records]
+    assert messages.count("kept line") == 5
+    assert "noisy line" not in messages
+    assert logger.get_stats()["sampled_out"]["noisy"] >= 5
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = _DroppingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("SupportBot", logging.INFO, __file__, 1, "line", None, None)
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_queued_records_keep_the_exception_for_json():
+    log_queue = queue.Queue()
+    handler = _DroppingQueueHandler(log_queue)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "SupportBot", logging.ERROR, __file__, 1, "failed for %s", ("u1",), sys.exc_info()
+        )
+    handler.handle(record)
+
+    line = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+    assert line["message"] == "failed for u1"
+    assert "ValueError: boom" in line["exc"]
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from telegram_agent.infrastructure.utils import metrics
+from telegram_agent.infrastructure.utils.metrics import MetricsRegistry, RequestTimer, stage
+from telegram_agent.infrastructure.utils.monitoring import MonitoringServer
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, route='say "hi"')
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="say \\"hi\\"",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="say \\"hi\\"",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{route="say \\"hi\\"",le="+Inf"} 4' in text
+    assert 'latency_seconds_sum{route="say \\"hi\\""} 4.05' in text
+    assert 'latency_seconds_count{route="say \\"hi\\""} 4' in text
+
+
+def test_labels_are_checked_and_metrics_are_shared_by_name():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events", ["kind"])
+    assert registry.counter("events_total", "Events", ["kind"]) is counter
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+    with pytest.raises(ValueError):
+        registry.gauge("events_total", "Events", ["kind"])
+
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+    depth = {"value": 3}
+    registry.gauge("queue_depth", "Depth", fn=lambda: depth["value"])
+    text = registry.render()
+    assert 'events_total{kind="a"} 3' in text
+    assert "queue_depth 3" in text
+
+
+def test_stages_are_recorded_under_the_request_route():
+    before = metrics.STAGE_SECONDS.count(stage="generation", route="test_route")
+
+    async def handle():
+        timer = RequestTimer()
+        with stage("routing"):
+            pass
+        for _ in range(2):
+            with stage("generation"):
+                await asyncio.sleep(0.01)
+        assert timer.stages["generation"] >= 0.02
+        timer.finish("test_route")
+
+    asyncio.run(handle())
+    assert metrics.STAGE_SECONDS.count(stage="generation", route="test_route") == before + 1
+    assert metrics.REQUEST_SECONDS.count(route="test_route") >= 1
+
+    # Outside a request (e.g. indexing) stage() records nothing
+    with stage("embedding"):
+        pass
+    assert metrics.STAGE_SECONDS.count(stage="embedding", route="test_route") == 0
+
+
+def test_concurrent_requests_keep_their_own_stages():
+    async def handle(delay, route):
+        timer = RequestTimer()
+        with stage("agent"):
+            await asyncio.sleep(delay)
+        stages = dict(timer.stages)
+        timer.finish(route)
+        return stages
+
+    async def scenario():
+        return await asyncio.gather(handle(0.05, "slow_route"), handle(0.0, "fast_route"))
+
+    slow, fast = asyncio.run(scenario())
+    assert slow["agent"] >= 0.05
+    assert fast["agent"] < 0.05
+
+
+def test_metrics_endpoint_serves_text_format():
+    registry = MetricsRegistry()
+    registry.counter("served_total", "Served").inc()
+
+    async def scenario():
+        server = MonitoringServer(registry)
+        async with TestClient(TestServer(server.build_app())) as client:
+            response = await client.get("/metrics")
+            return response.status, response.headers["Content-Type"], await response.text()
+
+    status, content_type, body = asyncio.run(scenario())
+    assert status == 200
+    assert content_type.startswith("text/plain")
+    assert "served_total 1" in body
@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.application.conversation_service.workflow.order_repository import OrderRepository
+
+
+def _write(path, orders):
+    data = [{"content": "general info"}] + [
+        {"order_id": order_id, "content": f"Order {order_id} shipped"} for order_id in orders
+    ]
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_lookup_normalizes_prefixes_and_parses_once(tmp_path):
+    kb = tmp_path / "kb.json"
+    _write(kb, ["13354", "24680"])
+    repo = OrderRepository(str(kb))
+
+    assert repo.get("ORD-13354")["content"] == "Order 13354 shipped"
+    assert repo.get("#24680")["content"] == "Order 24680 shipped"
+    assert repo.get("99999") is None
+    assert repo.reloads == 1
+
+
+def test_reloads_when_file_changes(tmp_path):
+    kb = tmp_path / "kb.json"
+    _write(kb, ["13354"])
+    repo = OrderRepository(str(kb))
+    assert repo.get("11111") is None
+
+    _write(kb, ["13354", "11111", "22222"])
+    os.utime(kb, ns=(kb.stat().st_atime_ns, kb.stat().st_mtime_ns + 1_000_000))
+    assert repo.get("11111") is not None
+    assert repo.reloads == 2
+
+
+def test_bulk_lookup(tmp_path):
+    kb = tmp_path / "kb.json"
+    _write(kb, ["13354", "24680"])
+    repo = OrderRepository(str(kb))
+
+    result = repo.get_many(["13354", "ORD-24680", "55555"])
+    assert list(result) == ["13354", "24680", "55555"]
+    assert result["55555"] is None
+    assert result["24680"]["content"] == "Order 24680 shipped"
+
+
+def test_broken_file_keeps_previous_index(tmp_path):
+    kb = tmp_path / "kb.json"
+    _write(kb, ["13354"])
+    repo = OrderRepository(str(kb))
+    assert repo.get("13354")
+
+    kb.write_text("[{ not json", encoding="utf-8")
+    assert repo.get("13354")
@@ -0,0 +1,58 @@
+"""
+The performance tests listed in spec.yml, run through tests/load_test.py.
+
+Each run is a subprocess: the load test points settings at its own fake
+servers before telegram_agent is imported, which can't be undone inside
+a pytest process that already imported it.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from tests.load_test import percentile
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def run_load_test(tmp_path, *args) -> dict:
+    report_path = tmp_path / "report.json"
+    completed = subprocess.run(
+        [sys.executable, "-m", "tests.load_test", "--json", str(report_path), *args],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=600
+    )
+    assert completed.returncode == 0, completed.stdout[-2000:] + completed.stderr[-2000:]
+    return json.loads(report_path.read_text(encoding="utf-8"))
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([], 95) == 0.0
+    assert percentile(list(range(1, 11)), 50) == 5
+    assert percentile(list(range(1, 21)), 95) == 19
+    assert percentile(list(range(1, 101)), 99) == 99
+    assert percentile(list(range(1, 101)), 100) == 100
+    assert percentile([7.0], 1) == 7.0
+
+
+def test_latency_under_3_seconds(tmp_path):
+    """Steady traffic through the full Telegram path answers within 3s at p95"""
+    report = run_load_test(
+        tmp_path, "--mode", "telegram", "--users", "60", "--arrival-rate", "10",
+        "--llm-latency", "0.3", "--llm-tokens-per-second", "100", "--max-p95", "3.0",
+        "--max-error-rate", "0"
+    )
+    assert report["messages"] == 60
+    assert report["latency_seconds"]["p95"] < 3.0
+
+
+def test_stress_1000_users(tmp_path):
+    """A burst of 1000 users gets an answer or a fallback each, without crashing"""
+    report = run_load_test(
+        tmp_path, "--users", "1000", "--arrival-rate", "200",
+        "--llm-latency", "0.2", "--llm-tokens-per-second", "200", "--timeout", "60"
+    )
+    assert report["messages"] == 1000
+    assert not report["exceptions"]
+    assert "timeout" not in report["routes"]
+    assert report["loop_lag_ms"]["p99"] < 250
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from langchain_core.messages import HumanMessage
+
+from telegram_agent.application.conversation_service.support_agent import SupportAgent
+from telegram_agent.application.conversation_service.workflow.agent import AsyncAgentRunner
+from telegram_agent.application.rag_indexing_service.llm import LLMManager
+from telegram_agent.application.rag_indexing_service.rag import RAGEngine
+from telegram_agent.infrastructure.clients.openai import OpenAIBackend, RateLimitCallback
+from telegram_agent.infrastructure.utils.rate_limiter import (
+    NO_DEADLINE, RateLimiter, RateLimitExceeded, get_rate_limiter, parse_reset
+)
+from tests.fake_services import FakeOpenAIServer
+
+
+def test_admits_within_budget_without_waiting():
+    limiter = RateLimiter("test", requests_per_minute=60, tokens_per_minute=6000, max_wait=1.0)
+    for _ in range(5):
+        assert limiter.reserve(100) == 0.0
+    stats = limiter.get_stats()
+    assert stats["admitted"] == 5
+    assert stats["throttled"] == 0
+
+
+def test_waits_for_capacity_then_rejects_past_deadline():
+    # One request per second once the burst is spent
+    limiter = RateLimiter("test", requests_per_minute=60, tokens_per_minute=100000, max_wait=1.5)
+    for _ in range(60):
+        limiter.reserve(1)
+
+    assert limiter.reserve(1) == pytest.approx(1.0, abs=0.05)
+    with pytest.raises(RateLimitExceeded) as exc:
+        limiter.reserve(1)
+    assert exc.value.wait == pytest.approx(2.0, abs=0.05)
+
+    stats = limiter.get_stats()
+    assert stats["throttled"] == 1
+    assert stats["rejected"] == 1
+    assert stats["throttled_seconds"] > 0
+
+
+def test_batch_callers_may_wait_indefinitely():
+    limiter = RateLimiter("test", requests_per_minute=60, tokens_per_minute=600, max_wait=0.1)
+    limiter.reserve(600)
+    assert limiter.reserve(300, max_wait=NO_DEADLINE) == pytest.approx(30.0, abs=0.1)
+
+
+def test_async_acquire_sleeps_for_reserved_wait():
+    limiter = RateLimiter("test", requests_per_minute=600, tokens_per_minute=100000, max_wait=1.0)
+    for _ in range(600):
+        limiter.reserve(1)
+
+    started = time.monotonic()
+    asyncio.run(limiter.acquire(1))
+    assert time.monotonic() - started >= 0.08
+
+
+def test_headers_shrink_the_local_budget():
+    limiter = RateLimiter("test", requests_per_minute=500, tokens_per_minute=200000, max_wait=2.0)
+    limiter.update_from_headers(200, {
+        "x-ratelimit-limit-requests": "60",
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-limit-tokens": "150000",
+        "x-ratelimit-remaining-tokens": "149000",
+    })
+    stats = limiter.get_stats()
+    assert stats["rpm"] == 60
+    assert stats["tpm"] == 150000
+    assert stats["requests_available"] == 0
+    assert limiter.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_429_blocks_until_retry_after():
+    limiter = RateLimiter("test", requests_per_minute=500, tokens_per_minute=200000, max_wait=5.0)
+    limiter.update_from_headers(429, {"retry-after-ms": "2500"})
+    assert limiter.reserve(1) == pytest.approx(2.5, abs=0.05)
+    assert limiter.get_stats()["server_429s"] == 1
+
+    limiter.update_from_headers(429, {"x-ratelimit-reset-tokens": "6m0s"})
+    with pytest.raises(RateLimitExceeded):
+        limiter.reserve(1)
+
+
+def test_parse_reset():
+    assert parse_reset("1s") == 1.0
+    assert parse_reset("120ms") == pytest.approx(0.12)
+    assert parse_reset("6m0s") == 360.0
+    assert parse_reset("") is None
+
+
+def test_callback_aborts_chat_call_when_rejected():
+    limiter = RateLimiter("test", requests_per_minute=1, tokens_per_minute=100000, max_wait=0.1)
+    limiter.reserve(1)
+    callback = RateLimitCallback(limiter)
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(callback.on_chat_model_start({}, [[HumanMessage(content="שלום")]]))
+
+
+def test_agent_runner_reraises_rate_limit():
+    class LimitedAgent:
+        async def arun(self, query):
+            raise RateLimitExceeded("test", 3.0)
+
+    runner = AsyncAgentRunner(LimitedAgent(), max_concurrency=1, timeout=5)
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(runner.run("hello"))
+    assert runner.get_stats()["rate_limited"] == 1
+
+
+def test_server_429_is_shed_like_a_local_rate_limit():
+    class ChatAgent:
+        def __init__(self, chat):
+            self.chat = chat
+
+        async def arun(self, query):
+            return (await self.chat.ainvoke(query)).content
+
+    class StubRetriever:
+        async def search_with_embedding(self, query, k, timeout):
+            return [1.0, 0.0], [(SimpleNamespace(page_content="We ship worldwide.", metadata={}), 0.4)]
+
+    async def scenario():
+        server = FakeOpenAIServer(latency=0, embedding_latency=0, rate_limited=True)
+        await server.start()
+        try:
+            # No SDK retries, so the 429 surfaces as openai.RateLimitError
+            chat = OpenAIBackend(base_url=server.base_url, max_retries=0).chat_model("gpt-429-test", 0)
+
+            runner = AsyncAgentRunner(ChatAgent(chat), max_concurrency=1, timeout=5)
+            with pytest.raises(openai.RateLimitError):
+                await runner.run("hello")
+
+            rag = RAGEngine.__new__(RAGEngine)
+            rag.llm_manager = LLMManager()
+            rag.llm_manager.chat_model = chat
+            rag.llm_manager.semantic_cache = None
+            rag.retriever = StubRetriever()
+            rag.kb_version = None
+            agent = SupportAgent()
+            agent.rag = rag
+            result = await agent.process_message("Tell me about your company history", "u429")
+            return runner.get_stats(), result, server.get_stats()
+        finally:
+            await server.stop()
+
+    runner_stats, result, server_stats = asyncio.run(scenario())
+    assert runner_stats["rate_limited"] == 1
+    assert runner_stats["errors"] == 0
+    assert result["status"] == "rate_limited"
+    assert server_stats["requests"]["rate_limited"] == 2
+    assert get_rate_limiter("gpt-429-test").get_stats()["server_429s"] == 2
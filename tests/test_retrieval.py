@@ -0,0 +1,91 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from langchain.schema import Document
+from langchain.vectorstores import Chroma
+from langchain_core.embeddings import Embeddings
+
+from telegram_agent.application.rag_indexing_service.embeddings import EmbeddingCache
+from telegram_agent.application.rag_indexing_service.retrieval import AsyncVectorRetriever
+from telegram_agent.config.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def memory_only_cache(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_STORE_PATH", None)
+
+
+class SlowEmbeddings(Embeddings):
+    """Embeddings whose async query path simulates a network round trip"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+    async def aembed_query(self, text):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.embed_query(text)
+
+
+class FakeLLMManager:
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def get_embeddings(self):
+        return self.embeddings
+
+
+def _retriever(tmp_path, delay):
+    embeddings = SlowEmbeddings(delay)
+    cache = EmbeddingCache(FakeLLMManager(embeddings))
+    store = Chroma(collection_name="test_kb", embedding_function=cache, persist_directory=str(tmp_path))
+    store.add_documents([Document(page_content="a" * n) for n in range(1, 6)])
+    return AsyncVectorRetriever(store, cache, max_workers=4), embeddings
+
+
+def test_concurrent_searches_overlap(tmp_path):
+    retriever, embeddings = _retriever(tmp_path, delay=0.2)
+
+    async def scenario():
+        return await asyncio.gather(*(retriever.search("q" * n, k=1) for n in range(1, 6)))
+
+    started = time.monotonic()
+    results = asyncio.run(scenario())
+    elapsed = time.monotonic() - started
+
+    assert [docs[0][0].page_content for docs in results] == ["a" * n for n in range(1, 6)]
+    assert embeddings.calls == 5
+    assert elapsed < 0.6
+
+
+def test_query_embeddings_are_cached(tmp_path):
+    retriever, embeddings = _retriever(tmp_path, delay=0)
+    asyncio.run(retriever.search("qqq", k=1))
+    asyncio.run(retriever.search("qqq", k=1))
+    assert embeddings.calls == 1
+
+
+def test_deadline_cancels_search(tmp_path):
+    retriever, _ = _retriever(tmp_path, delay=1)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(retriever.search("qqq", k=1, timeout=0.05))
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.application.rag_indexing_service.llm import LLMManager
+from telegram_agent.application.rag_indexing_service.semantic_cache import SemanticAnswerCache
+
+
+def _cache():
+    return SemanticAnswerCache(threshold=0.95, near_miss_threshold=0.8, max_size=3)
+
+
+def test_similar_query_hits_and_dissimilar_misses():
+    cache = _cache()
+    cache.store("what are your hours", [1.0, 0.0, 0.1], "9-18", kb_version="v1")
+
+    assert cache.lookup([0.99, 0.0, 0.12], kb_version="v1") == "9-18"
+    assert cache.lookup([0.9, 0.4, 0.1], kb_version="v1") is None
+    assert cache.lookup([0.0, 1.0, 0.0], kb_version="v1") is None
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["near_misses"], stats["misses"]) == (1, 1, 1)
+
+
+def test_answers_are_only_reused_in_their_language():
+    cache = _cache()
+    cache.store("refund for order 13354", [1.0, 0.0], "תשובה בעברית", kb_version="v1", language="he")
+
+    assert cache.lookup([1.0, 0.0], kb_version="v1", language="en") is None
+    assert cache.lookup([1.0, 0.0], kb_version="v1", language="he") == "תשובה בעברית"
+
+    cache.store("refund for order 13354", [1.0, 0.0], "English answer", kb_version="v1", language="en")
+    assert cache.lookup([1.0, 0.01], kb_version="v1", language="en") == "English answer"
+    assert cache.lookup([1.0, 0.01], kb_version="v1", language="he") == "תשובה בעברית"
+
+
+def test_knowledge_base_change_invalidates_answers():
+    cache = _cache()
+    cache.store("q", [1.0, 0.0], "old answer", kb_version="v1")
+    assert cache.lookup([1.0, 0.0], kb_version="v2") is None
+    assert cache.get_stats()["size"] == 0
+
+
+def test_oldest_entries_are_replaced():
+    cache = _cache()
+    for i, vector in enumerate([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]):
+        cache.store(f"q{i}", vector, f"a{i}", kb_version="v1")
+    assert cache.get_stats()["size"] == 3
+    assert cache.lookup([1, 0, 0, 0], kb_version="v1") is None
+    assert cache.lookup([0, 0, 0, 1], kb_version="v1") == "a3"
+
+
+class CountingChatModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return type("Response", (), {"content": f"answer #{self.calls}"})()
+
+
+def test_llm_manager_skips_chat_model_on_semantic_hit():
+    manager = LLMManager()
+    manager.chat_model = CountingChatModel()
+
+    async def scenario():
+        first = await manager.generate("prompt A", query="when are you open",
+                                       query_embedding=[1.0, 0.0], kb_version="v1")
+        second = await manager.generate("prompt B", query="what are your hours",
+                                        query_embedding=[1.0, 0.01], kb_version="v1")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == "answer #1"
+    assert manager.chat_model.calls == 1
+
+
+def test_rag_reuses_the_search_embedding_as_cache_key():
+    from telegram_agent.application.rag_indexing_service.rag import RAGEngine
+
+    class CountingEmbeddings:
+        calls = 0
+
+        async def aembed_query(self, text):
+            self.calls += 1
+            return [1.0, 0.0]
+
+    rag = RAGEngine.__new__(RAGEngine)
+    rag.llm_manager = LLMManager()
+    rag.llm_manager.chat_model = CountingChatModel()
+    rag.llm_manager.semantic_cache = _cache()
+    rag.embedding_cache = CountingEmbeddings()
+    rag.kb_version = "v1"
+    context = [{"content": "We open at 9.", "metadata": {}, "score": 0.2}]
+
+    async def scenario():
+        reused = await rag.generate_answer("when are you open", context, query_embedding=[1.0, 0.0])
+        embedded = await rag.generate_answer("when do you open", context)
+        return reused, embedded
+
+    reused, embedded = asyncio.run(scenario())
+    assert rag.embedding_cache.calls == 1  # only the call without an embedding
+    assert reused["answer"] == embedded["answer"]
+    assert rag.llm_manager.chat_model.calls == 1
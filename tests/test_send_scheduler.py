@@ -0,0 +1,213 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram.error import BadRequest, RetryAfter
+
+from telegram_agent.infrastructure.telegram.send_scheduler import SendPriority, TelegramSendScheduler
+from telegram_agent.infrastructure.telegram.streaming import StreamingReply
+
+
+class FakeChat:
+    def __init__(self, chat_id, log):
+        self.id = chat_id
+        self.log = log
+
+    async def send_action(self, action):
+        self.log.append((self.id, action))
+
+
+class FakeMessage:
+    def __init__(self, chat_id, log, message_id=1):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.chat = FakeChat(chat_id, log)
+        self.log = log
+        self.reject_markdown = False
+
+    async def reply_text(self, text, parse_mode=None):
+        if parse_mode and self.reject_markdown:
+            raise BadRequest("Can't parse entities")
+        self.log.append((self.chat_id, "reply", text, parse_mode))
+        return FakeMessage(self.chat_id, self.log, message_id=len(self.log) + 100)
+
+    async def edit_text(self, text, parse_mode=None):
+        self.log.append((self.chat_id, "edit", text))
+
+
+def recorder(log, entry):
+    async def call():
+        log.append(entry)
+        return entry
+    return call
+
+
+def test_priorities_order_calls_when_the_global_budget_is_tight():
+    log = []
+
+    async def scenario():
+        scheduler = TelegramSendScheduler(global_rate=20, chat_rate=100, chat_burst=10)
+        # Spend the global burst so the next calls are admitted one at a time
+        for i in range(20):
+            scheduler.submit(1000 + i, SendPriority.REPLY, recorder([], "warmup"))
+        await asyncio.sleep(0)
+        scheduler.submit(1, SendPriority.TYPING, recorder(log, "typing"))
+        scheduler.submit(2, SendPriority.EDIT, recorder(log, "edit"))
+        scheduler.submit(3, SendPriority.REPLY, recorder(log, "reply"))
+        await scheduler.shutdown(timeout=2)
+
+    asyncio.run(scenario())
+    assert log == ["reply", "edit", "typing"]
+
+
+def test_chat_is_paced_after_its_burst_and_others_are_not_blocked():
+    times = {}
+
+    def timed(chat, i):
+        async def call():
+            times.setdefault(chat, []).append(time.monotonic())
+            return i
+        return call
+
+    async def scenario():
+        scheduler = TelegramSendScheduler(global_rate=1000, chat_rate=20, chat_burst=2)
+        started = time.monotonic()
+        futures = [scheduler.submit(1, SendPriority.REPLY, timed(1, i)) for i in range(4)]
+        other = scheduler.submit(2, SendPriority.REPLY, timed(2, 0))
+        results = await asyncio.gather(*futures)
+        await other
+        await scheduler.shutdown()
+        return started, results
+
+    started, results = asyncio.run(scenario())
+    assert results == [0, 1, 2, 3]
+    # Two in the burst, then one every 50ms
+    assert times[1][3] - started >= 0.09
+    assert times[2][0] - started < 0.05
+
+
+def test_reply_drops_queued_typing_and_edits_coalesce():
+    log = []
+
+    async def scenario():
+        scheduler = TelegramSendScheduler(global_rate=1000, chat_rate=1000, chat_burst=10)
+        message = FakeMessage(7, log)
+        blocker = asyncio.Event()
+
+        async def slow_reply():
+            await blocker.wait()
+            log.append("first")
+
+        # Keep the chat busy so everything below stays queued
+        scheduler.submit(7, SendPriority.REPLY, slow_reply)
+        await asyncio.sleep(0.01)
+        typing_a = scheduler.typing(message.chat)
+        typing_b = scheduler.typing(message.chat)
+        edits = [scheduler.edit(message, f"draft {i}") for i in range(3)]
+        scheduler.reply(message, "answer")
+        blocker.set()
+        await asyncio.gather(*edits)
+        stats = scheduler.get_stats()
+        await scheduler.shutdown()
+        return typing_a, typing_b, edits, stats
+
+    typing_a, typing_b, edits, stats = asyncio.run(scenario())
+    assert typing_a is typing_b
+    assert typing_a.result() is None
+    assert len({id(future) for future in edits}) == 1
+    assert log == ["first", (7, "reply", "answer", None), (7, "edit", "draft 2")]
+    assert stats["coalesced"] == 4
+
+
+def test_retry_after_pauses_the_chat_and_retries():
+    attempts = []
+
+    async def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RetryAfter(0.05)
+        return "ok"
+
+    async def scenario():
+        scheduler = TelegramSendScheduler(global_rate=1000, chat_rate=1000, chat_burst=10, max_retries=2)
+        result = await scheduler.submit(9, SendPriority.REPLY, flaky)
+        stats = scheduler.get_stats()
+        await scheduler.shutdown()
+        return result, stats
+
+    result, stats = asyncio.run(scenario())
+    assert result == "ok"
+    assert attempts[1] - attempts[0] >= 0.05
+    assert stats["retried"] == 1
+    assert stats["sent"] == 1
+
+
+def test_errors_reach_the_caller_and_markdown_falls_back():
+    log = []
+
+    async def scenario():
+        scheduler = TelegramSendScheduler(global_rate=1000, chat_rate=1000, chat_burst=10)
+
+        async def broken():
+            raise BadRequest("Chat not found")
+
+        with pytest.raises(BadRequest):
+            await scheduler.submit(3, SendPriority.REPLY, broken)
+
+        message = FakeMessage(3, log)
+        message.reject_markdown = True
+        await scheduler.reply(message, "*bold", parse_mode="Markdown")
+        stats = scheduler.get_stats()
+        await scheduler.shutdown()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert log == [(3, "reply", "*bold", None)]
+    assert stats["failed"] == 1
+
+
+def test_typing_is_shed_under_backpressure():
+    async def scenario():
+        scheduler = TelegramSendScheduler(global_rate=1000, chat_rate=1000, chat_burst=10, max_pending=1)
+        scheduler.submit(1, SendPriority.REPLY, recorder([], "reply"))
+        shed = scheduler.typing(FakeChat(2, []))
+        stats = scheduler.get_stats()
+        await scheduler.shutdown()
+        return shed, stats
+
+    shed, stats = asyncio.run(scenario())
+    assert shed.result() is None
+    assert stats["dropped"] == 1
+
+
+def test_streaming_reply_goes_through_the_scheduler():
+    log = []
+
+    async def scenario():
+        scheduler = TelegramSendScheduler(global_rate=1000, chat_rate=1000, chat_burst=10)
+        reply = StreamingReply(FakeMessage(5, log), edit_interval=0.02, sender=scheduler)
+        await reply.update("Hello there.")
+        await reply.update("Hello there. More text")
+        await asyncio.sleep(0.05)
+        delivered = await reply.finish("Hello there. More text, final")
+        stats = scheduler.get_stats()
+        await scheduler.shutdown()
+        return delivered, stats
+
+    delivered, stats = asyncio.run(scenario())
+    assert delivered
+    assert log[0] == (5, "reply", "Hello there.", None)
+    assert log[-1][-1] == "Hello there. More text, final"
+    assert stats["sent"] == len(log)
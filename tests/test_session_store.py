@@ -0,0 +1,226 @@
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.application.conversation_service.handlers import session_store as store_module
+from telegram_agent.application.conversation_service.handlers.context_handler import ContextHandler
+from telegram_agent.application.conversation_service.handlers.order_handler import OrderHandler
+from telegram_agent.application.conversation_service.handlers.session_store import BoundedSessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class BrokenConnection:
+    def execute(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_history_is_a_ring_buffer():
+    store = BoundedSessionStore(max_sessions=10, idle_ttl=0, max_history=3)
+    context = ContextHandler(store)
+    for i in range(5):
+        context.add_message("u1", f"q{i}", f"a{i}", 0.9)
+
+    history = store.get("u1").history
+    assert [entry.query for entry in history] == ["q2", "q3", "q4"]
+    assert "User: q4" in context.get_context("u1")
+    assert "User: q2" not in context.get_context("u1")
+
+
+def test_capacity_evicts_least_recently_used():
+    store = BoundedSessionStore(max_sessions=2, idle_ttl=0, max_history=3)
+    context = ContextHandler(store)
+    context.save("a", "last_order_id", "1")
+    context.save("b", "last_order_id", "2")
+    context.get("a", "last_order_id")  # touch a
+    context.save("c", "last_order_id", "3")
+
+    assert context.get("a", "last_order_id") == "1"
+    assert context.get("b", "last_order_id") is None
+    assert store.get_stats() == {
+        "resident": 2, "max_sessions": 2, "evicted_idle": 0, "evicted_capacity": 1
+    }
+
+
+def test_idle_sessions_expire(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(store_module.time, "monotonic", clock.monotonic)
+    store = BoundedSessionStore(max_sessions=10, idle_ttl=60, max_history=3)
+    orders = OrderHandler(store)
+
+    orders.handle_order_query("מה עם ההזמנה?", "u1")
+    assert orders.is_waiting("u1")
+
+    clock.now += 30
+    store.get_or_create("u2")
+    clock.now += 45
+    # u1 idle for 75s, u2 for 45s
+    assert store.sweep() == 1
+    assert not orders.is_waiting("u1")
+    assert len(store) == 1
+
+    clock.now += 61
+    assert store.get("u2") is None
+    assert store.get_stats()["evicted_idle"] == 2
+
+
+def test_sweeper_evicts_idle_sessions_periodically():
+    store = BoundedSessionStore(max_sessions=10, idle_ttl=60, max_history=3)
+    # The event loop's clock is time.monotonic too, so age the session instead
+    store.get_or_create("u1").last_seen -= 61
+
+    async def run():
+        sweeper = asyncio.create_task(store.run_sweeper(interval=0.01))
+        await asyncio.sleep(0.05)
+        sweeper.cancel()
+
+    asyncio.run(run())
+    assert len(store) == 0
+    assert store.get_stats()["evicted_idle"] == 1
+
+
+def test_reads_do_not_create_sessions():
+    store = BoundedSessionStore(max_sessions=10, idle_ttl=0, max_history=3)
+    context = ContextHandler(store)
+    orders = OrderHandler(store)
+
+    assert context.get_context("ghost") == ""
+    assert not context.has_context("ghost")
+    assert not context.has("ghost", "last_order_id")
+    orders.clear_waiting_state("ghost")
+    assert len(store) == 0
+
+
+def test_sqlite_sessions_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    worker_a = store_module.SQLiteSessionStore(path, max_sessions=10, idle_ttl=60, max_history=3)
+    worker_b = store_module.SQLiteSessionStore(path, max_sessions=10, idle_ttl=60, max_history=3)
+
+    # First message on worker A asks for an order number
+    worker_a.load("u1")
+    OrderHandler(worker_a).handle_order_query("איפה ההזמנה שלי?", "u1")
+    ContextHandler(worker_a).add_message("u1", "איפה ההזמנה שלי?", "שלח מספר הזמנה", 1.0)
+    worker_a.flush("u1")
+
+    # Follow-up lands on worker B
+    worker_b.load("u1")
+    assert OrderHandler(worker_b).is_waiting("u1")
+    assert "איפה ההזמנה שלי?" in ContextHandler(worker_b).get_context("u1")
+    OrderHandler(worker_b).clear_waiting_state("u1")
+    ContextHandler(worker_b).save("u1", "last_order_id", "13354")
+    worker_b.flush("u1")
+
+    # Worker A sees B's changes instead of its stale copy
+    worker_a.load("u1")
+    assert not OrderHandler(worker_a).is_waiting("u1")
+    assert ContextHandler(worker_a).get("u1", "last_order_id") == "13354"
+    assert worker_a.get_stats()["stored"] == 1
+
+    worker_a.discard("u1")
+    worker_b.load("u1")
+    assert worker_b.get("u1") is None
+
+
+def test_sqlite_load_ignores_expired_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / "sessions.sqlite3")
+    store = store_module.SQLiteSessionStore(path, max_sessions=10, idle_ttl=60, max_history=3)
+    store.load("u1")
+    ContextHandler(store).add_message("u1", "hi", "hello", 1.0)
+    assert store.flush("u1")
+
+    real_time = store_module.time.time
+    monkeypatch.setattr(store_module.time, "time", lambda: real_time() + 120)
+    store.load("u1")
+    assert not ContextHandler(store).has_context("u1")
+    store.sweep()
+    assert store.get_stats()["stored"] == 0
+
+
+def test_sqlite_flush_keeps_a_concurrent_writers_version(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    worker_a = store_module.SQLiteSessionStore(path, max_sessions=10, idle_ttl=60, max_history=3)
+    worker_b = store_module.SQLiteSessionStore(path, max_sessions=10, idle_ttl=60, max_history=3)
+    worker_a.load("u1")
+    ContextHandler(worker_a).save("u1", "last_order_id", "1")
+    assert worker_a.flush("u1")
+
+    # Both workers load version 1; B writes first
+    worker_a.load("u1")
+    worker_b.load("u1")
+    ContextHandler(worker_b).save("u1", "last_order_id", "2")
+    assert worker_b.flush("u1")
+    ContextHandler(worker_a).save("u1", "last_order_id", "3")
+    assert not worker_a.flush("u1")
+    assert worker_a.get("u1") is None
+    assert worker_a.get_stats()["conflicts"] == 1
+
+    worker_a.load("u1")
+    assert ContextHandler(worker_a).get("u1", "last_order_id") == "2"
+
+
+def test_sqlite_flush_needs_a_successful_load(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    worker_a = store_module.SQLiteSessionStore(path, max_sessions=10, idle_ttl=60, max_history=3)
+    worker_b = store_module.SQLiteSessionStore(path, max_sessions=10, idle_ttl=60, max_history=3)
+    worker_a.load("u1")
+    ContextHandler(worker_a).save("u1", "last_order_id", "stale")
+    assert worker_a.flush("u1")
+
+    worker_b.load("u1")
+    ContextHandler(worker_b).save("u1", "last_order_id", "fresh")
+    assert worker_b.flush("u1")
+
+    # Worker A's next load fails before it replaces its stale copy
+    worker_a._local.conn = BrokenConnection()
+    with pytest.raises(sqlite3.OperationalError):
+        worker_a.load("u1")
+    del worker_a._local.conn
+    assert not worker_a.flush("u1")
+
+    worker_b.load("u1")
+    assert ContextHandler(worker_b).get("u1", "last_order_id") == "fresh"
+
+
+def test_sqlite_io_runs_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    store = store_module.SQLiteSessionStore(path, max_sessions=10, idle_ttl=60, max_history=3)
+    threads = []
+    for name in ("load", "flush", "sweep", "get_stats"):
+        method = getattr(store, name)
+
+        def record(*args, _method=method):
+            threads.append(threading.get_ident())
+            return _method(*args)
+
+        setattr(store, name, record)
+
+    async def run():
+        await store.aload("u1")
+        ContextHandler(store).add_message("u1", "hi", "hello", 1.0)
+        await store.aflush("u1")
+        await store.asweep()
+        return await store.aget_stats(), threading.get_ident()
+
+    stats, loop_thread = asyncio.run(run())
+    assert stats["stored"] == 1
+    assert len(threads) == 4
+    assert loop_thread not in threads
@@ -0,0 +1,168 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.application.rag_indexing_service.llm import LLMManager
+from telegram_agent.infrastructure.utils.single_flight import SingleFlight, ThreadSingleFlight
+
+
+class SlowChatModel:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return type("Response", (), {"content": f"answer to {prompt}"})()
+
+
+class StreamingChatModel:
+    def __init__(self, chunks, delay=0.01):
+        self.chunks = chunks
+        self.delay = delay
+        self.calls = 0
+
+    async def astream(self, prompt):
+        self.calls += 1
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield type("Chunk", (), {"content": chunk})()
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(10)))
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert results == ["result"] * 10
+    assert len(calls) == 1
+    assert (flight.started, flight.shared, len(flight)) == (1, 9, 0)
+
+
+def test_errors_reach_every_waiter():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("api down")
+
+    async def scenario():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelling_first_waiter_keeps_shared_call_alive():
+    async def work():
+        await asyncio.sleep(0.03)
+        return "done"
+
+    async def scenario():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled(), flight.started
+
+    result, first_cancelled, started = asyncio.run(scenario())
+    assert result == "done"
+    assert first_cancelled
+    assert started == 1
+
+
+def test_thread_single_flight_shares_blocking_call():
+    flight = ThreadSingleFlight()
+    calls = []
+    results = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.05)
+        return 42
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 5
+    assert len(calls) == 1
+
+    def fail():
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
+    assert flight.do("k", work) == 42
+
+
+def test_llm_manager_coalesces_identical_prompts():
+    manager = LLMManager()
+    manager.semantic_cache = None
+    manager.chat_model = SlowChatModel()
+
+    async def scenario():
+        return await asyncio.gather(*(manager.generate("same prompt") for _ in range(8)))
+
+    answers = asyncio.run(scenario())
+    assert answers == ["answer to same prompt"] * 8
+    assert manager.chat_model.calls == 1
+    assert manager.get_cache_stats()["coalesced"] == 7
+
+
+def test_coalesced_streams_reach_every_waiter_independently():
+    manager = LLMManager()
+    manager.semantic_cache = None
+    manager.chat_model = StreamingChatModel(["Hel", "lo", " world."])
+    received = {"first": [], "second": []}
+
+    async def broken(token):
+        raise RuntimeError("telegram is down")
+
+    def collect(name):
+        async def on_token(token):
+            await asyncio.sleep(0.02)  # slower than the model
+            received[name].append(token)
+        return on_token
+
+    async def scenario():
+        return await asyncio.gather(
+            manager.generate("prompt", on_token=broken),
+            manager.generate("prompt", on_token=collect("first")),
+            manager.generate("prompt"),
+            manager.generate("prompt", on_token=collect("second")),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == ["Hello world."] * 3
+    assert received["first"] == received["second"] == ["Hel", "lo", " world."]
+    assert manager.chat_model.calls == 1
+    assert manager.answer_cache and not manager._streams
@@ -0,0 +1,171 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram.error import BadRequest, NetworkError
+
+from telegram_agent.application.rag_indexing_service.llm import LLMManager
+from telegram_agent.config.strings import strings
+from telegram_agent.infrastructure.telegram.streaming import StreamingReply
+
+
+class FakeSentMessage:
+    def __init__(self, text):
+        self.text = text
+        self.edits = []
+        self.reject_markdown = False
+        self.deleted = False
+        self.reject_delete = False
+
+    async def edit_text(self, text, parse_mode=None):
+        if parse_mode and self.reject_markdown:
+            raise BadRequest("Can't parse entities")
+        self.edits.append((text, parse_mode))
+        self.text = text
+
+    async def delete(self):
+        if self.reject_delete:
+            raise BadRequest("Message can't be deleted")
+        self.deleted = True
+        return True
+
+
+class FakeUserMessage:
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text, parse_mode=None):
+        sent = FakeSentMessage(text)
+        self.replies.append(sent)
+        return sent
+
+
+class StreamingChatModel:
+    def __init__(self, chunks, delay=0.0):
+        self.chunks = chunks
+        self.delay = delay
+        self.calls = 0
+
+    async def astream(self, prompt):
+        self.calls += 1
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield type("Chunk", (), {"content": chunk})()
+
+
+def test_first_message_waits_for_sentence_boundary_then_edits_are_throttled():
+    async def scenario():
+        message = FakeUserMessage()
+        reply = StreamingReply(message, edit_interval=0.05, first_message_max_chars=200)
+        await reply.update("Our store")
+        assert not reply.started
+        await reply.update("Our store opens at 9.")
+        await reply.update("Our store opens at 9. We close")
+        assert len(message.replies) == 1
+        for i in range(20):
+            await reply.update(f"Our store opens at 9. We close at {i}")
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.06)
+        edits_while_streaming = len(message.replies[0].edits)
+        delivered = await reply.finish("*Final* answer")
+        return message, edits_while_streaming, delivered
+
+    message, edits_while_streaming, delivered = asyncio.run(scenario())
+    sent = message.replies[0]
+    assert len(message.replies) == 1
+    # ~0.16s of streaming at one edit per 0.05s, not one edit per chunk
+    assert 1 <= edits_while_streaming <= 4
+    assert delivered
+    assert sent.edits[-1] == ("*Final* answer", "Markdown")
+
+
+def test_finish_without_stream_lets_caller_reply():
+    async def scenario():
+        reply = StreamingReply(FakeUserMessage(), edit_interval=0.05)
+        await reply.update("no boundary yet")
+        return await reply.finish("full answer")
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_invalid_markdown_falls_back_to_plain_text():
+    async def scenario():
+        message = FakeUserMessage()
+        reply = StreamingReply(message, edit_interval=0.05)
+        await reply.update("Hello there.")
+        message.replies[0].reject_markdown = True
+        await reply.finish("Hello there. *broken")
+        return message.replies[0]
+
+    sent = asyncio.run(scenario())
+    assert sent.edits[-1] == ("Hello there. *broken", None)
+
+
+def test_failed_final_edit_lets_caller_reply():
+    async def scenario():
+        message = FakeUserMessage()
+        reply = StreamingReply(message, edit_interval=0.05)
+        await reply.update("Hello there.")
+
+        async def edit_text(text, parse_mode=None):
+            raise NetworkError("connection reset")
+
+        message.replies[0].edit_text = edit_text
+        return message, await reply.finish("Hello there. Full answer")
+
+    message, delivered = asyncio.run(scenario())
+    assert delivered is False
+    # The partial answer is gone, so only the caller's full reply stays visible
+    assert message.replies[0].deleted
+
+
+def test_undeletable_partial_answer_points_to_the_full_one():
+    async def scenario():
+        message = FakeUserMessage()
+        reply = StreamingReply(message, edit_interval=0.05)
+        await reply.update("Hello there.")
+        sent = message.replies[0]
+        sent.reject_delete = True
+        real_edit = sent.edit_text
+
+        async def edit_text(text, parse_mode=None):
+            if text.endswith("Full answer"):
+                raise NetworkError("connection reset")
+            await real_edit(text, parse_mode)
+
+        sent.edit_text = edit_text
+        return sent, await reply.finish("Hello there. Full answer")
+
+    sent, delivered = asyncio.run(scenario())
+    assert delivered is False
+    assert not sent.deleted
+    assert sent.text == strings.STREAM_SUPERSEDED
+
+
+def test_llm_manager_streams_and_caches_full_answer():
+    manager = LLMManager()
+    manager.semantic_cache = None
+    manager.chat_model = StreamingChatModel(["Hel", "lo", " world."])
+    received = []
+
+    async def on_token(token):
+        received.append(token)
+
+    async def scenario():
+        first = await manager.generate("prompt", on_token=on_token)
+        second = await manager.generate("prompt", on_token=on_token)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == "Hello world."
+    assert received == ["Hel", "lo", " world."]
+    assert manager.chat_model.calls == 1
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from telegram_agent.infrastructure.telegram.update_scheduler import KeyedScheduler
+
+
+class Recorder:
+    def __init__(self):
+        self.active = {}
+        self.max_active = 0
+        self.max_per_key = 0
+        self.log = []
+
+    async def job(self, key, value, delay=0.01):
+        self.active[key] = self.active.get(key, 0) + 1
+        self.max_per_key = max(self.max_per_key, self.active[key])
+        self.max_active = max(self.max_active, sum(self.active.values()))
+        await asyncio.sleep(delay)
+        self.log.append((key, value))
+        self.active[key] -= 1
+        return value
+
+
+def test_same_key_runs_in_order_other_keys_in_parallel():
+    async def scenario():
+        scheduler = KeyedScheduler(max_concurrency=3)
+        recorder = Recorder()
+        futures = [
+            scheduler.submit(key, recorder.job(key, i))
+            for i in range(5) for key in ("a", "b", "c", "d")
+        ]
+        results = await asyncio.gather(*futures)
+        return scheduler, recorder, results
+
+    scheduler, recorder, results = asyncio.run(scenario())
+    assert results == [i for i in range(5) for _ in "abcd"]
+    for key in "abcd":
+        assert [value for k, value in recorder.log if k == key] == list(range(5))
+    assert recorder.max_per_key == 1
+    assert recorder.max_active == 3
+    assert scheduler.get_stats()["completed"] == 20
+    assert scheduler.get_stats()["lanes"] == 0
+
+
+def test_busy_chat_does_not_starve_others():
+    async def scenario():
+        scheduler = KeyedScheduler(max_concurrency=2)
+        recorder = Recorder()
+        flood = [scheduler.submit("busy", recorder.job("busy", i)) for i in range(10)]
+        await asyncio.sleep(0.015)
+        quiet = await scheduler.run("quiet", recorder.job("quiet", 0))
+        finished_busy = sum(1 for key, _ in recorder.log if key == "busy")
+        await asyncio.gather(*flood)
+        return quiet, finished_busy
+
+    quiet, finished_busy = asyncio.run(scenario())
+    assert quiet == 0
+    # The quiet chat got the free slot instead of waiting for the whole flood
+    assert finished_busy < 5
+
+
+def test_errors_reach_the_caller_and_lane_continues():
+    async def failing():
+        raise ValueError("boom")
+
+    async def scenario():
+        scheduler = KeyedScheduler(max_concurrency=1)
+        recorder = Recorder()
+        with pytest.raises(ValueError):
+            await scheduler.run("a", failing())
+        assert await scheduler.run("a", recorder.job("a", 1)) == 1
+        scheduler.submit("a", failing())  # fire and forget
+        await scheduler.join()
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert scheduler.get_stats()["failed"] == 2
+    assert scheduler.get_stats()["running"] == 0
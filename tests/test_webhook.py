@@ -0,0 +1,88 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from telegram_agent.infrastructure.telegram.webhook import SECRET_HEADER, WebhookServer
+
+
+class FakeApplication:
+    bot = None
+
+    def __init__(self, gate: asyncio.Event = None):
+        self.gate = gate
+        self.updates = []
+
+    async def process_update(self, update):
+        if self.gate:
+            await self.gate.wait()
+        self.updates.append(update.update_id)
+
+
+def _update(update_id):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "text": "שלום"
+        }
+    }
+
+
+def test_rejects_bad_secret_and_processes_valid_updates():
+    async def scenario():
+        app = FakeApplication()
+        server = WebhookServer(app, "s3cret", "/telegram/webhook", max_queue=10, workers=2)
+        async with TestClient(TestServer(server.build_app())) as client:
+            bad = await client.post("/telegram/webhook", json=_update(1), headers={SECRET_HEADER: "nope"})
+            good = await client.post("/telegram/webhook", json=_update(2), headers={SECRET_HEADER: "s3cret"})
+            assert (bad.status, good.status) == (403, 200)
+            await server.scheduler.join()
+        await server.stop()
+        return app, server
+
+    app, server = asyncio.run(scenario())
+    assert app.updates == [2]
+    stats = server.get_stats()
+    assert stats["unauthorized"] == 1
+    assert stats["processed"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_full_queue_refuses_updates_without_blocking():
+    async def scenario():
+        gate = asyncio.Event()
+        app = FakeApplication(gate)
+        server = WebhookServer(app, "s3cret", "/telegram/webhook", max_queue=2, workers=1)
+        headers = {SECRET_HEADER: "s3cret"}
+        async with TestClient(TestServer(server.build_app())) as client:
+            statuses = []
+            for update_id in range(5):
+                response = await client.post("/telegram/webhook", json=_update(update_id), headers=headers)
+                statuses.append(response.status)
+                await asyncio.sleep(0)
+            stats_while_blocked = server.get_stats()
+            gate.set()
+            await server.scheduler.join()
+        await server.stop()
+        return app, server, statuses, stats_while_blocked
+
+    app, server, statuses, blocked = asyncio.run(scenario())
+    # One update held by the worker, two queued, the rest refused for redelivery
+    assert statuses == [200, 200, 200, 503, 503]
+    assert blocked["busy"] == 1
+    assert blocked["queue_depth"] == 2
+    assert server.get_stats()["dropped"] == 2
+    assert app.updates == [0, 1, 2]